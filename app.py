@@ -2,10 +2,13 @@ from flask import Flask, redirect, url_for, flash, render_template
 from flask_wtf.csrf import CSRFProtect
 from flask_login import LoginManager, login_user, logout_user, login_required
 from config import config
-from src.database import get_db # Importamos la función de conexión
+from src.database import get_db, close_pool, teardown_request_db # Importamos la función de conexión
+from src.utils.instrumentacion_sql import sql_stats_after_request
+from src.utils.metricas import metricas_before_request, metricas_after_request
 import sys # Necesario para salir si hay un error crítico
 import psycopg2 # Necesario para manejar la excepción de PostgreSQL
 import os
+import atexit
 
 # Controladores
 from src.controllers import auth_controller # Asumo que auth_controller existe
@@ -17,6 +20,7 @@ from src.controllers import reportes_controller
 from src.controllers import gasto_controller
 from src.controllers import proyecto_detalle_controller
 from src.controllers import auditor_controller
+from src.controllers import metricas_controller
 from src.models.ModelUser import ModelUser
 
 app = Flask(__name__)
@@ -29,20 +33,25 @@ csrf = CSRFProtect(app)
 login_manager_app = LoginManager(app)
 login_manager_app.login_view = 'login'
 
+# Una conexión por petición: se libera al cerrar el contexto de la aplicación
+app.teardown_appcontext(teardown_request_db)
+
+# Estadísticas SQL de la petición (consultas lentas, posibles N+1 y cabecera X-SQL-Stats)
+app.after_request(sql_stats_after_request)
+
+# Métricas de Prometheus: latencia, estados y uso de la base de datos por endpoint
+app.before_request(metricas_before_request)
+app.after_request(metricas_after_request)
+
+# Cerrar las conexiones del pool al terminar el proceso
+atexit.register(close_pool)
+
 
 # Cargar usuario activo (usado por Flask-Login)
 @login_manager_app.user_loader
 def load_user(id):
-    # La conexión debe abrirse y cerrarse en esta función
-    db = get_db() 
-    if db is None:
-        # Si la conexión falla aquí, retornamos None
-        return None 
-        
-    # Asumo que ModelUser.get_by_id puede manejar la conexión (db)
-    user = ModelUser.get_by_id(db, id)
-    db.close()
-    return user
+    # Primero la caché; solo en un fallo se usa la conexión de la petición
+    return ModelUser.get_cached_by_id(get_db, id)
 
 
 # ---------------------- RUTAS PRINCIPALES ----------------------
@@ -60,6 +69,7 @@ app.add_url_rule('/admin/usuarios/editar/<int:user_id>', view_func=admin_control
 app.add_url_rule('/admin/usuarios/eliminar/<int:user_id>', view_func=admin_controller.delete_user)
 app.add_url_rule('/admin/usuarios/activar/<int:user_id>', view_func=admin_controller.toggle_user_status, methods=['POST'])
 app.add_url_rule('/admin/reportes', view_func=reportes_controller.reportes)
+app.add_url_rule('/reportes/graficos/<nombre>.<formato>', view_func=reportes_controller.grafico_reporte, endpoint='grafico_reporte')
 
 
 # rutas de DONADOR
@@ -118,6 +128,18 @@ app.add_url_rule('/auditor/donaciones/pdf', view_func=auditor_controller.exporta
 app.add_url_rule('/auditor/gastos/excel', view_func=auditor_controller.exportar_gastos_excel, endpoint='exportar_gastos_excel')
 app.add_url_rule('/auditor/gastos/pdf', view_func=auditor_controller.exportar_gastos_pdf, endpoint='exportar_gastos_pdf')
 app.add_url_rule('/auditor/auditoria/excel', view_func=auditor_controller.exportar_auditoria_excel, endpoint='exportar_auditoria_excel')
+app.add_url_rule('/auditor/donaciones/csv', view_func=auditor_controller.exportar_donaciones_csv, endpoint='exportar_donaciones_csv')
+app.add_url_rule('/auditor/donaciones/parquet', view_func=auditor_controller.exportar_donaciones_parquet, endpoint='exportar_donaciones_parquet')
+app.add_url_rule('/auditor/gastos/csv', view_func=auditor_controller.exportar_gastos_csv, endpoint='exportar_gastos_csv')
+app.add_url_rule('/auditor/gastos/parquet', view_func=auditor_controller.exportar_gastos_parquet, endpoint='exportar_gastos_parquet')
+app.add_url_rule('/auditor/auditoria/csv', view_func=auditor_controller.exportar_auditoria_csv, endpoint='exportar_auditoria_csv')
+app.add_url_rule('/auditor/auditoria/parquet', view_func=auditor_controller.exportar_auditoria_parquet, endpoint='exportar_auditoria_parquet')
+app.add_url_rule('/auditor/exportaciones', view_func=auditor_controller.ver_exportaciones, endpoint='ver_exportaciones')
+app.add_url_rule('/auditor/exportaciones/<int:id_trabajo>/estado', view_func=auditor_controller.estado_exportacion, endpoint='estado_exportacion')
+app.add_url_rule('/auditor/exportaciones/<int:id_trabajo>/descargar', view_func=auditor_controller.descargar_exportacion, endpoint='descargar_exportacion')
+
+# métricas de Prometheus (sin CSRF: solo GET; protegidas con METRICS_TOKEN si está definido)
+app.add_url_rule('/metrics', view_func=metricas_controller.metrics, endpoint='metrics')
 
 # ---------------------- MANEJADORES DE ERRORES ----------------------
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 
 class Config:
@@ -6,9 +7,55 @@ class Config:
     if not SECRET_KEY:
         SECRET_KEY = "dev-secret-key-change-in-production"
 
+    # Pool de conexiones a PostgreSQL: PG_POOL_MIN se abren al crearlo y las devueltas
+    # se conservan abiertas hasta PG_POOL_MAX
+    PG_POOL_MIN = int(os.environ.get("PG_POOL_MIN", "1"))
+    PG_POOL_MAX = int(os.environ.get("PG_POOL_MAX", "10"))
+    PG_POOL_TIMEOUT = float(os.environ.get("PG_POOL_TIMEOUT", "5"))
+    PG_POOL_VALIDATE_AFTER = float(os.environ.get("PG_POOL_VALIDATE_AFTER", "30"))
+
+    # Proyectos por página del catálogo (/proyectos)
+    CATALOGO_POR_PAGINA = int(os.environ.get("CATALOGO_POR_PAGINA", "12"))
+
+    # Caché del usuario de Flask-Login (segundos, 0 la desactiva); se invalida entre workers con
+    # LISTEN/NOTIFY (migración 0014)
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "30"))
+
+    # Instrumentación SQL por petición (consultas lentas, posibles N+1 y cabecera X-SQL-Stats)
+    SQL_INSTRUMENTACION = os.environ.get("SQL_INSTRUMENTACION", "1") not in ("0", "false", "False")
+    SQL_LENTA_MS = float(os.environ.get("SQL_LENTA_MS", "200"))
+    SQL_REPETIDAS_UMBRAL = int(os.environ.get("SQL_REPETIDAS_UMBRAL", "10"))
+
+    # Métricas de Prometheus en /metrics (el directorio multiproceso lo define gunicorn.conf.py)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") not in ("0", "false", "False")
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+    # Escritura de auditoría en segundo plano (AUDIT_ASYNC=0 la hace síncrona)
+    AUDIT_ASYNC = os.environ.get("AUDIT_ASYNC", "1") not in ("0", "false", "False")
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "100"))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL", "2"))
+    AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+
+    # Trabajos de exportación en segundo plano (scripts/export_worker.py)
+    EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "amicusoft-exports"))
+    EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "2"))
+    EXPORT_POLL_INTERVAL = float(os.environ.get("EXPORT_POLL_INTERVAL", "2"))
+    EXPORT_JOB_TIMEOUT = int(os.environ.get("EXPORT_JOB_TIMEOUT", "900"))
+    EXPORT_MAX_INTENTOS = int(os.environ.get("EXPORT_MAX_INTENTOS", "3"))
+    EXPORT_RETENCION_HORAS = int(os.environ.get("EXPORT_RETENCION_HORAS", "24"))
+
+    # Caché de exportaciones en disco (LRU por tamaño)
+    EXPORT_CACHE_DIR = os.environ.get("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "amicusoft-export-cache"))
+    EXPORT_CACHE_MAX_MB = int(os.environ.get("EXPORT_CACHE_MAX_MB", "500"))
+
+    # Caché de gráficos de reportes (PNG/SVG por versión de datos)
+    CHART_CACHE_DIR = os.environ.get("CHART_CACHE_DIR", os.path.join(tempfile.gettempdir(), "amicusoft-chart-cache"))
+    CHART_CACHE_MAX_MB = int(os.environ.get("CHART_CACHE_MAX_MB", "50"))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQL_STATS_HEADER = True
     PG_HOST = os.environ.get("PGHOST")
     PG_USER = os.environ.get("PGUSER")
     PG_PASSWORD = os.environ.get("PGPASSWORD")
@@ -18,6 +65,7 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    SQL_STATS_HEADER = False
     PG_HOST = os.environ.get("PGHOST")
     PG_USER = os.environ.get("PGUSER")
     PG_PASSWORD = os.environ.get("PGPASSWORD")
@@ -0,0 +1,20 @@
+# Configuración de gunicorn (se carga automáticamente desde el directorio de trabajo).
+# Solo activa las métricas multiproceso de /metrics y agrega los hooks que necesitan.
+import os
+import tempfile
+
+# Se carga antes que la aplicación: los workers heredan la variable y escriben sus
+# métricas en este directorio (único lugar donde se define su valor por defecto)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "amicusoft-metrics"))
+
+
+def on_starting(server):
+    # Los archivos de métricas de una ejecución anterior no deben sumarse a la nueva
+    from src.utils.metricas import limpiar_metricas
+    limpiar_metricas()
+
+
+def child_exit(server, worker):
+    # Los gauges 'livesum' (cola de auditoría) dejan de contar al worker que terminó
+    from src.utils.metricas import proceso_terminado
+    proceso_terminado(worker.pid)
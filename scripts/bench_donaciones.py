@@ -0,0 +1,104 @@
+"""
+Benchmark of the donation write path under concurrent donors hitting the same project.
+
+Creates a temporary project, runs N threads that each make M donations to it and
+reports throughput and whether monto_recaudado matches SUM(donaciones) afterwards.
+The temporary project (and its donations, via ON DELETE CASCADE) is removed at the end.
+
+Usage:
+    python scripts/bench_donaciones.py --threads 16 --donaciones 200
+    python scripts/bench_donaciones.py --modo legacy   # create + sumar_al_proyecto (two commits)
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from init_db import get_db_connection
+from src.models.ModelDonacion import ModelDonacion
+from src.models.entities.donacion import Donacion
+
+
+def _worker(modo, id_usuario, id_proyecto, cantidad, errores, latencias):
+    conn = get_db_connection()
+    try:
+        for _ in range(cantidad):
+            donacion = Donacion(None, id_usuario, id_proyecto, 1.0, None)
+            inicio = time.perf_counter()
+            try:
+                if modo == 'atomico':
+                    ok, _ = ModelDonacion.donar(conn, donacion)
+                    if not ok:
+                        errores.append(1)
+                else:
+                    ModelDonacion.create(conn, donacion)
+                    ModelDonacion.sumar_al_proyecto(conn, id_proyecto, 1.0)
+            except Exception:
+                errores.append(1)
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de donaciones concurrentes a un mismo proyecto")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--donaciones', type=int, default=100, help="donaciones por hilo")
+    parser.add_argument('--modo', choices=['atomico', 'legacy'], default='atomico')
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+    row = cursor.fetchone()
+    if row is None:
+        print("❌ No hay usuarios; ejecute primero scripts/init_db.py")
+        sys.exit(1)
+    id_usuario = row[0]
+    cursor.execute("""
+        INSERT INTO proyectos (nombre, descripcion, monto_objetivo, monto_recaudado, id_usuario, estado)
+        VALUES ('bench-donaciones', 'Proyecto temporal de benchmark', 1000000, 0, %s, 'en_ejecucion')
+        RETURNING id_proyecto
+    """, (id_usuario,))
+    id_proyecto = cursor.fetchone()[0]
+    conn.commit()
+
+    errores = []
+    latencias = []
+    hilos = [
+        threading.Thread(target=_worker, args=(args.modo, id_usuario, id_proyecto, args.donaciones, errores, latencias))
+        for _ in range(args.threads)
+    ]
+    try:
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        cursor.execute("""
+            SELECT p.monto_recaudado, COALESCE(SUM(d.monto), 0), COUNT(d.id_donacion)
+            FROM proyectos p LEFT JOIN donaciones d ON d.id_proyecto = p.id_proyecto
+            WHERE p.id_proyecto = %s GROUP BY p.monto_recaudado
+        """, (id_proyecto,))
+        recaudado, suma, total = cursor.fetchone()
+        conn.commit()
+
+        latencias.sort()
+        p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+        print(f"Modo: {args.modo}  hilos: {args.threads}  donaciones: {total}  errores: {len(errores)}")
+        print(f"Throughput: {total / duracion:.1f} donaciones/s  ({duracion:.2f} s)")
+        print(f"Latencia p50: {latencias[len(latencias) // 2] * 1000:.1f} ms  p95: {p95 * 1000:.1f} ms")
+        print(f"Consistencia: monto_recaudado={recaudado} suma={suma} -> {'OK' if recaudado == suma else 'DESFASE'}")
+    finally:
+        cursor.execute("DELETE FROM proyectos WHERE id_proyecto = %s", (id_proyecto,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Background worker for export jobs (auditor PDF reports).
+
+The web app only inserts a row in trabajos_exportacion; this worker claims pending
+jobs (FOR UPDATE SKIP LOCKED), renders them in a process pool and stores the file
+in EXPORT_DIR, where the auditor downloads it once the job is 'completado'.
+Only PostgreSQL is needed, no external broker. Several workers can run at once.
+
+Usage:
+    python scripts/export_worker.py                 # run forever
+    python scripts/export_worker.py --procesos 4    # size of the process pool
+    python scripts/export_worker.py --una-vez       # drain the queue and exit
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.utils.trabajos import ejecutar_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker de trabajos de exportación")
+    parser.add_argument('--procesos', type=int, default=None, help="procesos del pool (EXPORT_WORKERS)")
+    parser.add_argument('--intervalo', type=float, default=None, help="segundos entre consultas a la cola")
+    parser.add_argument('--una-vez', action='store_true', help="procesar los trabajos pendientes y salir")
+    args = parser.parse_args(argv)
+
+    try:
+        ejecutar_worker(args.procesos, args.intervalo, args.una_vez)
+    except KeyboardInterrupt:
+        print("\nWorker detenido")
+
+
+if __name__ == '__main__':
+    main()
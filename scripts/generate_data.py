@@ -0,0 +1,523 @@
+"""
+Synthetic data generator for scale and performance testing.
+
+Fills an initialized database (scripts/init_db.py) with users, projects, donations,
+expenses (with fake receipt files), objectives, tasks and audit rows. The data has
+realistic skew: a few hot projects receive most donations (Zipf), a few power donors
+make most of them, and dates follow seasonal peaks (December, May) and platform growth.
+Rows are loaded with COPY in batches inside a single transaction.
+
+The output is deterministic: the same --semilla, --hasta (default HASTA_DEFAULT, a fixed
+date) and volumes produce the same rows (each table uses its own random stream, so
+changing one volume does not reshuffle the others). Generated users are named gen_<rol>_<n> (e.g. gen_donador_1,
+gen_coordinador_1, gen_auditor_1) and all share the password in PASSWORD_GENERADA.
+
+Usage:
+    python scripts/generate_data.py                          # --escala pequena
+    python scripts/generate_data.py --escala produccion      # 100k users, 5M donations...
+    python scripts/generate_data.py --escala mediana --donaciones 2000000 --semilla 7
+    python scripts/generate_data.py --escala pequena --hasta 2026-06-30 --sin-archivos
+"""
+import argparse
+import bisect
+import csv
+import io
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from init_db import get_db_connection
+from src.utils.file_upload import UPLOAD_FOLDER
+
+PASSWORD_GENERADA = 'generado123'
+PREFIJO = 'gen_'
+LOTE_COPY = 100_000
+# Último día de la ventana de fechas por defecto: fijo para que dos ejecuciones sin --hasta
+# generen las mismas filas
+HASTA_DEFAULT = date(2025, 12, 31)
+
+# Volúmenes por escala: usuarios, proyectos, donaciones, gastos, auditoria
+ESCALAS = {
+    'pequena': {'usuarios': 1_000, 'proyectos': 100, 'donaciones': 20_000, 'gastos': 2_000, 'auditoria': 10_000},
+    'mediana': {'usuarios': 10_000, 'proyectos': 1_000, 'donaciones': 500_000, 'gastos': 50_000,
+                'auditoria': 100_000},
+    'produccion': {'usuarios': 100_000, 'proyectos': 10_000, 'donaciones': 5_000_000, 'gastos': 500_000,
+                   'auditoria': 1_000_000},
+}
+
+# Triggers por fila de project_stats: se desactivan durante la carga y la tabla se
+# recalcula al final con una sola consulta (igual que la carga inicial de 0007)
+TRIGGERS_POR_FILA = {
+    'donaciones': 'trg_project_stats_donaciones',
+    'gastos': 'trg_project_stats_gastos',
+    'objetivos': 'trg_project_stats_objetivos',
+    'tareas': 'trg_project_stats_tareas',
+}
+
+NOMBRES = ['María', 'José', 'Juan', 'Guadalupe', 'Luis', 'Ana', 'Carlos', 'Sofía', 'Miguel', 'Valeria',
+           'Jorge', 'Fernanda', 'Pedro', 'Daniela', 'Alejandro', 'Camila', 'Ricardo', 'Lucía', 'Diego', 'Paola']
+APELLIDOS = ['Hernández', 'García', 'Martínez', 'López', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+             'Ramírez', 'Cruz', 'Flores', 'Gómez', 'Morales', 'Vázquez', 'Reyes', 'Jiménez', 'Torres', 'Ruiz']
+TIPOS_PROYECTO = ['Comedor', 'Biblioteca', 'Escuela', 'Huerto', 'Taller', 'Clínica', 'Refugio', 'Becas',
+                  'Pozo de agua', 'Centro comunitario', 'Dispensario', 'Guardería', 'Cancha', 'Albergue']
+COMPLEMENTOS = ['comunitario', 'infantil', 'para adultos mayores', 'rural', 'escolar', 'de mujeres',
+                'para jóvenes', 'indígena', 'de emergencia', 'municipal', 'solidario', 'itinerante']
+LUGARES = ['Oaxaca', 'Chiapas', 'Guerrero', 'Puebla', 'Hidalgo', 'Michoacán', 'Veracruz', 'Zacatecas',
+           'Durango', 'Yucatán', 'Tlaxcala', 'Morelos', 'Sonora', 'Nayarit', 'Tabasco', 'Campeche']
+FRASES = ['Busca mejorar las condiciones de vida de las familias de la zona.',
+          'Los fondos se destinan a materiales, equipo y capacitación.',
+          'El proyecto es coordinado por voluntarios de la comunidad.',
+          'Se atiende a niñas y niños en situación vulnerable.',
+          'Incluye talleres de formación y seguimiento mensual.',
+          'La meta cubre la operación durante el primer año.',
+          'Cuenta con el apoyo de autoridades locales.']
+DESCRIPCIONES_GASTO = ['Compra de materiales', 'Pago de servicios', 'Reparación', 'Transporte de insumos',
+                       'Honorarios', 'Compra de equipo', 'Alimentos para la semana', 'Papelería']
+TAREAS = ['Cotizar materiales', 'Visitar la comunidad', 'Reunión con voluntarios', 'Entregar insumos',
+          'Preparar informe mensual', 'Actualizar inventario', 'Registrar asistentes', 'Contratar transporte']
+OBJETIVOS = ['Completar la primera etapa', 'Equipar las instalaciones', 'Capacitar a los voluntarios',
+             'Atender a 100 beneficiarios', 'Publicar el informe de resultados']
+
+# PDF mínimo válido que se usa para todos los recibos (se enlaza, no se copia)
+PDF_RECIBO = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+              b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+              b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 200 200]>>endobj\n"
+              b"trailer<</Root 1 0 R>>\n%%EOF\n")
+
+
+def _rng(semilla, tabla):
+    """Flujo aleatorio propio de cada tabla (las semillas str son estables entre ejecuciones)."""
+    return random.Random(f"{semilla}:{tabla}")
+
+
+def _acumulados(pesos):
+    acumulado = []
+    total = 0.0
+    for peso in pesos:
+        total += peso
+        acumulado.append(total)
+    return acumulado
+
+
+def _zipf(n, s, rng):
+    """
+    Pesos acumulados Zipf (1/rango^s) sobre n elementos en orden aleatorio, para que
+    los elementos "calientes" no sean siempre los primeros ids.
+    """
+    orden = list(range(n))
+    rng.shuffle(orden)
+    pesos = [0.0] * n
+    for rango, indice in enumerate(orden):
+        pesos[indice] = 1.0 / (rango + 1) ** s
+    return _acumulados(pesos)
+
+
+def _pesos_dias(inicio, dias):
+    """
+    Peso de cada día de la ventana: crecimiento de la plataforma, picos estacionales
+    (diciembre, mayo y noviembre) y menos actividad en fin de semana.
+    """
+    pesos = []
+    for d in range(dias):
+        dia = inicio + timedelta(days=d)
+        peso = 0.4 + d / dias
+        if dia.month == 12:
+            peso *= 2.5
+        elif dia.month == 11:
+            peso *= 1.5
+        elif dia.month == 5:
+            peso *= 1.3
+        if dia.weekday() >= 5:
+            peso *= 0.8
+        pesos.append(peso)
+    return _acumulados(pesos)
+
+
+# Más actividad por la tarde y la noche
+PESOS_HORAS = _acumulados([1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 9, 10, 10, 9, 9, 10, 11, 13, 14, 13, 10, 6, 3])
+
+
+class Calendario:
+    """Muestreo de fechas estacionales dentro de la ventana [inicio, hasta]."""
+
+    def __init__(self, hasta, anios):
+        self.hasta = hasta
+        self.dias = max(1, int(anios * 365))
+        self.inicio = hasta - timedelta(days=self.dias - 1)
+        self.acumulado = _pesos_dias(self.inicio, self.dias)
+
+    def dia(self, rng, desde=0, hasta=None):
+        """Índice de día con la distribución estacional, condicionado a [desde, hasta)."""
+        hasta = self.dias if hasta is None else hasta
+        bajo = self.acumulado[desde - 1] if desde > 0 else 0.0
+        alto = self.acumulado[hasta - 1]
+        return min(max(bisect.bisect_left(self.acumulado, rng.uniform(bajo, alto)), desde), hasta - 1)
+
+    def momento(self, rng, indice_dia):
+        hora = bisect.bisect_left(PESOS_HORAS, rng.uniform(0, PESOS_HORAS[-1]))
+        return datetime.combine(self.inicio + timedelta(days=indice_dia), datetime.min.time()) + timedelta(
+            hours=hora, minutes=rng.randrange(60), seconds=rng.randrange(60))
+
+    def fecha(self, indice_dia):
+        return self.inicio + timedelta(days=indice_dia)
+
+
+def _monto(rng, mediana, sigma, minimo, maximo):
+    return round(min(max(rng.lognormvariate(math.log(mediana), sigma), minimo), maximo), 2)
+
+
+def _copiar(cursor, tabla, columnas, filas):
+    """Carga las filas (iterable) con COPY ... FROM STDIN en lotes de LOTE_COPY; retorna el total."""
+    sql = f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    pendientes = 0
+    for fila in filas:
+        writer.writerow(fila)
+        pendientes += 1
+        if pendientes == LOTE_COPY:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += pendientes
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            pendientes = 0
+    if pendientes:
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        total += pendientes
+    return total
+
+
+def _cargar(cursor, tabla, columnas, filas):
+    inicio = time.perf_counter()
+    total = _copiar(cursor, tabla, columnas, filas)
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {tabla}: {total:,} filas en {duracion:.1f} s ({total / max(duracion, 1e-9):,.0f} filas/s)")
+    return total
+
+
+def _roles(total):
+    """Reparto de usuarios por rol: [(nombre_rol, id_rol, cantidad)]."""
+    admins = max(1, total // 5000)
+    auditores = max(1, total // 1000)
+    coordinadores = max(1, total // 100)
+    donadores = max(1, total - admins - auditores - coordinadores)
+    return [('admin', 2, admins), ('auditor', 4, auditores),
+            ('coordinador', 3, coordinadores), ('donador', 1, donadores)]
+
+
+def generar_usuarios(semilla, total, hash_password):
+    rng = _rng(semilla, 'usuarios')
+    for rol, id_rol, cantidad in _roles(total):
+        for n in range(1, cantidad + 1):
+            nombre = f"{PREFIJO}{rol}_{n}"
+            fullname = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+            telefono = f"55{rng.randrange(10**8):08d}"
+            yield (nombre, f"{nombre}@example.test", hash_password, fullname, id_rol, telefono)
+
+
+def generar_proyectos(semilla, total, coordinadores, calendario):
+    """Proyectos de coordinadores (algunos coordinan muchos); retorna también su día de creación."""
+    rng = _rng(semilla, 'proyectos')
+    pesos_coordinador = _zipf(len(coordinadores), 0.8, rng)
+    creacion = []
+    filas = []
+    # Los proyectos se crean en el primer 90 % de la ventana para que todos reciban donaciones
+    limite = max(1, int(calendario.dias * 0.9))
+    for _ in range(total):
+        dia = calendario.dia(rng, 0, limite)
+        estado = rng.choices(['en_planificacion', 'en_ejecucion', 'finalizado'], [15, 70, 15])[0]
+        archivado = estado == 'finalizado' and rng.random() < 0.3
+        nombre = f"{rng.choice(TIPOS_PROYECTO)} {rng.choice(COMPLEMENTOS)} en {rng.choice(LUGARES)}"
+        descripcion = ' '.join(rng.sample(FRASES, 3))
+        id_usuario = coordinadores[bisect.bisect_left(pesos_coordinador, rng.uniform(0, pesos_coordinador[-1]))]
+        monto_objetivo = round(_monto(rng, 20000, 0.9, 1000, 2_000_000), -2)
+        fecha = calendario.momento(rng, dia)
+        archivado_en = fecha + timedelta(days=rng.randint(180, 400)) if archivado else None
+        creacion.append(dia)
+        filas.append((nombre, descripcion, monto_objetivo, 0, estado, fecha, id_usuario,
+                      't' if archivado else 'f', archivado_en, id_usuario if archivado else None))
+    return filas, creacion
+
+
+def generar_donaciones(semilla, total, donadores, proyectos, creacion, calendario):
+    """Proyectos calientes (Zipf 1.1), donadores frecuentes (Zipf 0.9) y montos log-normales."""
+    rng = _rng(semilla, 'donaciones')
+    pesos_proyecto = _zipf(len(proyectos), 1.1, rng)
+    pesos_donador = _zipf(len(donadores), 0.9, rng)
+    tope_proyecto = pesos_proyecto[-1]
+    tope_donador = pesos_donador[-1]
+    for _ in range(total):
+        indice = bisect.bisect_left(pesos_proyecto, rng.uniform(0, tope_proyecto))
+        id_donador = donadores[bisect.bisect_left(pesos_donador, rng.uniform(0, tope_donador))]
+        dia = calendario.dia(rng, creacion[indice])
+        yield (id_donador, proyectos[indice], _monto(rng, 30, 1.0, 1, 50_000), calendario.momento(rng, dia))
+
+
+def generar_gastos(semilla, total, proyectos, duenos, creacion, categorias, calendario, recibos, prefijo_archivo):
+    rng = _rng(semilla, 'gastos')
+    pesos_proyecto = _zipf(len(proyectos), 0.9, rng)
+    tope = pesos_proyecto[-1]
+    for n in range(1, total + 1):
+        indice = bisect.bisect_left(pesos_proyecto, rng.uniform(0, tope))
+        dia = calendario.dia(rng, creacion[indice])
+        archivo_nombre = archivo_path = None
+        if rng.random() < recibos:
+            archivo_nombre = f"recibo_{n}.pdf"
+            archivo_path = os.path.join(UPLOAD_FOLDER, f"{prefijo_archivo}{n}.pdf")
+        yield (proyectos[indice], duenos[indice], rng.choice(categorias),
+               f"{rng.choice(DESCRIPCIONES_GASTO)} #{n}", _monto(rng, 800, 1.1, 10, 200_000),
+               calendario.fecha(dia), archivo_nombre, archivo_path, calendario.momento(rng, dia))
+
+
+def generar_objetivos(semilla, proyectos, creacion, estados, calendario):
+    rng = _rng(semilla, 'objetivos')
+    for id_proyecto, dia, estado in zip(proyectos, creacion, estados):
+        for descripcion in rng.sample(OBJETIVOS, rng.randint(2, 4)):
+            completado = estado == 'finalizado' or (estado == 'en_ejecucion' and rng.random() < 0.4)
+            yield (id_proyecto, descripcion, 't' if completado else 'f', calendario.momento(rng, dia))
+
+
+def generar_tareas(semilla, proyectos, duenos, creacion, estados, calendario):
+    rng = _rng(semilla, 'tareas')
+    for id_proyecto, id_usuario, dia, estado in zip(proyectos, duenos, creacion, estados):
+        for _ in range(rng.randint(3, 10)):
+            if estado == 'finalizado':
+                estado_tarea = 'completada'
+            elif estado == 'en_planificacion':
+                estado_tarea = 'pendiente'
+            else:
+                estado_tarea = rng.choices(['pendiente', 'en_progreso', 'completada'], [3, 2, 5])[0]
+            inicio = calendario.fecha(calendario.dia(rng, dia))
+            yield (f"{rng.choice(TAREAS)}", estado_tarea, inicio, inicio + timedelta(days=rng.randint(1, 60)),
+                   id_usuario, id_proyecto, calendario.momento(rng, dia))
+
+
+def generar_auditoria(semilla, total, usuarios, calendario):
+    """Acciones de la aplicación (log_action) concentradas en los usuarios más activos."""
+    rng = _rng(semilla, 'auditoria')
+    ids = list(usuarios.values())
+    nombres = list(usuarios.keys())
+    pesos = _zipf(len(ids), 1.0, rng)
+    tope = pesos[-1]
+    acciones = [
+        (40, lambda nombre: f"Inicio de sesión exitoso - Usuario: {nombre}"),
+        (25, lambda nombre: f"Cierre de sesión - Usuario: {nombre}"),
+        (15, lambda nombre: "Consulta de reportes de donaciones"),
+        (8, lambda nombre: "Consulta de reportes de gastos"),
+        (6, lambda nombre: "Consulta de registros de auditoría"),
+        (4, lambda nombre: "Exportación de donaciones a Excel"),
+        (2, lambda nombre: "Exportación de gastos a Excel"),
+    ]
+    pesos_accion = _acumulados([peso for peso, _ in acciones])
+    for _ in range(total):
+        indice = bisect.bisect_left(pesos, rng.uniform(0, tope))
+        accion = acciones[bisect.bisect_left(pesos_accion, rng.uniform(0, pesos_accion[-1]))][1]
+        yield (ids[indice], accion(nombres[indice]), calendario.momento(rng, calendario.dia(rng)))
+
+
+def escribir_recibos(cursor, prefijo_archivo):
+    """Crea los archivos de recibo referenciados por los gastos generados (enlaces a un PDF mínimo)."""
+    directorio = os.path.join(ROOT, UPLOAD_FOLDER)
+    os.makedirs(directorio, exist_ok=True)
+    plantilla = os.path.join(directorio, f"{prefijo_archivo}plantilla.pdf")
+    with open(plantilla, 'wb') as archivo:
+        archivo.write(PDF_RECIBO)
+    cursor.execute("SELECT archivo_path FROM gastos WHERE archivo_path LIKE %s",
+                   (os.path.join(UPLOAD_FOLDER, prefijo_archivo).replace('_', '\\_') + '%',))
+    total = 0
+    for (ruta,) in cursor:
+        destino = os.path.join(ROOT, ruta)
+        if os.path.exists(destino):
+            continue
+        try:
+            os.link(plantilla, destino)
+        except OSError:  # Sistemas de archivos sin enlaces duros
+            with open(destino, 'wb') as archivo:
+                archivo.write(PDF_RECIBO)
+        total += 1
+    print(f"✅ Recibos: {total:,} archivos en {directorio}")
+
+
+def recalcular_agregados(cursor, id_minimo):
+    """
+    Recalcula monto_recaudado y project_stats de los proyectos generados (ids >= id_minimo),
+    que no se mantuvieron por fila durante la carga.
+    """
+    cursor.execute("""
+        UPDATE proyectos p SET monto_recaudado = d.suma
+        FROM (SELECT id_proyecto, SUM(monto) AS suma FROM donaciones
+              WHERE id_proyecto >= %(minimo)s GROUP BY id_proyecto) d
+        WHERE p.id_proyecto = d.id_proyecto
+    """, {'minimo': id_minimo})
+    cursor.execute("""
+        INSERT INTO project_stats (id_proyecto, total_donaciones, suma_donaciones, suma_gastos, ultima_donacion,
+                                   objetivos_total, objetivos_completados, tareas_total, tareas_completadas)
+        SELECT p.id_proyecto,
+               COALESCE(d.total, 0), COALESCE(d.suma, 0), COALESCE(g.suma, 0), d.ultima,
+               COALESCE(o.total, 0), COALESCE(o.completados, 0),
+               COALESCE(t.total, 0), COALESCE(t.completadas, 0)
+        FROM proyectos p
+        LEFT JOIN (
+            SELECT id_proyecto, COUNT(*) AS total, SUM(monto) AS suma, MAX(fecha_donacion) AS ultima
+            FROM donaciones WHERE id_proyecto >= %(minimo)s GROUP BY id_proyecto
+        ) d ON d.id_proyecto = p.id_proyecto
+        LEFT JOIN (
+            SELECT id_proyecto, SUM(monto) AS suma FROM gastos WHERE id_proyecto >= %(minimo)s GROUP BY id_proyecto
+        ) g ON g.id_proyecto = p.id_proyecto
+        LEFT JOIN (
+            SELECT id_proyecto, COUNT(*) AS total, COUNT(*) FILTER (WHERE completado) AS completados
+            FROM objetivos WHERE id_proyecto >= %(minimo)s GROUP BY id_proyecto
+        ) o ON o.id_proyecto = p.id_proyecto
+        LEFT JOIN (
+            SELECT proyecto_id, COUNT(*) AS total, COUNT(*) FILTER (WHERE estado = 'completada') AS completadas
+            FROM tareas WHERE proyecto_id >= %(minimo)s GROUP BY proyecto_id
+        ) t ON t.proyecto_id = p.id_proyecto
+        WHERE p.id_proyecto >= %(minimo)s
+        ON CONFLICT (id_proyecto) DO UPDATE SET
+            total_donaciones = EXCLUDED.total_donaciones,
+            suma_donaciones = EXCLUDED.suma_donaciones,
+            suma_gastos = EXCLUDED.suma_gastos,
+            ultima_donacion = EXCLUDED.ultima_donacion,
+            objetivos_total = EXCLUDED.objetivos_total,
+            objetivos_completados = EXCLUDED.objetivos_completados,
+            tareas_total = EXCLUDED.tareas_total,
+            tareas_completadas = EXCLUDED.tareas_completadas,
+            actualizado_en = CURRENT_TIMESTAMP
+    """, {'minimo': id_minimo})
+    print("✅ monto_recaudado y project_stats recalculados")
+
+
+def generar(conn, args):
+    from werkzeug.security import generate_password_hash
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM usuarios WHERE nombre LIKE %s LIMIT 1", (PREFIJO.replace('_', '\\_') + '%',))
+    if cursor.fetchone() is not None:
+        print(f"❌ La base ya contiene datos generados (usuarios {PREFIJO}*). Use una base nueva "
+              "(scripts/init_db.py sobre una base vacía).")
+        sys.exit(1)
+    cursor.execute("SELECT nombre FROM categorias_gasto ORDER BY nombre")
+    categorias = [fila[0] for fila in cursor.fetchall()]
+    if not categorias:
+        print("❌ No hay categorías de gasto; ejecute primero scripts/init_db.py")
+        sys.exit(1)
+
+    calendario = Calendario(args.hasta, args.anios)
+    prefijo_archivo = f"{PREFIJO}{args.semilla}_"
+
+    # Usuarios: los ids se leen de vuelta por nombre
+    _cargar(cursor, 'usuarios', ('nombre', 'correo', 'password', 'fullname', 'id_rol', 'telefono'),
+            generar_usuarios(args.semilla, args.usuarios, generate_password_hash(PASSWORD_GENERADA)))
+    cursor.execute("SELECT nombre, id FROM usuarios WHERE nombre LIKE %s ORDER BY id",
+                   (PREFIJO.replace('_', '\\_') + '%',))
+    usuarios = dict(cursor.fetchall())
+    coordinadores = [id_ for nombre, id_ in usuarios.items() if nombre.startswith(f"{PREFIJO}coordinador_")]
+    donadores = [id_ for nombre, id_ in usuarios.items() if nombre.startswith(f"{PREFIJO}donador_")]
+
+    # Proyectos: COPY asigna los ids del serial en el orden de las filas; con la tabla
+    # bloqueada, los ids nuevos son exactamente los mayores al máximo previo
+    cursor.execute("LOCK TABLE proyectos IN EXCLUSIVE MODE")
+    cursor.execute("SELECT COALESCE(MAX(id_proyecto), 0) FROM proyectos")
+    id_previo = cursor.fetchone()[0]
+    filas, creacion = generar_proyectos(args.semilla, args.proyectos, coordinadores, calendario)
+    _cargar(cursor, 'proyectos', ('nombre', 'descripcion', 'monto_objetivo', 'monto_recaudado', 'estado',
+                                  'fecha_creacion', 'id_usuario', 'archivado', 'archivado_en', 'archivado_por'),
+            filas)
+    cursor.execute("SELECT id_proyecto FROM proyectos WHERE id_proyecto > %s ORDER BY id_proyecto", (id_previo,))
+    proyectos = [fila[0] for fila in cursor.fetchall()]
+    duenos = [fila[6] for fila in filas]
+    estados = [fila[4] for fila in filas]
+
+    for tabla, trigger in TRIGGERS_POR_FILA.items():
+        cursor.execute(f"ALTER TABLE {tabla} DISABLE TRIGGER {trigger}")
+
+    _cargar(cursor, 'donaciones', ('id_usuario', 'id_proyecto', 'monto', 'fecha_donacion'),
+            generar_donaciones(args.semilla, args.donaciones, donadores, proyectos, creacion, calendario))
+    _cargar(cursor, 'gastos', ('id_proyecto', 'id_usuario', 'categoria', 'descripcion', 'monto', 'fecha_gasto',
+                               'archivo_nombre', 'archivo_path', 'creado_en'),
+            generar_gastos(args.semilla, args.gastos, proyectos, duenos, creacion, categorias, calendario,
+                           args.recibos, prefijo_archivo))
+    _cargar(cursor, 'objetivos', ('id_proyecto', 'descripcion', 'completado', 'fecha_creacion'),
+            generar_objetivos(args.semilla, proyectos, creacion, estados, calendario))
+    _cargar(cursor, 'tareas', ('descripcion', 'estado', 'fecha_inicio', 'fecha_fin', 'usuario_id', 'proyecto_id',
+                               'creado_en'),
+            generar_tareas(args.semilla, proyectos, duenos, creacion, estados, calendario))
+    _cargar(cursor, 'auditoria', ('usuario_id', 'accion', 'fecha'),
+            generar_auditoria(args.semilla, args.auditoria, usuarios, calendario))
+
+    for tabla, trigger in TRIGGERS_POR_FILA.items():
+        cursor.execute(f"ALTER TABLE {tabla} ENABLE TRIGGER {trigger}")
+    recalcular_agregados(cursor, id_previo + 1)
+
+    conn.commit()
+    print("✅ Datos confirmados")
+
+    if not args.sin_archivos:
+        escribir_recibos(cursor, prefijo_archivo)
+
+    # Estadísticas del planificador al día antes de medir nada
+    conn.autocommit = True
+    for tabla in ('usuarios', 'proyectos', 'donaciones', 'gastos', 'objetivos', 'tareas', 'auditoria',
+                  'project_stats'):
+        cursor.execute(f"ANALYZE {tabla}")
+    conn.autocommit = False
+    cursor.close()
+
+    if not args.sin_rollups:
+        from src.utils.rollups import ejecutar_rollups
+        print("🔄 Actualizando rollups...")
+        ejecutar_rollups(conn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos reproducibles para pruebas de escala")
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='pequena',
+                        help="volúmenes predefinidos (los parámetros siguientes los reemplazan)")
+    for tabla in ('usuarios', 'proyectos', 'donaciones', 'gastos', 'auditoria'):
+        parser.add_argument(f'--{tabla}', type=int, default=None, help=f"cantidad de filas de {tabla}")
+    parser.add_argument('--recibos', type=float, default=0.3,
+                        help="fracción de gastos con archivo de recibo (por defecto 0.3)")
+    parser.add_argument('--semilla', type=int, default=1, help="semilla del generador (por defecto 1)")
+    parser.add_argument('--hasta', type=date.fromisoformat, default=HASTA_DEFAULT,
+                        help=f"último día de la ventana de fechas, AAAA-MM-DD (por defecto {HASTA_DEFAULT})")
+    parser.add_argument('--anios', type=float, default=3, help="años de historia (por defecto 3)")
+    parser.add_argument('--sin-archivos', action='store_true', help="no crear los archivos de recibo")
+    parser.add_argument('--sin-rollups', action='store_true', help="no actualizar los rollups al terminar")
+    args = parser.parse_args(argv)
+
+    for tabla, cantidad in ESCALAS[args.escala].items():
+        if getattr(args, tabla) is None:
+            setattr(args, tabla, cantidad)
+    if args.usuarios < 4 or args.proyectos < 1:
+        parser.error("se requieren al menos 4 usuarios (uno por rol) y 1 proyecto")
+
+    print(f"🚀 Generando datos (semilla {args.semilla}, hasta {args.hasta}): {args.usuarios:,} usuarios, "
+          f"{args.proyectos:,} proyectos, {args.donaciones:,} donaciones, {args.gastos:,} gastos, "
+          f"{args.auditoria:,} registros de auditoría")
+    conn = get_db_connection()
+    inicio = time.perf_counter()
+    try:
+        generar(conn, args)
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error al generar datos: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f"\n✅ Listo en {time.perf_counter() - inicio:.1f} s. Para reproducir: --semilla {args.semilla} "
+          f"--hasta {args.hasta}")
+    print(f"   Usuarios: {PREFIJO}donador_1, {PREFIJO}coordinador_1, {PREFIJO}auditor_1, {PREFIJO}admin_1 "
+          f"(contraseña: {PASSWORD_GENERADA})")
+
+
+if __name__ == '__main__':
+    main()
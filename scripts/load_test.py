@@ -0,0 +1,403 @@
+"""
+End-to-end load test against a running instance of the application.
+
+Simulates concurrent users with the traffic mix of production: donors browsing and
+searching /proyectos, opening projects and donating; coordinators opening their
+panel, project management pages, donations and expenses; auditors reading reports
+and exporting them (Excel, CSV, PDF jobs). Each virtual user is a thread with its own
+HTTP session (login + CSRF like a browser). Requests are grouped by route template
+(e.g. "GET /proyecto/<id>") and the report shows p50/p95/p99 latency, throughput and
+error rate per route. Results are saved as JSON so runs can be compared across releases.
+
+Intended to run against data from scripts/generate_data.py (users gen_donador_N,
+gen_coordinador_N and gen_auditor_N with its password). The donor scenario writes
+donations, so use a disposable database.
+
+Usage:
+    python scripts/load_test.py --url http://127.0.0.1:5000 --usuarios 50 --duracion 120
+    python scripts/load_test.py --mezcla donador=1 --usuarios 20 --salida base.json
+    python scripts/load_test.py --salida nuevo.json --comparar base.json --tolerancia 20
+"""
+import argparse
+import html
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Contraseña de los usuarios de scripts/generate_data.py (PASSWORD_GENERADA)
+PASSWORD_DEFAULT = 'generado123'
+
+# Proporción de usuarios virtuales por rol (se puede cambiar con --mezcla)
+MEZCLA_DEFAULT = {'donador': 70, 'coordinador': 20, 'auditor': 10}
+
+BUSQUEDAS = ['comedor', 'biblioteca', 'escuela', 'huerto', 'agua', 'oaxaca', 'infantil', 'becas']
+
+_CSRF = re.compile(r'name="csrf_token"\s+value="([^"]+)"')
+_PROYECTOS = re.compile(r'href="/proyecto/(\d+)"')
+_SIGUIENTE = re.compile(r'href="(/proyectos\?after=[^"]+)"')
+_GESTION = re.compile(r'href="/coordinador/proyecto/(\d+)/gestion"')
+
+
+class ErrorEscenario(Exception):
+    """El escenario no puede continuar (p. ej. falló el inicio de sesión)."""
+
+
+class Resultados:
+    """Latencias y códigos de estado por ruta, compartidos por todos los hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.codigos = defaultdict(lambda: defaultdict(int))
+        self.errores = defaultdict(int)
+        self.medir = False
+
+    def registrar(self, ruta, duracion, codigo, error):
+        if not self.medir:
+            return
+        with self._lock:
+            self.latencias[ruta].append(duracion)
+            self.codigos[ruta][codigo] += 1
+            if error:
+                self.errores[ruta] += 1
+
+
+def _percentil(ordenados, p):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not ordenados:
+        return None
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class UsuarioVirtual:
+    """Sesión HTTP de un usuario: inicia sesión y ejecuta su escenario hasta el final de la prueba."""
+
+    def __init__(self, args, rol, numero, resultados, semilla):
+        self.args = args
+        self.rol = rol
+        self.nombre = f"gen_{rol}_{numero}"
+        self.resultados = resultados
+        self.rng = random.Random(f"{semilla}:{rol}:{numero}")
+        self.sesion = requests.Session()
+        self.proyectos = []
+
+    def peticion(self, metodo, ruta, url, **kwargs):
+        """
+        Ejecuta una petición sin seguir redirecciones (cada una se mide en su propia ruta).
+        Es error: excepción de red, código >= 400 o redirección al login (sesión perdida).
+        """
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.sesion.request(metodo, self.args.url + url, allow_redirects=False,
+                                            timeout=self.args.timeout, **kwargs)
+        except requests.RequestException:
+            self.resultados.registrar(f"{metodo} {ruta}", time.perf_counter() - inicio, 'error_red', True)
+            return None
+        duracion = time.perf_counter() - inicio
+        error = respuesta.status_code >= 400 or (
+            respuesta.is_redirect and '/login' in respuesta.headers.get('Location', '') and ruta != '/login')
+        self.resultados.registrar(f"{metodo} {ruta}", duracion, respuesta.status_code, error)
+        return respuesta
+
+    def _csrf(self, respuesta):
+        encontrado = _CSRF.search(respuesta.text) if respuesta is not None else None
+        return encontrado.group(1) if encontrado else None
+
+    def login(self):
+        respuesta = self.peticion('GET', '/login', '/login')
+        token = self._csrf(respuesta)
+        respuesta = self.peticion('POST', '/login', '/login', data={
+            'nombre': self.nombre, 'password': self.args.password, 'csrf_token': token or ''
+        })
+        if respuesta is None or not respuesta.is_redirect:
+            raise ErrorEscenario(f"no se pudo iniciar sesión como {self.nombre}")
+
+    def pausa(self):
+        if self.args.pausa > 0:
+            time.sleep(self.rng.expovariate(1 / self.args.pausa))
+
+    # --- Escenarios -------------------------------------------------------------------
+
+    def donador(self):
+        """Navega el catálogo (orden, búsqueda, páginas), abre proyectos y a veces dona."""
+        azar = self.rng.random()
+        if azar < 0.2:
+            respuesta = self.peticion('GET', '/proyectos?q', f"/proyectos?q={self.rng.choice(BUSQUEDAS)}")
+        else:
+            orden = 'avance' if azar < 0.35 else 'recientes'
+            respuesta = self.peticion('GET', '/proyectos', f"/proyectos?orden={orden}")
+            siguiente = _SIGUIENTE.search(respuesta.text) if respuesta is not None else None
+            if siguiente and self.rng.random() < 0.3:
+                self.pausa()
+                respuesta = self.peticion('GET', '/proyectos?after', html.unescape(siguiente.group(1)))
+        if respuesta is not None and respuesta.status_code == 200:
+            self.proyectos = _PROYECTOS.findall(respuesta.text) or self.proyectos
+        if not self.proyectos:
+            return
+        self.pausa()
+
+        id_proyecto = self.rng.choice(self.proyectos)
+        self.peticion('GET', '/proyecto/<id>', f"/proyecto/{id_proyecto}")
+        if self.rng.random() < 0.25:
+            self.pausa()
+            respuesta = self.peticion('GET', '/proyecto/<id>/donar', f"/proyecto/{id_proyecto}/donar")
+            token = self._csrf(respuesta)
+            if token:
+                self.pausa()
+                monto = round(min(self.rng.lognormvariate(math.log(30), 1.0), 5000), 2)
+                self.peticion('POST', '/proyecto/<id>/donar', f"/proyecto/{id_proyecto}/donar",
+                              data={'monto': monto, 'csrf_token': token})
+        if self.rng.random() < 0.1:
+            self.pausa()
+            self.peticion('GET', '/donaciones/historial', '/donaciones/historial')
+
+    def coordinador(self):
+        """Panel, gestión del proyecto, sus donaciones y gastos, y reportes."""
+        if not self.proyectos or self.rng.random() < 0.2:
+            respuesta = self.peticion('GET', '/coordinador', '/coordinador')
+            if respuesta is not None and respuesta.status_code == 200:
+                self.proyectos = _GESTION.findall(respuesta.text) or self.proyectos
+            self.pausa()
+        if not self.proyectos:
+            self.peticion('GET', '/coordinador/reportes', '/coordinador/reportes')
+            return
+
+        id_proyecto = self.rng.choice(self.proyectos)
+        self.peticion('GET', '/coordinador/proyecto/<id>/gestion', f"/coordinador/proyecto/{id_proyecto}/gestion")
+        self.pausa()
+        azar = self.rng.random()
+        if azar < 0.4:
+            self.peticion('GET', '/coordinador/proyecto/<id>/donaciones',
+                          f"/coordinador/proyecto/{id_proyecto}/donaciones")
+        elif azar < 0.8:
+            self.peticion('GET', '/coordinador/proyecto/<id>/gastos', f"/coordinador/proyecto/{id_proyecto}/gastos")
+        else:
+            self.peticion('GET', '/coordinador/reportes', '/coordinador/reportes')
+
+    def auditor(self):
+        """Reportes de donaciones y gastos y sus exportaciones."""
+        tipo = self.rng.choice(['donaciones', 'gastos'])
+        self.peticion('GET', f"/auditor/{tipo}", f"/auditor/{tipo}")
+        self.pausa()
+        azar = self.rng.random()
+        if azar < 0.4:
+            self.peticion('GET', f"/auditor/{tipo}/excel", f"/auditor/{tipo}/excel")
+        elif azar < 0.7:
+            self.peticion('GET', f"/auditor/{tipo}/csv", f"/auditor/{tipo}/csv")
+        elif azar < 0.85:
+            # Los PDF se encolan (export_worker.py); aquí se mide solo la solicitud
+            self.peticion('GET', f"/auditor/{tipo}/pdf", f"/auditor/{tipo}/pdf")
+            self.peticion('GET', '/auditor/exportaciones', '/auditor/exportaciones')
+        else:
+            self.peticion('GET', '/auditor/auditoria', '/auditor/auditoria')
+
+    def ejecutar(self, fin):
+        try:
+            self.login()
+            escenario = getattr(self, self.rol)
+            while time.monotonic() < fin:
+                escenario()
+                self.pausa()
+        except ErrorEscenario as e:
+            print(f"❌ {e}")
+        finally:
+            self.sesion.close()
+
+
+def _repartir(total, mezcla):
+    """Cantidad de usuarios virtuales por rol según la mezcla (al menos uno por rol con peso)."""
+    suma = sum(mezcla.values())
+    cantidades = {rol: max(1, round(total * peso / suma)) for rol, peso in mezcla.items() if peso > 0}
+    while sum(cantidades.values()) > total and max(cantidades.values()) > 1:
+        rol = max(cantidades, key=cantidades.get)
+        cantidades[rol] -= 1
+    return cantidades
+
+
+def _mezcla(texto):
+    mezcla = {}
+    for parte in texto.split(','):
+        rol, _, peso = parte.partition('=')
+        if rol not in MEZCLA_DEFAULT:
+            raise argparse.ArgumentTypeError(f"rol desconocido: {rol}")
+        mezcla[rol] = float(peso or 1)
+    return mezcla
+
+
+def resumen(resultados, duracion):
+    """Estadísticas por ruta (latencias en milisegundos)."""
+    rutas = {}
+    for ruta, latencias in sorted(resultados.latencias.items()):
+        ordenadas = sorted(latencias)
+        total = len(ordenadas)
+        errores = resultados.errores.get(ruta, 0)
+        rutas[ruta] = {
+            'peticiones': total,
+            'errores': errores,
+            'tasa_error': round(errores / total, 4),
+            'rps': round(total / duracion, 2),
+            'media_ms': round(sum(ordenadas) / total * 1000, 1),
+            'p50_ms': round(_percentil(ordenadas, 50) * 1000, 1),
+            'p95_ms': round(_percentil(ordenadas, 95) * 1000, 1),
+            'p99_ms': round(_percentil(ordenadas, 99) * 1000, 1),
+            'max_ms': round(ordenadas[-1] * 1000, 1),
+            'codigos': {str(codigo): n for codigo, n in sorted(resultados.codigos[ruta].items(), key=str)},
+        }
+    todas = sorted(l for latencias in resultados.latencias.values() for l in latencias)
+    total = len(todas)
+    errores = sum(resultados.errores.values())
+    global_ = {
+        'peticiones': total,
+        'errores': errores,
+        'tasa_error': round(errores / total, 4) if total else 0,
+        'rps': round(total / duracion, 2),
+        'p50_ms': round(_percentil(todas, 50) * 1000, 1) if total else None,
+        'p95_ms': round(_percentil(todas, 95) * 1000, 1) if total else None,
+        'p99_ms': round(_percentil(todas, 99) * 1000, 1) if total else None,
+    }
+    return rutas, global_
+
+
+def imprimir(rutas, global_):
+    print(f"\n{'Ruta':<52} {'pet.':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'error':>7}")
+    for ruta, datos in rutas.items():
+        print(f"{ruta[:52]:<52} {datos['peticiones']:>7} {datos['rps']:>7.1f} {datos['p50_ms']:>8.1f} "
+              f"{datos['p95_ms']:>8.1f} {datos['p99_ms']:>8.1f} {datos['tasa_error']:>7.1%}")
+    if global_['peticiones']:
+        print(f"{'TOTAL':<52} {global_['peticiones']:>7} {global_['rps']:>7.1f} {global_['p50_ms']:>8.1f} "
+              f"{global_['p95_ms']:>8.1f} {global_['p99_ms']:>8.1f} {global_['tasa_error']:>7.1%}")
+    print("(latencias en ms)")
+
+
+def comparar(rutas, archivo, tolerancia):
+    """
+    Compara p95 y tasa de error con una corrida anterior. Con `tolerancia`, retorna las
+    rutas cuyo p95 empeoró más de ese porcentaje o cuya tasa de error subió más de un punto.
+    """
+    with open(archivo, encoding='utf-8') as f:
+        anterior = json.load(f)['rutas']
+    regresiones = []
+    print(f"\n🔄 Comparación con {archivo}:")
+    print(f"{'Ruta':<52} {'p95 antes':>10} {'p95 ahora':>10} {'cambio':>8} {'error antes':>12} {'error ahora':>12}")
+    for ruta in sorted(set(rutas) | set(anterior)):
+        antes, ahora = anterior.get(ruta), rutas.get(ruta)
+        if antes is None or ahora is None:
+            print(f"{ruta[:52]:<52} {'nueva' if antes is None else 'sin datos en esta corrida'}")
+            continue
+        cambio = (ahora['p95_ms'] - antes['p95_ms']) / antes['p95_ms'] * 100 if antes['p95_ms'] else 0.0
+        marca = ''
+        if tolerancia is not None and (cambio > tolerancia or ahora['tasa_error'] > antes['tasa_error'] + 0.01):
+            regresiones.append(ruta)
+            marca = ' ⚠️'
+        print(f"{ruta[:52]:<52} {antes['p95_ms']:>10.1f} {ahora['p95_ms']:>10.1f} {cambio:>+7.0f}% "
+              f"{antes['tasa_error']:>12.1%} {ahora['tasa_error']:>12.1%}{marca}")
+    return regresiones
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de extremo a extremo con latencias por ruta")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="URL base de la aplicación")
+    parser.add_argument('--usuarios', type=int, default=20, help="usuarios virtuales concurrentes")
+    parser.add_argument('--duracion', type=float, default=60, help="segundos de medición")
+    parser.add_argument('--calentamiento', type=float, default=10,
+                        help="segundos iniciales que no se miden (inicio de sesión, cachés)")
+    parser.add_argument('--rampa', type=float, default=5, help="segundos para arrancar todos los usuarios")
+    parser.add_argument('--pausa', type=float, default=0.5,
+                        help="tiempo medio de \"lectura\" entre peticiones en segundos (0 = sin pausa)")
+    parser.add_argument('--mezcla', type=_mezcla, default=dict(MEZCLA_DEFAULT),
+                        help="pesos por rol, p. ej. donador=70,coordinador=20,auditor=10")
+    parser.add_argument('--cuentas', type=int, default=None,
+                        help="usuarios generados disponibles por rol (por defecto, uno por usuario virtual)")
+    parser.add_argument('--password', default=PASSWORD_DEFAULT, help="contraseña de los usuarios generados")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=60, help="tiempo máximo por petición")
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior con la cual comparar")
+    parser.add_argument('--tolerancia', type=float, default=None,
+                        help="con --comparar: termina con código 1 si el p95 de una ruta empeora más de este %%")
+    args = parser.parse_args(argv)
+    args.url = args.url.rstrip('/')
+
+    resultados = Resultados()
+    reparto = _repartir(args.usuarios, args.mezcla)
+    usuarios = []
+    for rol, cantidad in reparto.items():
+        for i in range(cantidad):
+            numero = i % args.cuentas + 1 if args.cuentas else i + 1
+            usuarios.append(UsuarioVirtual(args, rol, numero, resultados, args.semilla))
+    print(f"🚀 {len(usuarios)} usuarios virtuales contra {args.url} "
+          f"({', '.join(f'{rol}: {n}' for rol, n in reparto.items())}); "
+          f"calentamiento {args.calentamiento:.0f} s, medición {args.duracion:.0f} s")
+
+    inicio = time.monotonic()
+    fin = inicio + args.calentamiento + args.duracion
+    hilos = []
+    for i, usuario in enumerate(usuarios):
+        hilo = threading.Thread(target=usuario.ejecutar, args=(fin,), daemon=True)
+        hilos.append(hilo)
+        hilo.start()
+        if args.rampa > 0:
+            time.sleep(args.rampa / len(usuarios))
+
+    inicio_medicion = None
+    try:
+        time.sleep(max(0.0, inicio + args.calentamiento - time.monotonic()))
+        resultados.medir = True
+        inicio_medicion = time.monotonic()
+        print("ℹ️  Midiendo...")
+        for hilo in hilos:
+            hilo.join()
+    except KeyboardInterrupt:
+        print("\n⚠️  Prueba interrumpida; se reportan los datos medidos hasta ahora")
+    resultados.medir = False
+    duracion = max(time.monotonic() - inicio_medicion if inicio_medicion is not None else 0.0, 1e-9)
+
+    rutas, global_ = resumen(resultados, duracion)
+    imprimir(rutas, global_)
+
+    if args.salida:
+        datos = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'version': _version(),
+            'parametros': {
+                'url': args.url, 'usuarios': args.usuarios, 'duracion': round(duracion, 1),
+                'calentamiento': args.calentamiento, 'pausa': args.pausa, 'mezcla': args.mezcla,
+                'semilla': args.semilla,
+            },
+            'global': global_,
+            'rutas': rutas,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+        print(f"✅ Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        regresiones = comparar(rutas, args.comparar, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} rutas empeoraron respecto a {args.comparar}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Versioned schema migration runner.
+
+Migrations live in scripts/migrations as numbered SQL files (NNNN_nombre.sql) and
+are applied in order. Applied versions are recorded in the schema_migrations table.
+A PostgreSQL advisory lock makes sure only one runner migrates at a time.
+
+By default each file runs in its own transaction. Files whose first line is
+'-- migrate: no-transaction' run statement by statement in autocommit mode, which is
+required for online operations such as CREATE INDEX CONCURRENTLY.
+
+Usage:
+    python scripts/migrate.py             # apply pending migrations
+    python scripts/migrate.py --dry-run   # show what would run
+    python scripts/migrate.py --status    # list applied / pending migrations
+    python scripts/migrate.py --target 3  # apply up to version 3
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+from psycopg2 import sql
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+# Arbitrary constant key for pg_advisory_lock, shared by every runner
+ADVISORY_LOCK_KEY = 727274001
+
+_FILENAME_RE = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+_CONCURRENT_INDEX_RE = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', re.I
+)
+
+
+class Migration:
+    def __init__(self, version, nombre, path):
+        self.version = version
+        self.nombre = nombre
+        self.path = path
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    @property
+    def transactional(self):
+        return not self.read().lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.nombre}"
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return the migration files in the directory, ordered by version."""
+    migrations = []
+    seen = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"Versión de migración duplicada {version}: {seen[version]} y {filename}")
+        seen[version] = filename
+        migrations.append(Migration(version, match.group(2), os.path.join(directory, filename)))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def split_statements(script):
+    """Split a SQL script into statements (only for simple, non-transactional files)."""
+    statements = []
+    for chunk in re.split(r';\s*(?:\n|$)', script):
+        lines = [line for line in chunk.splitlines() if not line.strip().startswith('--')]
+        statement = '\n'.join(lines).strip()
+        if statement:
+            statements.append(statement)
+    return statements
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL,
+            aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS duracion_ms INTEGER")
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _drop_invalid_index(cursor, statement):
+    """Drop an invalid index left behind by an interrupted CONCURRENTLY build."""
+    match = _CONCURRENT_INDEX_RE.search(statement)
+    if not match:
+        return
+    nombre = match.group(1)
+    cursor.execute("""
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s
+    """, (nombre,))
+    row = cursor.fetchone()
+    if row is not None and not row[0]:
+        print(f"     · Eliminando índice inválido '{nombre}'")
+        cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(nombre)))
+
+
+def _record(cursor, migration, duracion_ms):
+    cursor.execute("""
+        INSERT INTO schema_migrations (version, nombre, duracion_ms) VALUES (%s, %s, %s)
+        ON CONFLICT (version) DO NOTHING
+    """, (migration.version, migration.nombre, duracion_ms))
+
+
+def apply_migration(conn, migration):
+    """Apply a single migration and return its duration in milliseconds."""
+    script = migration.read()
+    inicio = time.perf_counter()
+
+    if migration.transactional:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(script)
+            duracion_ms = int((time.perf_counter() - inicio) * 1000)
+            _record(cursor, migration, duracion_ms)
+            conn.commit()
+            return duracion_ms
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for statement in split_statements(script):
+            paso = time.perf_counter()
+            _drop_invalid_index(cursor, statement)
+            cursor.execute(statement)
+            print(f"     · {statement.splitlines()[0][:90]} ({(time.perf_counter() - paso) * 1000:.0f} ms)")
+        duracion_ms = int((time.perf_counter() - inicio) * 1000)
+        _record(cursor, migration, duracion_ms)
+        return duracion_ms
+    finally:
+        cursor.close()
+        conn.autocommit = previous_autocommit
+
+
+def run_migrations(conn, dry_run=False, target=None, migrations=None):
+    """
+    Apply every pending migration (up to target, if given).
+    Returns the list of applied (or, in dry-run mode, pending) migrations.
+    """
+    migrations = migrations if migrations is not None else discover_migrations()
+    if target is not None:
+        migrations = [m for m in migrations if m.version <= target]
+
+    cursor = conn.cursor()
+    try:
+        print("🔒 Esperando el bloqueo de migraciones...")
+        cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        conn.commit()
+
+        if dry_run:
+            cursor.execute("SELECT to_regclass('schema_migrations')")
+            existe = cursor.fetchone()[0] is not None
+            aplicadas = applied_versions(cursor) if existe else set()
+        else:
+            ensure_migrations_table(cursor)
+            conn.commit()
+            aplicadas = applied_versions(cursor)
+        conn.commit()
+
+        pendientes = [m for m in migrations if m.version not in aplicadas]
+        if not pendientes:
+            print("ℹ️  No hay migraciones pendientes")
+            return []
+
+        total = time.perf_counter()
+        for migration in pendientes:
+            modo = "transacción" if migration.transactional else "sin transacción"
+            if dry_run:
+                print(f"  → [dry-run] {migration} ({modo})")
+                for statement in split_statements(migration.read()):
+                    print(f"     · {statement.splitlines()[0][:90]}")
+                continue
+            print(f"  → Aplicando {migration} ({modo})...")
+            duracion_ms = apply_migration(conn, migration)
+            print(f"  ✅ {migration} aplicada en {duracion_ms} ms")
+
+        if not dry_run:
+            print(f"✅ {len(pendientes)} migraciones aplicadas en {(time.perf_counter() - total) * 1000:.0f} ms")
+        return pendientes
+    finally:
+        try:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+        cursor.close()
+
+
+def print_status(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT to_regclass('schema_migrations')")
+        if cursor.fetchone()[0] is None:
+            aplicadas = {}
+        else:
+            cursor.execute("SELECT version, aplicada_en FROM schema_migrations")
+            aplicadas = dict(cursor.fetchall())
+        for migration in discover_migrations():
+            if migration.version in aplicadas:
+                print(f"  ✅ {migration}  ({aplicadas[migration.version]:%Y-%m-%d %H:%M})")
+            else:
+                print(f"  ⏳ {migration}  (pendiente)")
+    finally:
+        conn.rollback()
+        cursor.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica las migraciones de esquema pendientes")
+    parser.add_argument('--dry-run', action='store_true', help="muestra las migraciones pendientes sin aplicarlas")
+    parser.add_argument('--status', action='store_true', help="lista las migraciones aplicadas y pendientes")
+    parser.add_argument('--target', type=int, default=None, help="aplica hasta esta versión (incluida)")
+    args = parser.parse_args(argv)
+
+    from init_db import get_db_connection
+    conn = get_db_connection()
+    try:
+        if args.status:
+            print_status(conn)
+        else:
+            run_migrations(conn, dry_run=args.dry_run, target=args.target)
+    except Exception as e:
+        print(f"❌ Error durante la migración: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+-- Esquema base: tablas principales de la plataforma.
+
+CREATE TABLE IF NOT EXISTS roles (
+    id_rol INTEGER PRIMARY KEY,
+    nombre_rol VARCHAR(50) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL UNIQUE,
+    correo VARCHAR(255) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    fullname VARCHAR(255) NOT NULL,
+    id_rol INTEGER NOT NULL,
+    FOREIGN KEY (id_rol) REFERENCES roles(id_rol)
+);
+
+CREATE TABLE IF NOT EXISTS proyectos (
+    id_proyecto SERIAL PRIMARY KEY,
+    nombre VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    monto_objetivo DECIMAL(12, 2) NOT NULL,
+    monto_recaudado DECIMAL(12, 2) DEFAULT 0,
+    estado VARCHAR(50) DEFAULT 'activo',
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    id_usuario INTEGER NOT NULL,
+    archivado BOOLEAN DEFAULT FALSE,
+    archivado_en TIMESTAMP,
+    archivado_por INTEGER,
+    FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE RESTRICT,
+    FOREIGN KEY (archivado_por) REFERENCES usuarios(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS donaciones (
+    id_donacion SERIAL PRIMARY KEY,
+    id_usuario INTEGER NOT NULL,
+    id_proyecto INTEGER NOT NULL,
+    monto DECIMAL(12, 2) NOT NULL,
+    fecha_donacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE RESTRICT,
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS categorias_gasto (
+    id_categoria SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL UNIQUE,
+    descripcion TEXT
+);
+
+CREATE TABLE IF NOT EXISTS gastos (
+    id_gasto SERIAL PRIMARY KEY,
+    id_proyecto INTEGER NOT NULL,
+    id_usuario INTEGER NOT NULL,
+    categoria VARCHAR(100) NOT NULL,
+    descripcion TEXT,
+    monto DECIMAL(12, 2) NOT NULL,
+    fecha_gasto DATE NOT NULL,
+    archivo_nombre VARCHAR(255),
+    archivo_path VARCHAR(500),
+    creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE,
+    FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE RESTRICT
+);
+
+CREATE TABLE IF NOT EXISTS objetivos (
+    id_objetivo SERIAL PRIMARY KEY,
+    id_proyecto INTEGER NOT NULL,
+    descripcion TEXT NOT NULL,
+    completado BOOLEAN DEFAULT FALSE,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS actividades (
+    id_actividad SERIAL PRIMARY KEY,
+    id_proyecto INTEGER NOT NULL,
+    nombre VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    fecha_inicio DATE,
+    fecha_fin DATE,
+    estado VARCHAR(50) DEFAULT 'pendiente',
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS responsables (
+    id_responsable SERIAL PRIMARY KEY,
+    id_proyecto INTEGER NOT NULL,
+    id_usuario INTEGER NOT NULL,
+    rol_en_proyecto VARCHAR(100),
+    fecha_asignacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE,
+    FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE CASCADE,
+    UNIQUE(id_proyecto, id_usuario)
+);
+
+CREATE TABLE IF NOT EXISTS tareas (
+    id SERIAL PRIMARY KEY,
+    descripcion TEXT NOT NULL,
+    estado VARCHAR(20) DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'en_progreso', 'completada')),
+    fecha_inicio DATE,
+    fecha_fin DATE,
+    usuario_id INTEGER,
+    proyecto_id INTEGER NOT NULL,
+    creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE SET NULL,
+    FOREIGN KEY (proyecto_id) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    id SERIAL PRIMARY KEY,
+    usuario_id INTEGER,
+    accion TEXT NOT NULL,
+    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE SET NULL
+);
@@ -0,0 +1,7 @@
+-- Campos de contacto y preferencias de comunicación del donador.
+
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS telefono VARCHAR(20);
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS direccion TEXT;
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS preferencia_email BOOLEAN DEFAULT TRUE;
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS preferencia_sms BOOLEAN DEFAULT FALSE;
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS notas TEXT;
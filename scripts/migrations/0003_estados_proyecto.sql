@@ -0,0 +1,3 @@
+-- Los proyectos 'activo' pasan al nuevo estado 'en_ejecucion'.
+
+UPDATE proyectos SET estado = 'en_ejecucion' WHERE estado = 'activo';
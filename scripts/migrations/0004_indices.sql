@@ -0,0 +1,24 @@
+-- migrate: no-transaction
+-- Índices secundarios para claves foráneas y columnas de ordenamiento.
+-- Se crean con CONCURRENTLY para no bloquear escrituras en una base de datos en uso.
+
+-- donaciones: claves foráneas + ORDER BY fecha_donacion DESC de los listados
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_donaciones_proyecto_fecha ON donaciones (id_proyecto, fecha_donacion DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_donaciones_usuario_fecha ON donaciones (id_usuario, fecha_donacion DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_donaciones_fecha ON donaciones (fecha_donacion DESC);
+-- gastos
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gastos_proyecto_fecha ON gastos (id_proyecto, fecha_gasto DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gastos_fecha ON gastos (fecha_gasto DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gastos_usuario ON gastos (id_usuario);
+-- gestión de proyecto
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tareas_proyecto_orden ON tareas (proyecto_id, fecha_fin ASC NULLS LAST, creado_en DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tareas_usuario ON tareas (usuario_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_objetivos_proyecto_fecha ON objetivos (id_proyecto, fecha_creacion);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_actividades_proyecto_orden ON actividades (id_proyecto, fecha_inicio ASC NULLS LAST, id_actividad);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_responsables_usuario ON responsables (id_usuario);
+-- auditoria: paginación por cursor sobre (fecha, id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_auditoria_fecha_id ON auditoria (fecha DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_auditoria_usuario_fecha_id ON auditoria (usuario_id, fecha DESC, id DESC);
+-- proyectos
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_usuario_fecha ON proyectos (id_usuario, fecha_creacion DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_activos_fecha ON proyectos (fecha_creacion DESC) WHERE archivado = FALSE;
@@ -0,0 +1,22 @@
+-- Cola de trabajos de exportación (PDF) procesados por scripts/export_worker.py.
+-- La propia tabla es la cola durable: los workers reclaman filas con FOR UPDATE SKIP LOCKED.
+
+CREATE TABLE IF NOT EXISTS trabajos_exportacion (
+    id SERIAL PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    parametros JSONB NOT NULL DEFAULT '{}',
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    id_usuario INTEGER,
+    archivo TEXT,
+    nombre_archivo VARCHAR(255),
+    error TEXT,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    iniciado_en TIMESTAMP,
+    terminado_en TIMESTAMP,
+    FOREIGN KEY (id_usuario) REFERENCES usuarios(id) ON DELETE CASCADE,
+    CHECK (estado IN ('pendiente', 'procesando', 'completado', 'error'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_trabajos_exportacion_pendientes ON trabajos_exportacion (creado_en) WHERE estado = 'pendiente';
+CREATE INDEX IF NOT EXISTS idx_trabajos_exportacion_usuario ON trabajos_exportacion (id_usuario, creado_en DESC);
@@ -0,0 +1,52 @@
+-- Versión de datos por tabla: un contador que se incrementa (en la misma transacción)
+-- con cada sentencia que modifica la tabla. Sirve como marca de agua para invalidar
+-- cachés de reportes y exportaciones sin recorrer las tablas. El argumento del trigger,
+-- si lo hay, es la clave del contador (por defecto, el nombre de la tabla).
+
+CREATE TABLE IF NOT EXISTS versiones_datos (
+    tabla VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION incrementar_version_datos() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO versiones_datos (tabla, version, actualizado_en)
+    VALUES (COALESCE(TG_ARGV[0], TG_TABLE_NAME), 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (tabla) DO UPDATE
+    SET version = versiones_datos.version + 1, actualizado_en = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Disparadores por sentencia (no por fila): una carga masiva incrementa la versión una sola vez
+DROP TRIGGER IF EXISTS trg_version_donaciones ON donaciones;
+CREATE TRIGGER trg_version_donaciones
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON donaciones
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+DROP TRIGGER IF EXISTS trg_version_gastos ON gastos;
+CREATE TRIGGER trg_version_gastos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON gastos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+DROP TRIGGER IF EXISTS trg_version_proyectos ON proyectos;
+CREATE TRIGGER trg_version_proyectos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON proyectos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+-- Nombres y propietarios de los proyectos: las exportaciones y los gráficos solo necesitan
+-- esto, y 'proyectos' cambia con cada donación (monto_recaudado)
+DROP TRIGGER IF EXISTS trg_version_proyectos_nombres ON proyectos;
+CREATE TRIGGER trg_version_proyectos_nombres
+    AFTER INSERT OR UPDATE OF nombre, id_usuario OR DELETE OR TRUNCATE ON proyectos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos('proyectos_nombres');
+
+DROP TRIGGER IF EXISTS trg_version_usuarios ON usuarios;
+CREATE TRIGGER trg_version_usuarios
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON usuarios
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+INSERT INTO versiones_datos (tabla, version)
+VALUES ('donaciones', 0), ('gastos', 0), ('proyectos', 0), ('proyectos_nombres', 0), ('usuarios', 0)
+ON CONFLICT (tabla) DO NOTHING;
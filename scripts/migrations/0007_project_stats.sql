@@ -0,0 +1,176 @@
+-- Estadísticas agregadas por proyecto, mantenidas de forma incremental por triggers.
+-- Los reportes leen esta tabla (una fila por proyecto) en lugar de recorrer donaciones,
+-- gastos, objetivos y tareas. Los triggers actualizan solo la fila del proyecto afectado,
+-- que ya queda bloqueada por la propia donación (ModelDonacion.donar), así que no se
+-- agrega contención entre proyectos distintos.
+
+CREATE TABLE IF NOT EXISTS project_stats (
+    id_proyecto INTEGER PRIMARY KEY,
+    total_donaciones INTEGER NOT NULL DEFAULT 0,
+    suma_donaciones DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    suma_gastos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    ultima_donacion TIMESTAMP,
+    objetivos_total INTEGER NOT NULL DEFAULT 0,
+    objetivos_completados INTEGER NOT NULL DEFAULT 0,
+    tareas_total INTEGER NOT NULL DEFAULT 0,
+    tareas_completadas INTEGER NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+
+-- Fila inicial al crear un proyecto
+CREATE OR REPLACE FUNCTION project_stats_proyecto() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO project_stats (id_proyecto) VALUES (NEW.id_proyecto)
+    ON CONFLICT (id_proyecto) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Aplica un delta a la fila del proyecto. Solo UPDATE: la fila se crea junto con el
+-- proyecto, y al borrar un proyecto (ON DELETE CASCADE) no debe volver a insertarse.
+CREATE OR REPLACE FUNCTION project_stats_aplicar(
+    p_id_proyecto INTEGER,
+    p_donaciones INTEGER DEFAULT 0,
+    p_suma_donaciones DECIMAL DEFAULT 0,
+    p_suma_gastos DECIMAL DEFAULT 0,
+    p_objetivos INTEGER DEFAULT 0,
+    p_objetivos_completados INTEGER DEFAULT 0,
+    p_tareas INTEGER DEFAULT 0,
+    p_tareas_completadas INTEGER DEFAULT 0,
+    p_ultima_donacion TIMESTAMP DEFAULT NULL
+) RETURNS void AS $$
+BEGIN
+    UPDATE project_stats SET
+        total_donaciones = total_donaciones + p_donaciones,
+        suma_donaciones = suma_donaciones + p_suma_donaciones,
+        suma_gastos = suma_gastos + p_suma_gastos,
+        ultima_donacion = GREATEST(ultima_donacion, p_ultima_donacion),
+        objetivos_total = objetivos_total + p_objetivos,
+        objetivos_completados = objetivos_completados + p_objetivos_completados,
+        tareas_total = tareas_total + p_tareas,
+        tareas_completadas = tareas_completadas + p_tareas_completadas,
+        actualizado_en = CURRENT_TIMESTAMP
+    WHERE id_proyecto = p_id_proyecto;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION project_stats_donaciones() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM project_stats_aplicar(OLD.id_proyecto, p_donaciones => -1, p_suma_donaciones => -OLD.monto);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM project_stats_aplicar(NEW.id_proyecto, p_donaciones => 1, p_suma_donaciones => NEW.monto,
+                                      p_ultima_donacion => NEW.fecha_donacion);
+    END IF;
+    -- Al borrar la donación más reciente se recalcula la fecha de la última
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE project_stats SET ultima_donacion = (
+            SELECT MAX(fecha_donacion) FROM donaciones WHERE id_proyecto = OLD.id_proyecto
+        )
+        WHERE id_proyecto = OLD.id_proyecto AND ultima_donacion IS NOT DISTINCT FROM OLD.fecha_donacion;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION project_stats_gastos() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM project_stats_aplicar(OLD.id_proyecto, p_suma_gastos => -OLD.monto);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM project_stats_aplicar(NEW.id_proyecto, p_suma_gastos => NEW.monto);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION project_stats_objetivos() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM project_stats_aplicar(OLD.id_proyecto, p_objetivos => -1,
+                                      p_objetivos_completados => -(COALESCE(OLD.completado, FALSE))::int);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM project_stats_aplicar(NEW.id_proyecto, p_objetivos => 1,
+                                      p_objetivos_completados => (COALESCE(NEW.completado, FALSE))::int);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION project_stats_tareas() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM project_stats_aplicar(OLD.proyecto_id, p_tareas => -1,
+                                      p_tareas_completadas => -(COALESCE(OLD.estado = 'completada', FALSE)::int));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM project_stats_aplicar(NEW.proyecto_id, p_tareas => 1,
+                                      p_tareas_completadas => COALESCE(NEW.estado = 'completada', FALSE)::int);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_project_stats_proyecto ON proyectos;
+CREATE TRIGGER trg_project_stats_proyecto
+    AFTER INSERT ON proyectos
+    FOR EACH ROW EXECUTE FUNCTION project_stats_proyecto();
+
+DROP TRIGGER IF EXISTS trg_project_stats_donaciones ON donaciones;
+CREATE TRIGGER trg_project_stats_donaciones
+    AFTER INSERT OR DELETE OR UPDATE OF id_proyecto, monto, fecha_donacion ON donaciones
+    FOR EACH ROW EXECUTE FUNCTION project_stats_donaciones();
+
+DROP TRIGGER IF EXISTS trg_project_stats_gastos ON gastos;
+CREATE TRIGGER trg_project_stats_gastos
+    AFTER INSERT OR DELETE OR UPDATE OF id_proyecto, monto ON gastos
+    FOR EACH ROW EXECUTE FUNCTION project_stats_gastos();
+
+DROP TRIGGER IF EXISTS trg_project_stats_objetivos ON objetivos;
+CREATE TRIGGER trg_project_stats_objetivos
+    AFTER INSERT OR DELETE OR UPDATE OF id_proyecto, completado ON objetivos
+    FOR EACH ROW EXECUTE FUNCTION project_stats_objetivos();
+
+DROP TRIGGER IF EXISTS trg_project_stats_tareas ON tareas;
+CREATE TRIGGER trg_project_stats_tareas
+    AFTER INSERT OR DELETE OR UPDATE OF proyecto_id, estado ON tareas
+    FOR EACH ROW EXECUTE FUNCTION project_stats_tareas();
+
+-- Carga inicial a partir de los datos existentes (la migración corre en una transacción,
+-- así que los triggers y el recálculo quedan consistentes entre sí)
+INSERT INTO project_stats (id_proyecto, total_donaciones, suma_donaciones, suma_gastos, ultima_donacion,
+                           objetivos_total, objetivos_completados, tareas_total, tareas_completadas)
+SELECT p.id_proyecto,
+       COALESCE(d.total, 0), COALESCE(d.suma, 0), COALESCE(g.suma, 0), d.ultima,
+       COALESCE(o.total, 0), COALESCE(o.completados, 0),
+       COALESCE(t.total, 0), COALESCE(t.completadas, 0)
+FROM proyectos p
+LEFT JOIN (
+    SELECT id_proyecto, COUNT(*) AS total, SUM(monto) AS suma, MAX(fecha_donacion) AS ultima
+    FROM donaciones GROUP BY id_proyecto
+) d ON d.id_proyecto = p.id_proyecto
+LEFT JOIN (
+    SELECT id_proyecto, SUM(monto) AS suma FROM gastos GROUP BY id_proyecto
+) g ON g.id_proyecto = p.id_proyecto
+LEFT JOIN (
+    SELECT id_proyecto, COUNT(*) AS total, COUNT(*) FILTER (WHERE completado) AS completados
+    FROM objetivos GROUP BY id_proyecto
+) o ON o.id_proyecto = p.id_proyecto
+LEFT JOIN (
+    SELECT proyecto_id, COUNT(*) AS total, COUNT(*) FILTER (WHERE estado = 'completada') AS completadas
+    FROM tareas GROUP BY proyecto_id
+) t ON t.proyecto_id = p.id_proyecto
+ON CONFLICT (id_proyecto) DO UPDATE SET
+    total_donaciones = EXCLUDED.total_donaciones,
+    suma_donaciones = EXCLUDED.suma_donaciones,
+    suma_gastos = EXCLUDED.suma_gastos,
+    ultima_donacion = EXCLUDED.ultima_donacion,
+    objetivos_total = EXCLUDED.objetivos_total,
+    objetivos_completados = EXCLUDED.objetivos_completados,
+    tareas_total = EXCLUDED.tareas_total,
+    tareas_completadas = EXCLUDED.tareas_completadas,
+    actualizado_en = CURRENT_TIMESTAMP;
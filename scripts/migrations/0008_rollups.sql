@@ -0,0 +1,85 @@
+-- Rollups diarios de donaciones (por proyecto) y gastos (por proyecto y categoría).
+-- Los llena scripts/rollup.py de forma incremental: solo procesa las filas con id mayor
+-- a su marca de agua (rollup_marcas). Las modificaciones y borrados de filas ya procesadas
+-- se registran por trigger en rollup_recalcular y el job recalcula solo esos días.
+-- Las series semanales y mensuales se derivan de estas tablas (date_trunc sobre dia).
+
+CREATE TABLE IF NOT EXISTS rollup_donaciones_diario (
+    dia DATE NOT NULL,
+    id_proyecto INTEGER NOT NULL,
+    total_donaciones INTEGER NOT NULL DEFAULT 0,
+    suma_donaciones DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, id_proyecto),
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_donaciones_proyecto_dia ON rollup_donaciones_diario (id_proyecto, dia);
+
+CREATE TABLE IF NOT EXISTS rollup_gastos_diario (
+    dia DATE NOT NULL,
+    id_proyecto INTEGER NOT NULL,
+    categoria VARCHAR(100) NOT NULL,
+    total_gastos INTEGER NOT NULL DEFAULT 0,
+    suma_gastos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, id_proyecto, categoria),
+    FOREIGN KEY (id_proyecto) REFERENCES proyectos(id_proyecto) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_gastos_proyecto_dia ON rollup_gastos_diario (id_proyecto, dia);
+CREATE INDEX IF NOT EXISTS idx_rollup_gastos_categoria_dia ON rollup_gastos_diario (categoria, dia);
+
+-- Última fila procesada de cada tabla
+CREATE TABLE IF NOT EXISTS rollup_marcas (
+    tabla VARCHAR(50) PRIMARY KEY,
+    ultimo_id BIGINT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO rollup_marcas (tabla, ultimo_id) VALUES ('donaciones', 0), ('gastos', 0)
+ON CONFLICT (tabla) DO NOTHING;
+
+-- Días a recalcular por modificaciones o borrados (categoria = '' para donaciones)
+CREATE TABLE IF NOT EXISTS rollup_recalcular (
+    tabla VARCHAR(50) NOT NULL,
+    dia DATE NOT NULL,
+    id_proyecto INTEGER NOT NULL,
+    categoria VARCHAR(100) NOT NULL DEFAULT '',
+    PRIMARY KEY (tabla, dia, id_proyecto, categoria)
+);
+
+CREATE OR REPLACE FUNCTION rollup_marcar_donaciones() RETURNS trigger AS $$
+BEGIN
+    IF OLD.fecha_donacion IS NOT NULL THEN
+        INSERT INTO rollup_recalcular (tabla, dia, id_proyecto)
+        VALUES ('donaciones', OLD.fecha_donacion::date, OLD.id_proyecto)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.fecha_donacion IS NOT NULL THEN
+        INSERT INTO rollup_recalcular (tabla, dia, id_proyecto)
+        VALUES ('donaciones', NEW.fecha_donacion::date, NEW.id_proyecto)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rollup_marcar_gastos() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO rollup_recalcular (tabla, dia, id_proyecto, categoria)
+    VALUES ('gastos', OLD.fecha_gasto, OLD.id_proyecto, OLD.categoria)
+    ON CONFLICT DO NOTHING;
+    IF TG_OP = 'UPDATE' THEN
+        INSERT INTO rollup_recalcular (tabla, dia, id_proyecto, categoria)
+        VALUES ('gastos', NEW.fecha_gasto, NEW.id_proyecto, NEW.categoria)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_donaciones ON donaciones;
+CREATE TRIGGER trg_rollup_donaciones
+    AFTER DELETE OR UPDATE OF id_proyecto, monto, fecha_donacion ON donaciones
+    FOR EACH ROW EXECUTE FUNCTION rollup_marcar_donaciones();
+
+DROP TRIGGER IF EXISTS trg_rollup_gastos ON gastos;
+CREATE TRIGGER trg_rollup_gastos
+    AFTER DELETE OR UPDATE OF id_proyecto, categoria, monto, fecha_gasto ON gastos
+    FOR EACH ROW EXECUTE FUNCTION rollup_marcar_gastos();
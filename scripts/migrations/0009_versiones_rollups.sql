@@ -0,0 +1,17 @@
+-- Versión de datos de los rollups diarios: los gráficos de series de tiempo se cachean
+-- por esta versión, que solo cambia cuando scripts/rollup.py escribe filas nuevas o
+-- recalcula días (no con cada donación).
+
+DROP TRIGGER IF EXISTS trg_version_rollup_donaciones ON rollup_donaciones_diario;
+CREATE TRIGGER trg_version_rollup_donaciones
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rollup_donaciones_diario
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+DROP TRIGGER IF EXISTS trg_version_rollup_gastos ON rollup_gastos_diario;
+CREATE TRIGGER trg_version_rollup_gastos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON rollup_gastos_diario
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_datos();
+
+INSERT INTO versiones_datos (tabla, version)
+VALUES ('rollup_donaciones_diario', 0), ('rollup_gastos_diario', 0)
+ON CONFLICT (tabla) DO NOTHING;
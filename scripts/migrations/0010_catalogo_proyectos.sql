@@ -0,0 +1,13 @@
+-- migrate: no-transaction
+-- Índices del catálogo de proyectos activos (ModelProyecto.get_catalogo), paginado por
+-- cursor: cada página es un recorrido de índice desde la posición del cursor.
+
+-- Orden 'recientes': (fecha_creacion, id_proyecto) con el id como desempate
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_catalogo_fecha_id
+    ON proyectos (fecha_creacion DESC, id_proyecto DESC) WHERE archivado = FALSE;
+
+-- Orden 'avance': la expresión debe coincidir con AVANCE_SQL de ModelProyecto
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_catalogo_avance
+    ON proyectos ((COALESCE(COALESCE(monto_recaudado, 0) / NULLIF(monto_objetivo, 0), 0)) DESC,
+                  fecha_creacion DESC, id_proyecto DESC)
+    WHERE archivado = FALSE;
@@ -0,0 +1,27 @@
+-- Búsqueda de proyectos (ModelProyecto.search): texto completo en español sobre nombre
+-- (peso A) y descripción (peso B), más similitud por trigramas del nombre para tolerar
+-- errores de escritura. La columna se mantiene con un trigger que solo se dispara al
+-- cambiar el texto, así las donaciones (UPDATE de monto_recaudado) no recalculan el tsvector.
+-- Los índices GIN se crean en 0012 (CONCURRENTLY, fuera de transacción).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE proyectos ADD COLUMN IF NOT EXISTS busqueda tsvector;
+
+CREATE OR REPLACE FUNCTION proyectos_busqueda() RETURNS trigger AS $$
+BEGIN
+    NEW.busqueda := setweight(to_tsvector('spanish', COALESCE(NEW.nombre, '')), 'A')
+                 || setweight(to_tsvector('spanish', COALESCE(NEW.descripcion, '')), 'B');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_proyectos_busqueda ON proyectos;
+CREATE TRIGGER trg_proyectos_busqueda
+    BEFORE INSERT OR UPDATE OF nombre, descripcion ON proyectos
+    FOR EACH ROW EXECUTE FUNCTION proyectos_busqueda();
+
+UPDATE proyectos
+SET busqueda = setweight(to_tsvector('spanish', COALESCE(nombre, '')), 'A')
+            || setweight(to_tsvector('spanish', COALESCE(descripcion, '')), 'B')
+WHERE busqueda IS NULL;
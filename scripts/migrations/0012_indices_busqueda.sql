@@ -0,0 +1,9 @@
+-- migrate: no-transaction
+-- Índices de la búsqueda de proyectos: GIN sobre el tsvector (consulta @@) y GIN de
+-- trigramas sobre el nombre (operador <% de word_similarity, tolerante a errores).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_busqueda
+    ON proyectos USING GIN (busqueda);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proyectos_nombre_trgm
+    ON proyectos USING GIN (nombre gin_trgm_ops);
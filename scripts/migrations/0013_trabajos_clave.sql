@@ -0,0 +1,9 @@
+-- Clave de caché del resultado de cada trabajo de exportación (ExportCache.clave).
+-- Un usuario no puede tener dos trabajos activos con la misma clave: si pide otra vez
+-- el mismo reporte mientras se genera, se le devuelve el trabajo existente.
+
+ALTER TABLE trabajos_exportacion ADD COLUMN IF NOT EXISTS clave VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trabajos_exportacion_activos_clave
+    ON trabajos_exportacion (id_usuario, clave)
+    WHERE estado IN ('pendiente', 'procesando');
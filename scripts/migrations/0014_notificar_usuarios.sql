@@ -0,0 +1,25 @@
+-- Invalidación de la caché de usuarios (ModelUser.user_cache) en todos los procesos:
+-- cada cambio o borrado de un usuario notifica su id por el canal usuarios_cache
+-- (NOTIFY se entrega al confirmar la transacción). TRUNCATE envía un payload vacío,
+-- que vacía la caché completa.
+
+CREATE OR REPLACE FUNCTION notificar_usuario_modificado() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('usuarios_cache', '');
+    ELSE
+        PERFORM pg_notify('usuarios_cache', OLD.id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notificar_usuarios ON usuarios;
+CREATE TRIGGER trg_notificar_usuarios
+    AFTER UPDATE OR DELETE ON usuarios
+    FOR EACH ROW EXECUTE FUNCTION notificar_usuario_modificado();
+
+DROP TRIGGER IF EXISTS trg_notificar_usuarios_truncate ON usuarios;
+CREATE TRIGGER trg_notificar_usuarios_truncate
+    AFTER TRUNCATE ON usuarios
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_usuario_modificado();
@@ -0,0 +1,527 @@
+"""
+Query-count regression check for every GET and POST route registered in app.py.
+
+Seeds the database at several scales, requests every URL rule and method with each
+role through the Flask test client (POST rules with the minimal valid form data in
+FORMULARIOS) and compares the SQL queries (per-request statistics from
+src/utils/instrumentacion_sql.py) and pool checkouts of every request with the budget
+declared for its (endpoint, method) in PRESUPUESTOS. A GET page whose query count
+grows with the data (an N+1 pattern) is reported even if it is still under budget.
+Exits with status 1 if any route answers with a 5xx status, any budget is exceeded or
+any count grows between scales.
+The same helpers back the pytest suite in tests/test_query_budget.py.
+
+The data is written to the configured database, so point it at a disposable one
+(--permitir-escritura), or use --cluster-temporal to start a throwaway PostgreSQL
+cluster with initdb/pg_ctl (must be on PATH) that is removed at the end.
+
+Usage:
+    python scripts/query_budget.py --cluster-temporal
+    python scripts/query_budget.py --permitir-escritura --escalas 10,100,1000
+    python scripts/query_budget.py --cluster-temporal --endpoint listar_proyectos --informe
+"""
+import argparse
+import itertools
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Presupuesto por (endpoint, método): (consultas SQL, conexiones del pool) por petición.
+# Incluye la carga del usuario (Flask-Login). La auditoría se escribe en segundo plano
+# y las conexiones tomadas por otros hilos no se cuentan.
+PRESUPUESTO_DEFAULT = (12, 1)
+PRESUPUESTOS = {
+    ('index', 'GET'): (2, 1),
+    ('login', 'GET'): (2, 1),
+    ('login', 'POST'): (3, 1),
+    ('register', 'GET'): (2, 1),
+    ('register', 'POST'): (4, 1),
+    ('listar_proyectos', 'GET'): (4, 1),
+    ('detalle_proyecto', 'GET'): (4, 1),
+    ('formulario_donacion', 'GET'): (3, 1),
+    ('formulario_donacion', 'POST'): (8, 1),
+    ('historial_donaciones_usuario', 'GET'): (4, 1),
+    ('home', 'GET'): (6, 1),
+    ('mi_informacion', 'POST'): (6, 1),
+    ('panel', 'GET'): (8, 1),
+    ('edit_user', 'POST'): (4, 1),
+    ('toggle_user_status', 'POST'): (4, 1),
+    ('panel_coordinador', 'GET'): (5, 1),
+    ('crear_proyecto', 'POST'): (6, 1),
+    ('editar_proyecto', 'POST'): (8, 1),
+    ('archivar_proyecto', 'POST'): (8, 1),
+    ('desarchivar_proyecto', 'POST'): (8, 1),
+    ('crear_gasto', 'POST'): (10, 1),
+    ('editar_gasto', 'POST'): (10, 1),
+    ('eliminar_gasto', 'POST'): (8, 1),
+    ('detalle_gestion_proyecto', 'GET'): (6, 1),
+    ('actualizar_estado_proyecto', 'POST'): (8, 1),
+    ('crear_objetivo', 'POST'): (8, 1),
+    ('toggle_objetivo', 'POST'): (8, 1),
+    ('eliminar_objetivo', 'POST'): (8, 1),
+    ('crear_actividad', 'POST'): (8, 1),
+    ('actualizar_estado_actividad', 'POST'): (8, 1),
+    ('eliminar_actividad', 'POST'): (8, 1),
+    ('agregar_responsable', 'POST'): (8, 1),
+    ('eliminar_responsable', 'POST'): (8, 1),
+    ('crear_tarea', 'POST'): (8, 1),
+    ('actualizar_estado_tarea', 'POST'): (8, 1),
+    ('eliminar_tarea', 'POST'): (8, 1),
+    ('reportes', 'GET'): (8, 1),
+    ('reportes_coordinador', 'GET'): (6, 1),
+    ('grafico_reporte', 'GET'): (4, 1),
+    ('ver_auditoria', 'GET'): (5, 1),
+    ('ver_exportaciones', 'GET'): (4, 1),
+    # CSV: COPY en una conexión dedicada del pool, además de la de la petición
+    ('exportar_donaciones_csv', 'GET'): (4, 2),
+    ('exportar_gastos_csv', 'GET'): (4, 2),
+    ('exportar_auditoria_csv', 'GET'): (4, 2),
+    ('metrics', 'GET'): (0, 0),
+}
+
+METODOS = ('GET', 'POST')
+
+# Rutas que no se visitan: archivos estáticos y borrado por GET
+SIN_VISITAR = {('static', 'GET'), ('delete_user', 'GET')}
+
+# Valor de cada argumento de URL (consultas sobre los datos sembrados). {agregado} es MIN,
+# o MAX para los endpoints de ELIMINAN: borran la fila más reciente y no la que visitan
+# las demás rutas
+ARGUMENTOS = {
+    'id_proyecto': "SELECT {agregado}(id_proyecto) FROM proyectos WHERE nombre LIKE 'presupuesto %'",
+    'user_id': "SELECT {agregado}(id) FROM usuarios WHERE nombre = 'presupuesto_cuenta'",
+    'id_gasto': "SELECT {agregado}(id_gasto) FROM gastos WHERE descripcion LIKE 'presupuesto %'",
+    'id_objetivo': "SELECT {agregado}(id_objetivo) FROM objetivos WHERE descripcion LIKE 'Objetivo %'",
+    'id_actividad': "SELECT {agregado}(id_actividad) FROM actividades WHERE nombre LIKE 'Actividad %'",
+    'id_tarea': "SELECT {agregado}(id) FROM tareas WHERE descripcion LIKE 'Tarea %'",
+    'id_responsable': "SELECT {agregado}(id_responsable) FROM responsables",
+    'id_trabajo': "SELECT {agregado}(id) FROM trabajos_exportacion",
+    'categoria': "SELECT {agregado}(nombre) FROM categorias_gasto",
+}
+ARGUMENTOS_FIJOS = {
+    'nombre': 'donaciones',
+    'formato': 'svg',
+}
+ELIMINAN = {'eliminar_gasto', 'eliminar_objetivo', 'eliminar_actividad', 'eliminar_tarea', 'eliminar_responsable'}
+
+# Datos mínimos válidos de cada formulario POST (a partir de los valores de los argumentos).
+# Un POST sin entrada se envía vacío: igual se mide con su presupuesto
+_registros = itertools.count(1)
+
+
+def _formulario_registro(valores):
+    numero = next(_registros)  # cada registro necesita un nombre y un correo nuevos
+    return {'username': f"presupuesto_registro_{numero}", 'password': 'presupuesto',
+            'correo': f"presupuesto_registro_{numero}@example.test", 'fullname': 'Registro de prueba'}
+
+
+FORMULARIOS = {
+    'login': lambda v: {'nombre': 'presupuesto_donador', 'password': 'presupuesto'},
+    'register': _formulario_registro,
+    'formulario_donacion': lambda v: {'monto': '10'},
+    'mi_informacion': lambda v: {'fullname': 'Presupuesto Donador', 'correo': 'presupuesto_donador@example.test',
+                                 'telefono': '', 'direccion': '', 'notas': ''},
+    'edit_user': lambda v: {'username': 'presupuesto_cuenta', 'fullname': 'Presupuesto Cuenta',
+                            'email': 'presupuesto_cuenta@example.test', 'id_rol': '1'},
+    'crear_proyecto': lambda v: {'nombre': 'Proyecto creado', 'descripcion': 'Proyecto de prueba',
+                                 'monto_objetivo': '1000'},
+    'editar_proyecto': lambda v: {'nombre': 'presupuesto 1', 'descripcion': 'Proyecto de prueba',
+                                  'monto_objetivo': '1000'},
+    'crear_gasto': lambda v: {'categoria': v['categoria'], 'descripcion': 'Gasto creado', 'monto': '1',
+                              'fecha_gasto': date.today().isoformat()},
+    'editar_gasto': lambda v: {'categoria': v['categoria'], 'descripcion': 'presupuesto editado', 'monto': '1',
+                               'fecha_gasto': date.today().isoformat()},
+    'actualizar_estado_proyecto': lambda v: {'estado': 'en_ejecucion'},
+    'crear_objetivo': lambda v: {'descripcion': 'Objetivo creado'},
+    'crear_actividad': lambda v: {'nombre': 'Actividad creada', 'descripcion': ''},
+    'actualizar_estado_actividad': lambda v: {'estado': 'en_progreso'},
+    'agregar_responsable': lambda v: {'id_usuario': str(v['user_id']), 'rol_en_proyecto': 'Voluntario'},
+    'crear_tarea': lambda v: {'descripcion': 'Tarea creada'},
+    'actualizar_estado_tarea': lambda v: {'estado': 'en_progreso'},
+}
+
+ROLES = {
+    None: 'anónimo',
+    1: 'donador',
+    2: 'admin',
+    3: 'coordinador',
+    4: 'auditor',
+}
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_cluster_temporal():
+    """Crea e inicia un cluster de PostgreSQL desechable y apunta las variables PG* a él."""
+    directorio = tempfile.mkdtemp(prefix='amicusoft-pg-')
+    datos = os.path.join(directorio, 'data')
+    puerto = _puerto_libre()
+    print(f"🚀 Iniciando cluster temporal en {directorio} (puerto {puerto})...")
+    subprocess.run(['initdb', '-D', datos, '-U', 'postgres', '--auth=trust', '-E', 'UTF8'],
+                   check=True, stdout=subprocess.DEVNULL)
+    subprocess.run(['pg_ctl', '-D', datos, '-l', os.path.join(directorio, 'postgres.log'), '-w',
+                    '-o', f"-p {puerto} -k {directorio} -c listen_addresses=''", 'start'],
+                   check=True, stdout=subprocess.DEVNULL)
+    os.environ.update({
+        'PGHOST': directorio,
+        'PGPORT': str(puerto),
+        'PGUSER': 'postgres',
+        'PGPASSWORD': 'postgres',  # autenticación trust: solo para pasar la validación de credenciales
+        'PGDATABASE': 'postgres',
+    })
+    return directorio
+
+
+def apuntar_configuracion():
+    """
+    Copia las variables PG* actuales a las clases de configuración. config.py las lee al
+    importarse: hace falta si la app se importó antes de iniciar el cluster (pytest).
+    """
+    from config import config
+
+    for clase in config.values():
+        clase.PG_HOST = os.environ.get('PGHOST')
+        clase.PG_USER = os.environ.get('PGUSER')
+        clase.PG_PASSWORD = os.environ.get('PGPASSWORD')
+        clase.PG_DB = os.environ.get('PGDATABASE')
+        clase.PG_PORT = int(os.environ.get('PGPORT', '5432'))
+
+
+def detener_cluster_temporal(directorio):
+    subprocess.run(['pg_ctl', '-D', os.path.join(directorio, 'data'), '-m', 'fast', 'stop'],
+                   stdout=subprocess.DEVNULL)
+    shutil.rmtree(directorio, ignore_errors=True)
+
+
+def crear_usuarios(conn):
+    """
+    Un usuario por rol, propietario de los datos sembrados, y la cuenta presupuesto_cuenta
+    que editan y desactivan las rutas de administración. Retorna {id_rol: id}.
+    """
+    from werkzeug.security import generate_password_hash
+
+    cursor = conn.cursor()
+    usuarios = {}
+    password = generate_password_hash('presupuesto')
+    for id_rol, nombre in list(ROLES.items()) + [(1, 'cuenta')]:
+        if id_rol is None:
+            continue
+        cursor.execute("""
+            INSERT INTO usuarios (nombre, correo, password, fullname, id_rol)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (nombre) DO UPDATE SET id_rol = EXCLUDED.id_rol
+            RETURNING id
+        """, (f"presupuesto_{nombre}", f"presupuesto_{nombre}@example.test", password,
+              f"Presupuesto {nombre.capitalize()}", id_rol))
+        id_usuario = cursor.fetchone()[0]
+        if nombre != 'cuenta':
+            usuarios[id_rol] = id_usuario
+    conn.commit()
+    cursor.close()
+    return usuarios
+
+
+def sembrar(conn, usuarios, escala, anterior):
+    """
+    Agrega datos hasta llegar a `escala` proyectos del coordinador (desde `anterior`):
+    20 donaciones, 5 gastos y 10 registros de auditoría por proyecto, con la mitad de
+    las donaciones en un proyecto "caliente" y objetivos, actividades y tareas en él.
+    """
+    nuevos = escala - anterior
+    if nuevos <= 0:
+        return
+    params = {
+        'nuevos': nuevos,
+        'anterior': anterior,
+        'donador': usuarios[1],
+        'coordinador': usuarios[3],
+        'auditor': usuarios[4],
+        'usuarios': list(usuarios.values()),
+    }
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO proyectos (nombre, descripcion, monto_objetivo, monto_recaudado, id_usuario,
+                                   estado, fecha_creacion)
+            SELECT 'presupuesto ' || g, 'Proyecto de prueba de presupuesto de consultas ' || g,
+                   1000 + (g %% 50) * 100, 0, %(coordinador)s, 'en_ejecucion',
+                   CURRENT_TIMESTAMP - g * INTERVAL '1 hour'
+            FROM generate_series(%(anterior)s + 1, %(anterior)s + %(nuevos)s) g
+        """, params)
+        cursor.execute("""
+            WITH p AS (
+                SELECT array_agg(id_proyecto ORDER BY id_proyecto) AS ids
+                FROM proyectos WHERE nombre LIKE 'presupuesto %%'
+            )
+            INSERT INTO donaciones (id_usuario, id_proyecto, monto, fecha_donacion)
+            SELECT %(donador)s,
+                   CASE WHEN g %% 2 = 0 THEN p.ids[1] ELSE p.ids[1 + g %% array_length(p.ids, 1)] END,
+                   10 + g %% 90, CURRENT_TIMESTAMP - (g %% 365) * INTERVAL '1 day'
+            FROM p, generate_series(1, %(nuevos)s * 20) g
+        """, params)
+        cursor.execute("""
+            WITH p AS (
+                SELECT array_agg(id_proyecto ORDER BY id_proyecto) AS ids
+                FROM proyectos WHERE nombre LIKE 'presupuesto %%'
+            ), c AS (
+                SELECT array_agg(nombre ORDER BY nombre) AS nombres FROM categorias_gasto
+            )
+            INSERT INTO gastos (id_proyecto, id_usuario, categoria, descripcion, monto, fecha_gasto)
+            SELECT p.ids[1 + g %% array_length(p.ids, 1)], %(coordinador)s,
+                   c.nombres[1 + g %% array_length(c.nombres, 1)], 'presupuesto ' || g,
+                   5 + g %% 200, CURRENT_DATE - (g %% 365)
+            FROM p, c, generate_series(1, %(nuevos)s * 5) g
+        """, params)
+        cursor.execute("""
+            INSERT INTO auditoria (usuario_id, accion, fecha)
+            SELECT (%(usuarios)s::int[])[1 + g %% cardinality(%(usuarios)s::int[])],
+                   'Acción de prueba ' || g, CURRENT_TIMESTAMP - g * INTERVAL '1 minute'
+            FROM generate_series(1, %(nuevos)s * 10) g
+        """, params)
+        cursor.execute("""
+            WITH p AS (SELECT MIN(id_proyecto) AS id FROM proyectos WHERE nombre LIKE 'presupuesto %%')
+            INSERT INTO objetivos (id_proyecto, descripcion)
+            SELECT p.id, 'Objetivo ' || g FROM p, generate_series(1, %(nuevos)s) g
+        """, params)
+        cursor.execute("""
+            WITH p AS (SELECT MIN(id_proyecto) AS id FROM proyectos WHERE nombre LIKE 'presupuesto %%')
+            INSERT INTO actividades (id_proyecto, nombre, fecha_inicio)
+            SELECT p.id, 'Actividad ' || g, CURRENT_DATE + g FROM p, generate_series(1, %(nuevos)s) g
+        """, params)
+        cursor.execute("""
+            WITH p AS (SELECT MIN(id_proyecto) AS id FROM proyectos WHERE nombre LIKE 'presupuesto %%')
+            INSERT INTO tareas (descripcion, proyecto_id, usuario_id, fecha_fin)
+            SELECT 'Tarea ' || g, p.id, %(coordinador)s, CURRENT_DATE + g FROM p, generate_series(1, %(nuevos)s) g
+        """, params)
+        cursor.execute("""
+            INSERT INTO responsables (id_proyecto, id_usuario, rol_en_proyecto)
+            SELECT MIN(p.id_proyecto), u.id, 'Voluntario'
+            FROM proyectos p, unnest(ARRAY[%(donador)s, %(auditor)s]) u(id)
+            WHERE p.nombre LIKE 'presupuesto %%'
+            GROUP BY u.id
+            ON CONFLICT (id_proyecto, id_usuario) DO NOTHING
+        """, params)
+        cursor.execute("""
+            UPDATE proyectos p SET monto_recaudado = d.total
+            FROM (SELECT id_proyecto, SUM(monto) AS total FROM donaciones GROUP BY id_proyecto) d
+            WHERE d.id_proyecto = p.id_proyecto AND p.nombre LIKE 'presupuesto %'
+        """)
+        # Un trabajo de exportación en estado final (ningún worker lo toma)
+        cursor.execute("""
+            INSERT INTO trabajos_exportacion (tipo, parametros, id_usuario, estado, error, terminado_en)
+            SELECT 'donaciones_pdf', '{}'::jsonb, %(auditor)s, 'error', 'presupuesto', CURRENT_TIMESTAMP
+            WHERE NOT EXISTS (SELECT 1 FROM trabajos_exportacion)
+        """, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def valores_argumentos(conn, agregado='MIN'):
+    cursor = conn.cursor()
+    valores = dict(ARGUMENTOS_FIJOS)
+    for nombre, sql in ARGUMENTOS.items():
+        cursor.execute(sql.format(agregado=agregado))
+        valores[nombre] = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return valores
+
+
+def rutas(app, metodos=METODOS, filtro=None):
+    """Pares (regla, método) a medir, ordenados por URL."""
+    for regla in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if filtro and regla.endpoint != filtro:
+            continue
+        for metodo in metodos:
+            if metodo in regla.methods and (regla.endpoint, metodo) not in SIN_VISITAR:
+                yield regla, metodo
+
+
+def presupuesto(endpoint, metodo):
+    return PRESUPUESTOS.get((endpoint, metodo), PRESUPUESTO_DEFAULT)
+
+
+def instalar_captura(app):
+    """
+    Registra (una sola vez, antes de la primera petición) los contadores de cada petición:
+    consultas SQL de la petición y conexiones tomadas del pool por el hilo que la atiende
+    (el cliente de pruebas atiende en el hilo que llama a medir()).
+    """
+    import src.database as database
+    from flask import g
+
+    captura = {'consultas': 0, 'conexiones': 0, 'hilo': None}
+    registrar_original = database.registrar_checkout
+
+    def contar_checkout(espera, exito=True):
+        if threading.get_ident() == captura['hilo']:
+            captura['conexiones'] += 1
+        registrar_original(espera, exito)
+
+    def capturar(response):
+        estadisticas = g.get('_sql_stats')
+        captura['consultas'] = estadisticas.consultas if estadisticas is not None else 0
+        return response
+
+    database.registrar_checkout = contar_checkout
+    app.after_request(capturar)
+    return captura
+
+
+def medir(app, cliente, captura, usuarios, regla, metodo, id_rol, valores, valores_eliminar):
+    """
+    Hace una petición a la regla con el rol indicado. Retorna (status, consultas, conexiones),
+    o None si falta el valor de algún argumento de la URL.
+    """
+    from flask import url_for
+    from src.models.ModelUser import ModelUser
+
+    if regla.endpoint in ELIMINAN:
+        valores = valores_eliminar
+    if any(valores.get(arg) is None for arg in regla.arguments):
+        return None
+    with app.test_request_context():
+        url = url_for(regla.endpoint, **{arg: valores[arg] for arg in regla.arguments})
+
+    with cliente.session_transaction() as sesion:
+        sesion.clear()
+        if id_rol is not None:
+            sesion['_user_id'] = str(usuarios[id_rol])
+            sesion['_fresh'] = True
+    # Sin caché del usuario: cada petición paga su carga y las cuentas son estables
+    ModelUser.user_cache.clear()
+    captura.update(consultas=0, conexiones=0, hilo=threading.get_ident())
+
+    if metodo == 'POST':
+        formulario = FORMULARIOS.get(regla.endpoint)
+        response = cliente.post(url, data=formulario(valores) if formulario else {})
+    else:
+        response = cliente.get(url)
+    response.get_data()  # consume las respuestas en streaming (CSV)
+    response.close()
+    return response.status_code, captura['consultas'], captura['conexiones']
+
+
+def medir_rutas(app, captura, usuarios, conn, metodos=METODOS, filtro=None):
+    """
+    Visita cada ruta con cada método y rol.
+    Retorna {(endpoint, método, rol): (status, consultas, conexiones)}.
+    """
+    resultados = {}
+    cliente = app.test_client()
+    for regla, metodo in rutas(app, metodos, filtro):
+        for id_rol, rol in ROLES.items():
+            # Se recalculan en cada petición: los POST crean y eliminan filas
+            medicion = medir(app, cliente, captura, usuarios, regla, metodo, id_rol,
+                             valores_argumentos(conn), valores_argumentos(conn, 'MAX'))
+            if medicion is None:
+                print(f"⚠️  {regla.endpoint} {metodo}: sin valor para sus argumentos, se omite")
+                break
+            resultados[(regla.endpoint, metodo, rol)] = medicion
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica el presupuesto de consultas SQL de cada ruta")
+    parser.add_argument('--escalas', default='10,100,1000',
+                        help="proyectos sembrados en cada ronda, separados por comas (default: 10,100,1000)")
+    parser.add_argument('--cluster-temporal', action='store_true',
+                        help="inicia un cluster de PostgreSQL desechable (initdb/pg_ctl) y lo elimina al final")
+    parser.add_argument('--permitir-escritura', action='store_true',
+                        help="permite sembrar datos en la base de datos configurada (debe ser desechable)")
+    parser.add_argument('--endpoint', default=None, help="solo mide este endpoint")
+    parser.add_argument('--informe', action='store_true', help="muestra las cuentas de todas las rutas")
+    args = parser.parse_args(argv)
+
+    if not args.cluster_temporal and not args.permitir_escritura:
+        print("❌ Este script escribe datos: use --cluster-temporal o --permitir-escritura con una base desechable")
+        sys.exit(2)
+    escalas = sorted(int(e) for e in args.escalas.split(',') if e.strip())
+
+    cluster = iniciar_cluster_temporal() if args.cluster_temporal else None
+    try:
+        # La configuración lee las variables PG* al importarse: después de iniciar el cluster
+        from init_db import get_db_connection, init_database
+        init_database()
+        from app import app
+
+        # Una ruta que falla responde 500 (se reporta) en lugar de interrumpir la medición
+        app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, SQL_INSTRUMENTACION=True,
+                          PROPAGATE_EXCEPTIONS=False)
+        captura = instalar_captura(app)
+        conn = get_db_connection()
+        usuarios = crear_usuarios(conn)
+        por_escala = {}
+        anterior = 0
+        for escala in escalas:
+            print(f"\n🔧 Sembrando datos: {escala} proyectos...")
+            sembrar(conn, usuarios, escala, anterior)
+            anterior = escala
+            print(f"🔄 Midiendo rutas (escala {escala})...")
+            por_escala[escala] = medir_rutas(app, captura, usuarios, conn, filtro=args.endpoint)
+        conn.close()
+    finally:
+        if cluster:
+            detener_cluster_temporal(cluster)
+
+    violaciones = []
+    crecimientos = []
+    maximos = defaultdict(lambda: (0, 0))
+    for escala, resultados in por_escala.items():
+        for (endpoint, metodo, rol), (status, consultas, conexiones) in resultados.items():
+            if status >= 500:
+                violaciones.append(f"{endpoint} {metodo} [{rol}, escala {escala}]: HTTP {status}")
+            max_consultas, max_conexiones = presupuesto(endpoint, metodo)
+            if consultas > max_consultas or conexiones > max_conexiones:
+                violaciones.append(f"{endpoint} {metodo} [{rol}, escala {escala}, HTTP {status}]: "
+                                   f"{consultas}/{max_consultas} consultas, {conexiones}/{max_conexiones} conexiones")
+            previo = maximos[(endpoint, metodo, rol)]
+            maximos[(endpoint, metodo, rol)] = (max(previo[0], consultas), max(previo[1], conexiones))
+
+    if len(escalas) > 1:
+        # Solo GET: los POST cambian los datos entre una escala y otra
+        menor, mayor = por_escala[escalas[0]], por_escala[escalas[-1]]
+        for clave, (_, consultas, _) in mayor.items():
+            if clave[1] == 'GET' and clave in menor and consultas > menor[clave][1]:
+                crecimientos.append(f"{clave[0]} [{clave[2]}]: {menor[clave][1]} -> {consultas} consultas "
+                                    f"(escala {escalas[0]} -> {escalas[-1]})")
+
+    if args.informe:
+        print(f"\n{'Endpoint':<36} {'Método':<6} {'Rol':<12} {'Consultas':>9} {'Conexiones':>10}  Presupuesto")
+        for (endpoint, metodo, rol), (consultas, conexiones) in sorted(maximos.items()):
+            max_consultas, max_conexiones = presupuesto(endpoint, metodo)
+            print(f"{endpoint:<36} {metodo:<6} {rol:<12} {consultas:>9} {conexiones:>10}  "
+                  f"{max_consultas}/{max_conexiones}")
+
+    total = len({clave[:2] for clave in maximos})
+    if crecimientos:
+        print("\n⚠️  Consultas que crecen con los datos (posible N+1):")
+        for linea in crecimientos:
+            print(f"   • {linea}")
+    if violaciones:
+        print("\n❌ Presupuestos excedidos:")
+        for linea in violaciones:
+            print(f"   • {linea}")
+    if violaciones or crecimientos:
+        sys.exit(1)
+    print(f"\n✅ {total} rutas dentro de su presupuesto en las escalas {', '.join(map(str, escalas))}")
+
+
+if __name__ == '__main__':
+    main()
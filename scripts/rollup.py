@@ -0,0 +1,43 @@
+"""
+Incremental rollup job for the daily donation and expense tables.
+
+Each run only aggregates rows newer than the stored watermark (rollup_marcas) and
+recomputes the days flagged in rollup_recalcular by updates or deletes. Safe to run
+from cron every few minutes; concurrent runs are serialized by an advisory lock.
+
+Usage:
+    python scripts/rollup.py                 # one pass
+    python scripts/rollup.py --intervalo 60  # keep running, one pass per minute
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from init_db import get_db_connection
+from src.utils.rollups import ejecutar_rollups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actualiza los rollups diarios de donaciones y gastos")
+    parser.add_argument('--intervalo', type=float, default=None,
+                        help="segundos entre corridas (sin este parámetro se ejecuta una sola vez)")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    try:
+        while True:
+            print("🔄 Actualizando rollups...")
+            ejecutar_rollups(conn)
+            if args.intervalo is None:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        print("\nRollups detenidos")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -12,18 +12,14 @@ from src.models.ModelDonacion import ModelDonacion
 def panel():
     db = get_db()
     try:
-        # Obtener estadísticas
-        users_data = ModelUser.get_all(db)
-        proyectos = ModelProyecto.get_all(db)
-        
         # Contar usuarios activos (no desactivados, id_rol != 5)
-        usuarios_registrados = len([u for u in users_data if u.get('id_rol') != 5]) if users_data else 0
-        
-        # Contar proyectos
-        proyectos_activos = len(proyectos) if proyectos else 0
+        usuarios_por_rol = ModelUser.count_by_role(db)
+        usuarios_registrados = sum(total for id_rol, total in usuarios_por_rol.items() if id_rol != 5)
         
-        # Calcular total recaudado
-        total_recaudado = sum(p.monto_recaudado or 0 for p in proyectos) if proyectos else 0
+        # Contar proyectos y total recaudado (agregado en SQL)
+        resumen = ModelProyecto.get_stats_resumen(db)
+        proyectos_activos = resumen['total_proyectos']
+        total_recaudado = resumen['total_recaudado']
     finally:
         db.close()
     
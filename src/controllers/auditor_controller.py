@@ -1,11 +1,17 @@
-from flask import render_template, request, flash, redirect, url_for, Response
+from flask import render_template, request, flash, redirect, url_for, jsonify, send_file
 from flask_login import login_required, current_user
 from src.database import get_db
-from src.utils.auditoria import get_audit_logs, log_action
+from src.utils.auditoria import get_audit_page, decode_audit_cursor, log_action
+from src.utils.exportacion import (xlsx_response, csv_response, parquet_response, where_reporte,
+                                   build_xlsx, stream_query, XLSX_MIMETYPE)
+from src.utils.cache_exportaciones import (export_cache, get_data_version, not_modified, cached_file_response,
+                                           TABLAS_DONACIONES, TABLAS_GASTOS)
+from src.utils.trabajos import encolar_trabajo, get_trabajo, get_trabajos_usuario, clave_trabajo
+from src.utils.metricas import medir_exportacion
 from psycopg2.extras import RealDictCursor
 from functools import wraps
-import io
-from datetime import datetime
+import os
+from datetime import datetime, time
 
 
 def auditor_required(f):
@@ -21,6 +27,90 @@ def auditor_required(f):
     return decorated_function
 
 
+def _filtros_reporte():
+    """Filtros de los reportes y exportaciones tomados del query string"""
+    return {
+        'fecha_desde': request.args.get('fecha_desde', ''),
+        'fecha_hasta': request.args.get('fecha_hasta', ''),
+        'id_proyecto': request.args.get('id_proyecto', type=int),
+    }
+
+
+def _filtros_url(filtros):
+    """Filtros con valor, para repetirlos en los enlaces de exportación"""
+    return {k: v for k, v in filtros.items() if v}
+
+
+# Columnas y tipos de las exportaciones Parquet (mismo orden que el SELECT de cada una)
+COLUMNAS_PARQUET_DONACIONES = [
+    ('id_donacion', 'entero'), ('donador', 'texto'), ('correo', 'texto'), ('proyecto', 'texto'),
+    ('monto', 'monto'), ('fecha_donacion', 'fecha_hora'),
+]
+COLUMNAS_PARQUET_GASTOS = [
+    ('id_gasto', 'entero'), ('proyecto', 'texto'), ('categoria', 'texto'), ('descripcion', 'texto'),
+    ('monto', 'monto'), ('fecha_gasto', 'fecha'), ('registrado_por', 'texto'),
+]
+COLUMNAS_PARQUET_AUDITORIA = [
+    ('id', 'entero'), ('usuario', 'texto'), ('accion', 'texto'), ('fecha', 'fecha_hora'),
+]
+
+
+def _sql_export_donaciones(filtros):
+    where, params = where_reporte(filtros, 'd.fecha_donacion', 'd.id_proyecto')
+    sql = f"""
+        SELECT d.id_donacion, u.fullname AS donador, u.correo, p.nombre AS proyecto,
+               d.monto, d.fecha_donacion
+        FROM donaciones d
+        JOIN usuarios u ON d.id_usuario = u.id
+        JOIN proyectos p ON d.id_proyecto = p.id_proyecto
+        {where}
+        ORDER BY d.fecha_donacion DESC
+    """
+    return sql, params
+
+
+def _sql_export_gastos(filtros):
+    where, params = where_reporte(filtros, 'g.fecha_gasto', 'g.id_proyecto')
+    sql = f"""
+        SELECT g.id_gasto, p.nombre AS proyecto, g.categoria, g.descripcion, g.monto,
+               g.fecha_gasto, u.fullname AS registrado_por
+        FROM gastos g
+        JOIN usuarios u ON g.id_usuario = u.id
+        JOIN proyectos p ON g.id_proyecto = p.id_proyecto
+        {where}
+        ORDER BY g.fecha_gasto DESC
+    """
+    return sql, params
+
+
+def _sql_export_auditoria(filtros):
+    where, params = where_reporte(filtros, 'a.fecha')
+    if filtros.get('usuario_id'):
+        where = f"{where} AND a.usuario_id = %s" if where else "WHERE a.usuario_id = %s"
+        params.append(filtros['usuario_id'])
+    sql = f"""
+        SELECT a.id, COALESCE(u.fullname, 'Sistema') AS usuario, a.accion, a.fecha
+        FROM auditoria a
+        LEFT JOIN usuarios u ON a.usuario_id = u.id
+        {where}
+        ORDER BY a.fecha DESC, a.id DESC
+    """
+    return sql, params
+
+
+def _filtros_auditoria():
+    return {
+        'usuario_id': request.args.get('usuario_id', type=int),
+        'fecha_desde': request.args.get('fecha_desde', ''),
+        'fecha_hasta': request.args.get('fecha_hasta', ''),
+    }
+
+
+def _get_proyectos_filtro(cursor):
+    cursor.execute("SELECT id_proyecto, nombre FROM proyectos ORDER BY nombre")
+    return cursor.fetchall()
+
+
 @login_required
 @auditor_required
 def panel_auditor():
@@ -32,20 +122,51 @@ def panel_auditor():
 @login_required
 @auditor_required
 def ver_auditoria():
-    """Ver registros de auditoría"""
-    page = request.args.get('page', 1, type=int)
+    """Ver registros de auditoría (paginados por cursor)"""
     per_page = 50
     
-    logs = get_audit_logs(limit=per_page * page)
+    filtros = _filtros_auditoria()
+    
+    fecha_desde = None
+    fecha_hasta = None
+    try:
+        if filtros['fecha_desde']:
+            fecha_desde = datetime.strptime(filtros['fecha_desde'], '%Y-%m-%d')
+        if filtros['fecha_hasta']:
+            # Se incluye el día completo
+            fecha_hasta = datetime.combine(datetime.strptime(filtros['fecha_hasta'], '%Y-%m-%d').date(), time.max)
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for('ver_auditoria'))
+    
+    pagina = get_audit_page(
+        per_page=per_page,
+        usuario_id=filtros['usuario_id'],
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        after=decode_audit_cursor(request.args.get('after')),
+        before=decode_audit_cursor(request.args.get('before'))
+    )
     
     log_action("Consulta de registros de auditoría")
-    return render_template('auditor/auditoria.html', logs=logs)
+    return render_template('auditor/auditoria.html',
+                         logs=pagina['logs'],
+                         next_cursor=pagina['next_cursor'],
+                         prev_cursor=pagina['prev_cursor'],
+                         filtros=filtros)
 
 
 @login_required
 @auditor_required
 def reportes_donaciones():
     """Ver reportes de donaciones (solo lectura)"""
+    filtros = _filtros_reporte()
+    try:
+        where, params = where_reporte(filtros, 'd.fecha_donacion', 'd.id_proyecto')
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for('auditor_reportes_donaciones'))
+    
     db = None
     try:
         db = get_db()
@@ -55,32 +176,37 @@ def reportes_donaciones():
         
         cursor = db.cursor(cursor_factory=RealDictCursor)
         
-        sql = """
+        sql = f"""
             SELECT d.id_donacion, d.monto, d.fecha_donacion,
                    u.nombre as donador_nombre, u.fullname as donador_fullname,
                    p.nombre as proyecto_nombre
             FROM donaciones d
             JOIN usuarios u ON d.id_usuario = u.id
             JOIN proyectos p ON d.id_proyecto = p.id_proyecto
+            {where}
             ORDER BY d.fecha_donacion DESC
         """
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         donaciones = cursor.fetchall()
         
-        sql_totales = """
+        sql_totales = f"""
             SELECT 
                 COUNT(*) as total_donaciones,
-                COALESCE(SUM(monto), 0) as monto_total
-            FROM donaciones
+                COALESCE(SUM(d.monto), 0) as monto_total
+            FROM donaciones d
+            {where}
         """
-        cursor.execute(sql_totales)
+        cursor.execute(sql_totales, params)
         totales = cursor.fetchone()
         
+        proyectos = _get_proyectos_filtro(cursor)
         cursor.close()
         
         log_action("Consulta de reportes de donaciones")
         return render_template('auditor/reportes-donaciones.html', 
-                             donaciones=donaciones, totales=totales)
+                             donaciones=donaciones, totales=totales,
+                             proyectos=proyectos, filtros=filtros,
+                             filtros_url=_filtros_url(filtros))
     except Exception as ex:
         print(f"Error en reportes_donaciones: {ex}")
         flash('Error al obtener los reportes', 'danger')
@@ -94,6 +220,13 @@ def reportes_donaciones():
 @auditor_required
 def reportes_gastos():
     """Ver reportes de gastos (solo lectura)"""
+    filtros = _filtros_reporte()
+    try:
+        where, params = where_reporte(filtros, 'g.fecha_gasto', 'g.id_proyecto')
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for('auditor_reportes_gastos'))
+    
     db = None
     try:
         db = get_db()
@@ -103,32 +236,37 @@ def reportes_gastos():
         
         cursor = db.cursor(cursor_factory=RealDictCursor)
         
-        sql = """
+        sql = f"""
             SELECT g.id_gasto, g.categoria, g.descripcion, g.monto, g.fecha_gasto,
                    u.nombre as usuario_nombre, u.fullname as usuario_fullname,
                    p.nombre as proyecto_nombre
             FROM gastos g
             JOIN usuarios u ON g.id_usuario = u.id
             JOIN proyectos p ON g.id_proyecto = p.id_proyecto
+            {where}
             ORDER BY g.fecha_gasto DESC
         """
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         gastos = cursor.fetchall()
         
-        sql_totales = """
+        sql_totales = f"""
             SELECT 
                 COUNT(*) as total_gastos,
-                COALESCE(SUM(monto), 0) as monto_total
-            FROM gastos
+                COALESCE(SUM(g.monto), 0) as monto_total
+            FROM gastos g
+            {where}
         """
-        cursor.execute(sql_totales)
+        cursor.execute(sql_totales, params)
         totales = cursor.fetchone()
         
+        proyectos = _get_proyectos_filtro(cursor)
         cursor.close()
         
         log_action("Consulta de reportes de gastos")
         return render_template('auditor/reportes-gastos.html', 
-                             gastos=gastos, totales=totales)
+                             gastos=gastos, totales=totales,
+                             proyectos=proyectos, filtros=filtros,
+                             filtros_url=_filtros_url(filtros))
     except Exception as ex:
         print(f"Error en reportes_gastos: {ex}")
         flash('Error al obtener los reportes', 'danger')
@@ -138,56 +276,52 @@ def reportes_gastos():
             db.close()
 
 
+def _excel_cacheado(db, tipo, construir_sql, tablas, headers, sheet_name, nombre):
+    """
+    Exportación a Excel servida desde la caché de exportaciones cuando los datos no
+    cambiaron desde la última vez (misma clave = mismos filtros y versión de datos).
+    """
+    filtros = _filtros_url(_filtros_reporte())
+    clave = export_cache.clave(tipo, filtros, get_data_version(db, tablas))
+    filename = f"{nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    response = not_modified(clave)
+    if response is not None:
+        return response
+    
+    ruta = export_cache.get(clave)
+    if ruta is None:
+        sql, params = construir_sql(filtros)
+        with medir_exportacion(nombre, 'xlsx'):
+            output = build_xlsx(stream_query(db, sql, params), headers, sheet_name)
+        try:
+            ruta = export_cache.put(clave, output)
+        finally:
+            output.close()
+    return cached_file_response(ruta, clave, XLSX_MIMETYPE, filename)
+
+
 @login_required
 @auditor_required
 def exportar_donaciones_excel():
-    """Exportar donaciones a Excel"""
-    import pandas as pd
-    
+    """Exportar donaciones a Excel (cursor del servidor + libro write-only)"""
     db = None
     try:
         db = get_db()
         if db is None:
             flash('Error de conexión a la base de datos', 'danger')
-            return redirect(url_for('reportes_donaciones'))
-        
-        cursor = db.cursor(cursor_factory=RealDictCursor)
-        
-        sql = """
-            SELECT d.id_donacion as "ID", 
-                   u.fullname as "Donador",
-                   u.correo as "Correo",
-                   p.nombre as "Proyecto",
-                   d.monto as "Monto",
-                   d.fecha_donacion as "Fecha"
-            FROM donaciones d
-            JOIN usuarios u ON d.id_usuario = u.id
-            JOIN proyectos p ON d.id_proyecto = p.id_proyecto
-            ORDER BY d.fecha_donacion DESC
-        """
-        cursor.execute(sql)
-        donaciones = cursor.fetchall()
-        cursor.close()
-        
-        df = pd.DataFrame(donaciones)
+            return redirect(url_for('auditor_reportes_donaciones'))
         
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Donaciones', index=False)
-        output.seek(0)
+        response = _excel_cacheado(db, 'donaciones_xlsx', _sql_export_donaciones, TABLAS_DONACIONES,
+                                   ['ID', 'Donador', 'Correo', 'Proyecto', 'Monto', 'Fecha'],
+                                   'Donaciones', 'donaciones')
         
         log_action("Exportación de donaciones a Excel")
-        
-        filename = f"donaciones_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return Response(
-            output.getvalue(),
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return response
     except Exception as ex:
         print(f"Error en exportar_donaciones_excel: {ex}")
         flash('Error al exportar los datos', 'danger')
-        return redirect(url_for('reportes_donaciones'))
+        return redirect(url_for('auditor_reportes_donaciones'))
     finally:
         if db:
             db.close()
@@ -196,54 +330,67 @@ def exportar_donaciones_excel():
 @login_required
 @auditor_required
 def exportar_gastos_excel():
-    """Exportar gastos a Excel"""
-    import pandas as pd
-    
+    """Exportar gastos a Excel (cursor del servidor + libro write-only)"""
     db = None
     try:
         db = get_db()
         if db is None:
             flash('Error de conexión a la base de datos', 'danger')
-            return redirect(url_for('reportes_gastos'))
-        
-        cursor = db.cursor(cursor_factory=RealDictCursor)
-        
-        sql = """
-            SELECT g.id_gasto as "ID",
-                   p.nombre as "Proyecto",
-                   g.categoria as "Categoría",
-                   g.descripcion as "Descripción",
-                   g.monto as "Monto",
-                   g.fecha_gasto as "Fecha",
-                   u.fullname as "Registrado por"
-            FROM gastos g
-            JOIN usuarios u ON g.id_usuario = u.id
-            JOIN proyectos p ON g.id_proyecto = p.id_proyecto
-            ORDER BY g.fecha_gasto DESC
-        """
-        cursor.execute(sql)
-        gastos = cursor.fetchall()
-        cursor.close()
-        
-        df = pd.DataFrame(gastos)
+            return redirect(url_for('auditor_reportes_gastos'))
         
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Gastos', index=False)
-        output.seek(0)
+        response = _excel_cacheado(db, 'gastos_xlsx', _sql_export_gastos, TABLAS_GASTOS,
+                                   ['ID', 'Proyecto', 'Categoría', 'Descripción', 'Monto', 'Fecha', 'Registrado por'],
+                                   'Gastos', 'gastos')
         
         log_action("Exportación de gastos a Excel")
-        
-        filename = f"gastos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return Response(
-            output.getvalue(),
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return response
     except Exception as ex:
         print(f"Error en exportar_gastos_excel: {ex}")
         flash('Error al exportar los datos', 'danger')
-        return redirect(url_for('reportes_gastos'))
+        return redirect(url_for('auditor_reportes_gastos'))
+    finally:
+        if db:
+            db.close()
+
+
+def _encolar_pdf(tipo, vista_retorno):
+    """Registra la exportación en la cola de trabajos; el PDF lo genera scripts/export_worker.py"""
+    filtros = _filtros_reporte()
+    try:
+        where_reporte(filtros, 'fecha')
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for(vista_retorno))
+    
+    db = None
+    try:
+        db = get_db()
+        if db is None:
+            flash('Error de conexión a la base de datos', 'danger')
+            return redirect(url_for(vista_retorno))
+        
+        # Si el mismo reporte ya se generó con los datos actuales, se entrega sin encolar
+        parametros = _filtros_url(filtros)
+        clave = clave_trabajo(db, tipo, parametros)
+        response = not_modified(clave)
+        if response is not None:
+            return response
+        ruta = export_cache.get(clave)
+        if ruta is not None:
+            log_action(f"Exportación {tipo} servida desde caché")
+            nombre = tipo.replace('_pdf', '')
+            return cached_file_response(ruta, clave, 'application/pdf',
+                                        f"{nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+        
+        # Con la clave, un segundo clic mientras se genera retorna el mismo trabajo
+        success, resultado = encolar_trabajo(db, tipo, parametros, current_user.id, clave)
+        if not success:
+            flash('Error al solicitar la exportación', 'danger')
+            return redirect(url_for(vista_retorno))
+        
+        log_action(f"Solicitud de exportación {tipo} (trabajo {resultado})")
+        flash('El reporte se está generando. Podrás descargarlo aquí cuando esté listo.', 'info')
+        return redirect(url_for('ver_exportaciones'))
     finally:
         if db:
             db.close()
@@ -252,187 +399,176 @@ def exportar_gastos_excel():
 @login_required
 @auditor_required
 def exportar_donaciones_pdf():
-    """Exportar donaciones a PDF"""
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    
+    """Exportar donaciones a PDF (trabajo en segundo plano)"""
+    return _encolar_pdf('donaciones_pdf', 'auditor_reportes_donaciones')
+
+
+@login_required
+@auditor_required
+def exportar_gastos_pdf():
+    """Exportar gastos a PDF (trabajo en segundo plano)"""
+    return _encolar_pdf('gastos_pdf', 'auditor_reportes_gastos')
+
+
+def _trabajo_del_usuario(db, id_trabajo):
+    """Retorna el trabajo si pertenece al usuario actual (o si es administrador)"""
+    trabajo = get_trabajo(db, id_trabajo)
+    if trabajo is None:
+        return None
+    if trabajo['id_usuario'] != current_user.id and int(getattr(current_user, "id_rol", 0)) != 2:
+        return None
+    return trabajo
+
+
+@login_required
+@auditor_required
+def ver_exportaciones():
+    """Lista de exportaciones solicitadas por el usuario y su estado"""
     db = None
     try:
         db = get_db()
         if db is None:
             flash('Error de conexión a la base de datos', 'danger')
-            return redirect(url_for('reportes_donaciones'))
-        
-        cursor = db.cursor(cursor_factory=RealDictCursor)
-        
-        sql = """
-            SELECT d.id_donacion, u.fullname, p.nombre, d.monto, d.fecha_donacion
-            FROM donaciones d
-            JOIN usuarios u ON d.id_usuario = u.id
-            JOIN proyectos p ON d.id_proyecto = p.id_proyecto
-            ORDER BY d.fecha_donacion DESC
-        """
-        cursor.execute(sql)
-        donaciones = cursor.fetchall()
-        
-        sql_totales = """
-            SELECT COUNT(*) as total, COALESCE(SUM(monto), 0) as monto_total
-            FROM donaciones
-        """
-        cursor.execute(sql_totales)
-        totales = cursor.fetchone()
-        cursor.close()
-        
-        output = io.BytesIO()
-        doc = SimpleDocTemplate(output, pagesize=landscape(letter))
-        elements = []
-        
-        styles = getSampleStyleSheet()
-        elements.append(Paragraph("Reporte de Donaciones", styles['Heading1']))
-        elements.append(Paragraph(f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        data = [['ID', 'Donador', 'Proyecto', 'Monto', 'Fecha']]
-        for d in donaciones:
-            data.append([
-                str(d['id_donacion']),
-                d['fullname'][:30] if d['fullname'] else '',
-                d['nombre'][:30] if d['nombre'] else '',
-                f"${d['monto']:,.2f}",
-                d['fecha_donacion'].strftime('%d/%m/%Y') if d['fecha_donacion'] else ''
-            ])
+            return redirect(url_for('panel_auditor'))
         
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(table)
+        trabajos = get_trabajos_usuario(db, current_user.id)
+        return render_template('auditor/exportaciones.html', trabajos=trabajos)
+    except Exception as ex:
+        print(f"Error en ver_exportaciones: {ex}")
+        flash('Error al obtener las exportaciones', 'danger')
+        return redirect(url_for('panel_auditor'))
+    finally:
+        if db:
+            db.close()
+
+
+@login_required
+@auditor_required
+def estado_exportacion(id_trabajo):
+    """Estado de un trabajo de exportación (JSON, para consultar periódicamente)"""
+    db = None
+    try:
+        db = get_db()
+        if db is None:
+            return jsonify({'error': 'Error de conexión a la base de datos'}), 500
         
-        elements.append(Spacer(1, 20))
-        elements.append(Paragraph(f"Total de donaciones: {totales['total']}", styles['Normal']))
-        elements.append(Paragraph(f"Monto total: ${totales['monto_total']:,.2f}", styles['Normal']))
+        trabajo = _trabajo_del_usuario(db, id_trabajo)
+        if trabajo is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
         
-        doc.build(elements)
-        output.seek(0)
+        return jsonify({
+            'id': trabajo['id'],
+            'estado': trabajo['estado'],
+            'error': trabajo['error'],
+            'descarga': url_for('descargar_exportacion', id_trabajo=trabajo['id']) if trabajo['estado'] == 'completado' else None
+        })
+    finally:
+        if db:
+            db.close()
+
+
+@login_required
+@auditor_required
+def descargar_exportacion(id_trabajo):
+    """Descarga el archivo de un trabajo completado"""
+    db = None
+    try:
+        db = get_db()
+        if db is None:
+            flash('Error de conexión a la base de datos', 'danger')
+            return redirect(url_for('ver_exportaciones'))
+        
+        trabajo = _trabajo_del_usuario(db, id_trabajo)
+        if trabajo is None or trabajo['estado'] != 'completado' or not trabajo['archivo']:
+            flash('La exportación no está disponible', 'warning')
+            return redirect(url_for('ver_exportaciones'))
+        if not os.path.exists(trabajo['archivo']):
+            flash('El archivo de la exportación ya no existe; solicítala de nuevo', 'warning')
+            return redirect(url_for('ver_exportaciones'))
+        
+        log_action(f"Descarga de exportación (trabajo {id_trabajo})")
+        return send_file(trabajo['archivo'], mimetype='application/pdf',
+                         as_attachment=True, download_name=trabajo['nombre_archivo'])
+    finally:
+        if db:
+            db.close()
+
+
+@login_required
+@auditor_required
+def exportar_auditoria_excel():
+    """Exportar registros de auditoría a Excel (cursor del servidor + libro write-only)"""
+    db = None
+    try:
+        db = get_db()
+        if db is None:
+            flash('Error de conexión a la base de datos', 'danger')
+            return redirect(url_for('ver_auditoria'))
         
-        log_action("Exportación de donaciones a PDF")
+        sql, params = _sql_export_auditoria(_filtros_auditoria())
+        filename = f"auditoria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        with medir_exportacion('auditoria', 'xlsx'):
+            response = xlsx_response(db, sql, ['ID', 'Usuario', 'Acción', 'Fecha'], 'Auditoría', filename, params)
         
-        filename = f"donaciones_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        return Response(
-            output.getvalue(),
-            mimetype='application/pdf',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        log_action("Exportación de auditoría a Excel")
+        return response
     except Exception as ex:
-        print(f"Error en exportar_donaciones_pdf: {ex}")
+        print(f"Error en exportar_auditoria_excel: {ex}")
         flash('Error al exportar los datos', 'danger')
-        return redirect(url_for('reportes_donaciones'))
+        return redirect(url_for('ver_auditoria'))
     finally:
         if db:
             db.close()
 
 
-@login_required
-@auditor_required
-def exportar_gastos_pdf():
-    """Exportar gastos a PDF"""
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
+def _exportar_csv(construir_sql, filtros, nombre, vista_retorno):
+    """COPY ... TO STDOUT enviado al cliente por bloques, sin pasar por Python fila a fila"""
+    try:
+        sql, params = construir_sql(filtros)
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for(vista_retorno))
+    
+    filename = f"{nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    try:
+        response = csv_response(sql, filename, params, nombre)
+    except Exception as ex:
+        print(f"Error en exportación CSV de {nombre}: {ex}")
+        flash('Error al exportar los datos', 'danger')
+        return redirect(url_for(vista_retorno))
+    
+    log_action(f"Exportación de {nombre} a CSV")
+    return response
+
+
+def _exportar_parquet(construir_sql, filtros, columnas, nombre, vista_retorno):
+    """Exportación a Parquet por lotes de columnas (requiere pyarrow)"""
+    try:
+        sql, params = construir_sql(filtros)
+    except ValueError:
+        flash('Formato de fecha invalido', 'danger')
+        return redirect(url_for(vista_retorno))
     
     db = None
     try:
         db = get_db()
         if db is None:
             flash('Error de conexión a la base de datos', 'danger')
-            return redirect(url_for('reportes_gastos'))
-        
-        cursor = db.cursor(cursor_factory=RealDictCursor)
-        
-        sql = """
-            SELECT g.id_gasto, p.nombre as proyecto, g.categoria, g.monto, g.fecha_gasto
-            FROM gastos g
-            JOIN proyectos p ON g.id_proyecto = p.id_proyecto
-            ORDER BY g.fecha_gasto DESC
-        """
-        cursor.execute(sql)
-        gastos = cursor.fetchall()
-        
-        sql_totales = """
-            SELECT COUNT(*) as total, COALESCE(SUM(monto), 0) as monto_total
-            FROM gastos
-        """
-        cursor.execute(sql_totales)
-        totales = cursor.fetchone()
-        cursor.close()
-        
-        output = io.BytesIO()
-        doc = SimpleDocTemplate(output, pagesize=landscape(letter))
-        elements = []
-        
-        styles = getSampleStyleSheet()
-        elements.append(Paragraph("Reporte de Gastos", styles['Heading1']))
-        elements.append(Paragraph(f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        data = [['ID', 'Proyecto', 'Categoría', 'Monto', 'Fecha']]
-        for g in gastos:
-            data.append([
-                str(g['id_gasto']),
-                g['proyecto'][:30] if g['proyecto'] else '',
-                g['categoria'][:20] if g['categoria'] else '',
-                f"${g['monto']:,.2f}",
-                g['fecha_gasto'].strftime('%d/%m/%Y') if g['fecha_gasto'] else ''
-            ])
-        
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(table)
-        
-        elements.append(Spacer(1, 20))
-        elements.append(Paragraph(f"Total de gastos: {totales['total']}", styles['Normal']))
-        elements.append(Paragraph(f"Monto total: ${totales['monto_total']:,.2f}", styles['Normal']))
+            return redirect(url_for(vista_retorno))
         
-        doc.build(elements)
-        output.seek(0)
+        filename = f"{nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+        with medir_exportacion(nombre, 'parquet'):
+            response = parquet_response(db, sql, columnas, filename, params)
         
-        log_action("Exportación de gastos a PDF")
-        
-        filename = f"gastos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        return Response(
-            output.getvalue(),
-            mimetype='application/pdf',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        log_action(f"Exportación de {nombre} a Parquet")
+        return response
+    except ImportError:
+        flash('La exportación a Parquet requiere el paquete pyarrow', 'warning')
+        return redirect(url_for(vista_retorno))
     except Exception as ex:
-        print(f"Error en exportar_gastos_pdf: {ex}")
+        print(f"Error en exportación Parquet de {nombre}: {ex}")
         flash('Error al exportar los datos', 'danger')
-        return redirect(url_for('reportes_gastos'))
+        return redirect(url_for(vista_retorno))
     finally:
         if db:
             db.close()
@@ -440,33 +576,47 @@ def exportar_gastos_pdf():
 
 @login_required
 @auditor_required
-def exportar_auditoria_excel():
-    """Exportar registros de auditoría a Excel"""
-    import pandas as pd
-    
-    logs = get_audit_logs(limit=1000)
-    
-    data = []
-    for log in logs:
-        data.append({
-            'ID': log['id'],
-            'Usuario': log['usuario_fullname'],
-            'Acción': log['accion'],
-            'Fecha': log['fecha']
-        })
-    
-    df = pd.DataFrame(data)
-    
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Auditoría', index=False)
-    output.seek(0)
-    
-    log_action("Exportación de auditoría a Excel")
-    
-    filename = f"auditoria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    return Response(
-        output.getvalue(),
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': f'attachment; filename={filename}'}
-    )
+def exportar_donaciones_csv():
+    """Exportar donaciones a CSV (COPY en streaming)"""
+    return _exportar_csv(_sql_export_donaciones, _filtros_reporte(), 'donaciones', 'auditor_reportes_donaciones')
+
+
+@login_required
+@auditor_required
+def exportar_donaciones_parquet():
+    """Exportar donaciones a Parquet"""
+    return _exportar_parquet(_sql_export_donaciones, _filtros_reporte(),
+                             COLUMNAS_PARQUET_DONACIONES,
+                             'donaciones', 'auditor_reportes_donaciones')
+
+
+@login_required
+@auditor_required
+def exportar_gastos_csv():
+    """Exportar gastos a CSV (COPY en streaming)"""
+    return _exportar_csv(_sql_export_gastos, _filtros_reporte(), 'gastos', 'auditor_reportes_gastos')
+
+
+@login_required
+@auditor_required
+def exportar_gastos_parquet():
+    """Exportar gastos a Parquet"""
+    return _exportar_parquet(_sql_export_gastos, _filtros_reporte(),
+                             COLUMNAS_PARQUET_GASTOS,
+                             'gastos', 'auditor_reportes_gastos')
+
+
+@login_required
+@auditor_required
+def exportar_auditoria_csv():
+    """Exportar registros de auditoría a CSV (COPY en streaming)"""
+    return _exportar_csv(_sql_export_auditoria, _filtros_auditoria(), 'auditoria', 'ver_auditoria')
+
+
+@login_required
+@auditor_required
+def exportar_auditoria_parquet():
+    """Exportar registros de auditoría a Parquet"""
+    return _exportar_parquet(_sql_export_auditoria, _filtros_auditoria(),
+                             COLUMNAS_PARQUET_AUDITORIA,
+                             'auditoria', 'ver_auditoria')
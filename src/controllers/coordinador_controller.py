@@ -3,11 +3,9 @@ from flask_login import login_required, current_user
 from decorators import rol_required
 from src.database import get_db
 from src.models.ModelProyecto import ModelProyecto
-from src.models.ModelObjetivo import ModelObjetivo
-from src.models.ModelActividad import ModelActividad
-from src.models.ModelTarea import ModelTarea
 from src.models.entities.proyecto import Proyecto
 from src.models.entities.donacion import Donacion
+from src.utils.graficos import claves_graficos
 
 @login_required
 @rol_required(3, 2)
@@ -20,32 +18,10 @@ def panel_coordinador():
         else:
             proyectos = ModelProyecto.get_by_user(db, current_user.id)
         
-        proyectos_detalles = {}
-        for proyecto in proyectos:
-            objetivos = ModelObjetivo.get_by_proyecto(db, proyecto.id_proyecto)
-            actividades = ModelActividad.get_by_proyecto(db, proyecto.id_proyecto)
-            tareas = ModelTarea.get_by_proyecto(db, proyecto.id_proyecto)
-            
-            objetivos_completados = len([o for o in objetivos if o.completado]) if objetivos else 0
-            total_objetivos = len(objetivos) if objetivos else 0
-            
-            actividades_completadas = len([a for a in actividades if a.estado == 'completada']) if actividades else 0
-            total_actividades = len(actividades) if actividades else 0
-            
-            tareas_completadas = len([t for t in tareas if t.estado == 'completada']) if tareas else 0
-            total_tareas = len(tareas) if tareas else 0
-            
-            proyectos_detalles[proyecto.id_proyecto] = {
-                'objetivos': objetivos[:3] if objetivos else [],
-                'actividades': actividades[:3] if actividades else [],
-                'tareas': tareas[:3] if tareas else [],
-                'objetivos_completados': objetivos_completados,
-                'total_objetivos': total_objetivos,
-                'actividades_completadas': actividades_completadas,
-                'total_actividades': total_actividades,
-                'tareas_completadas': tareas_completadas,
-                'total_tareas': total_tareas,
-            }
+        # Avance de todos los proyectos en una sola consulta
+        proyectos_detalles = ModelProyecto.get_progress_for_projects(
+            db, [p.id_proyecto for p in proyectos]
+        )
     finally:
         db.close()
     return render_template('coordinador/panel-coordinador.html', proyectos=proyectos, proyectos_detalles=proyectos_detalles)
@@ -193,66 +169,21 @@ def reportes_coordinador():
     """Reportes personalizados para coordinador"""
     db = get_db()
     try:
-        if int(getattr(current_user, "id_rol", 0)) == 2:
-            proyectos = ModelProyecto.get_all(db)
-        else:
-            proyectos = ModelProyecto.get_by_user(db, current_user.id)
+        # El administrador ve todos los proyectos; el coordinador, solo los suyos
+        id_usuario = None if int(getattr(current_user, "id_rol", 0)) == 2 else current_user.id
         
-        total_proyectos = len(proyectos) if proyectos else 0
-        total_meta = sum(p.monto_objetivo or 0 for p in proyectos) if proyectos else 0
-        total_recaudado = sum(p.monto_recaudado or 0 for p in proyectos) if proyectos else 0
+        resumen = ModelProyecto.get_stats_resumen(db, id_usuario)
+        total_proyectos = resumen['total_proyectos']
+        total_meta = resumen['total_meta']
+        total_recaudado = resumen['total_recaudado']
         porcentaje_total = round((total_recaudado / total_meta * 100), 2) if total_meta > 0 else 0
+        total_donaciones = resumen['total_donaciones']
+        suma_donaciones = resumen['suma_donaciones']
         
-        cursor = db.cursor()
-        
-        if int(getattr(current_user, "id_rol", 0)) == 2:
-            cursor.execute("SELECT COUNT(*) FROM donaciones")
-            total_donaciones = cursor.fetchone()[0]
-            cursor.execute("SELECT SUM(monto) FROM donaciones")
-            result = cursor.fetchone()
-            suma_donaciones = result[0] if result[0] is not None else 0
-        else:
-            project_ids = [p.id_proyecto for p in proyectos] if proyectos else []
-            if project_ids:
-                placeholders = ','.join(['%s'] * len(project_ids))
-                cursor.execute(f"SELECT COUNT(*) FROM donaciones WHERE id_proyecto IN ({placeholders})", project_ids)
-                total_donaciones = cursor.fetchone()[0]
-                cursor.execute(f"SELECT SUM(monto) FROM donaciones WHERE id_proyecto IN ({placeholders})", project_ids)
-                result = cursor.fetchone()
-                suma_donaciones = result[0] if result[0] is not None else 0
-            else:
-                total_donaciones = 0
-                suma_donaciones = 0
-        
-        top_proyectos = sorted(proyectos, key=lambda p: p.monto_recaudado or 0, reverse=True)[:5] if proyectos else []
-        
-        if int(getattr(current_user, "id_rol", 0)) == 2:
-            cursor.execute("""
-                SELECT p.id_proyecto, p.nombre, COUNT(d.id_donacion) as total_donaciones, 
-                       SUM(d.monto) as total_monto, p.monto_objetivo
-                FROM proyectos p
-                LEFT JOIN donaciones d ON p.id_proyecto = d.id_proyecto
-                GROUP BY p.id_proyecto, p.nombre, p.monto_objetivo
-                ORDER BY total_monto DESC NULLS LAST
-            """)
-        else:
-            project_ids = [p.id_proyecto for p in proyectos] if proyectos else []
-            if project_ids:
-                placeholders = ','.join(['%s'] * len(project_ids))
-                cursor.execute(f"""
-                    SELECT p.id_proyecto, p.nombre, COUNT(d.id_donacion) as total_donaciones, 
-                           SUM(d.monto) as total_monto, p.monto_objetivo
-                    FROM proyectos p
-                    LEFT JOIN donaciones d ON p.id_proyecto = d.id_proyecto
-                    WHERE p.id_proyecto IN ({placeholders})
-                    GROUP BY p.id_proyecto, p.nombre, p.monto_objetivo
-                    ORDER BY total_monto DESC NULLS LAST
-                """, project_ids)
-            else:
-                cursor.execute("SELECT NULL LIMIT 0")
+        top_proyectos = ModelProyecto.get_top_recaudacion(db, 5, id_usuario)
+        donaciones_por_proyecto = ModelProyecto.get_donaciones_por_proyecto(db, id_usuario)
         
-        donaciones_por_proyecto = cursor.fetchall()
-        cursor.close()
+        graficos = claves_graficos(db, id_usuario)
         
     finally:
         db.close()
@@ -265,4 +196,5 @@ def reportes_coordinador():
                          total_donaciones=total_donaciones,
                          suma_donaciones=suma_donaciones,
                          top_proyectos=top_proyectos,
-                         donaciones_por_proyecto=donaciones_por_proyecto)
+                         donaciones_por_proyecto=donaciones_por_proyecto,
+                         graficos=graficos)
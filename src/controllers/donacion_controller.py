@@ -25,15 +25,18 @@ def api_crear_donacion():
     if not id_proyecto or not monto:
         return jsonify(success=False, message="Datos incompletos"), 400
 
+    try:
+        monto = float(monto)
+    except (TypeError, ValueError):
+        return jsonify(success=False, message="Monto inválido"), 400
+
     db = get_db()
     try:
         donacion = Donacion(None, current_user.id, id_proyecto, monto, None)
-        ok = ModelDonacion.create(db, donacion)
+        ok, result = ModelDonacion.donar(db, donacion)
         if not ok:
             return jsonify(success=False, message="Error al guardar donación"), 500
-
-        ModelDonacion.sumar_al_proyecto(db, id_proyecto, monto)
     finally:
         db.close()
 
-    return jsonify(success=True, message="Donación procesada")
+    return jsonify(success=True, message="Donación procesada", id_donacion=result)
@@ -0,0 +1,20 @@
+from flask import Response, request, abort
+from src.database import CURRENT_CONFIG
+from src.utils.metricas import METRICAS_ACTIVAS, generar_metricas
+import hmac
+
+
+def metrics():
+    """Métricas en formato de Prometheus (si METRICS_TOKEN está definido, se exige como Bearer)"""
+    if not METRICAS_ACTIVAS:
+        return Response("Métricas desactivadas (METRICS_ENABLED=0 o falta prometheus_client)\n",
+                        status=503, mimetype='text/plain')
+    
+    token = getattr(CURRENT_CONFIG, "METRICS_TOKEN", None)
+    if token:
+        esperado = f"Bearer {token}".encode('utf-8')
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode('utf-8'), esperado):
+            abort(401)
+    
+    contenido, content_type = generar_metricas()
+    return Response(contenido, content_type=content_type)
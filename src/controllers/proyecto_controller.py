@@ -1,27 +1,43 @@
 # src/controllers/proyecto_controller.py
 from flask import render_template, request, redirect, url_for, flash
-from src.database import get_db
-from src.models.ModelProyecto import ModelProyecto
+from src.database import get_db, CURRENT_CONFIG
+from src.models.ModelProyecto import ModelProyecto, ORDENES_CATALOGO, decode_catalogo_cursor
 from src.models.ModelDonacion import ModelDonacion
 from flask_login import login_required, current_user
 from src.models.entities.donacion import Donacion
 
 def listar_proyectos():
+    orden = request.args.get('orden', 'recientes')
+    if orden not in ORDENES_CATALOGO:
+        orden = 'recientes'
+    busqueda = request.args.get('q', '').strip()[:100]
+    
     db = get_db()
     try:
-        proyectos = ModelProyecto.get_activos(db)
+        if busqueda:
+            # Resultados por relevancia (una sola página, sin cursores)
+            pagina = {'proyectos': ModelProyecto.search(db, busqueda), 'next_cursor': None, 'prev_cursor': None}
+        else:
+            pagina = ModelProyecto.get_catalogo(
+                db,
+                por_pagina=getattr(CURRENT_CONFIG, "CATALOGO_POR_PAGINA", 12),
+                orden=orden,
+                after=decode_catalogo_cursor(request.args.get('after'), orden),
+                before=decode_catalogo_cursor(request.args.get('before'), orden)
+            )
+        proyectos = pagina['proyectos']
         
+        # Aporte del donador solo para los proyectos de esta página
         donaciones_usuario = {}
         if current_user.is_authenticated and current_user.id_rol == 1:
-            donaciones = ModelDonacion.get_by_user(db, current_user.id)
-            for donacion in donaciones:
-                if donacion.id_proyecto not in donaciones_usuario:
-                    donaciones_usuario[donacion.id_proyecto] = 0
-                donaciones_usuario[donacion.id_proyecto] += donacion.monto
+            donaciones_usuario = ModelDonacion.get_totales_usuario_por_proyecto(
+                db, current_user.id, [p.id_proyecto for p in proyectos]
+            )
     finally:
         db.close()
     
-    return render_template('proyectos/listar.html', proyectos=proyectos, donaciones_usuario=donaciones_usuario)
+    return render_template('proyectos/listar.html', proyectos=proyectos, donaciones_usuario=donaciones_usuario,
+                           orden=orden, busqueda=busqueda, next_cursor=pagina['next_cursor'], prev_cursor=pagina['prev_cursor'])
 
 def detalle_proyecto(id_proyecto):
     db = get_db()
@@ -61,12 +77,10 @@ def formulario_donacion(id_proyecto):
                 flash('El monto debe ser mayor que 0', 'danger')
                 return redirect(url_for('formulario_donacion', id_proyecto=id_proyecto))
 
-            # crear donación y actualizar proyecto
+            # crear donación y actualizar el proyecto en una sola transacción
             donacion = Donacion(None, current_user.id, id_proyecto, monto, None)
-            ok = ModelDonacion.create(db, donacion)
+            ok, _ = ModelDonacion.donar(db, donacion)
             if ok:
-                # actualizar monto recaudado en proyecto
-                ModelDonacion.sumar_al_proyecto(db, id_proyecto, monto)
                 flash('Gracias por tu donación', 'success')
             else:
                 flash('Error procesando la donación', 'danger')
@@ -27,30 +27,25 @@ def verificar_permiso_proyecto(proyecto, db):
 def detalle_gestion_proyecto(id_proyecto):
     db = get_db()
     try:
-        proyecto = ModelProyecto.get_by_id(db, id_proyecto)
+        # Proyecto, objetivos, actividades, responsables, tareas y usuarios en un solo viaje
+        snapshot = ModelProyecto.get_gestion_snapshot(db, id_proyecto)
+        proyecto = snapshot['proyecto'] if snapshot else None
         permitido, error = verificar_permiso_proyecto(proyecto, db)
         if not permitido:
             flash(error, 'danger')
             return redirect(url_for('panel_coordinador'))
         
-        objetivos = ModelObjetivo.get_by_proyecto(db, id_proyecto)
-        actividades = ModelActividad.get_by_proyecto(db, id_proyecto)
-        responsables = ModelResponsable.get_by_proyecto(db, id_proyecto)
-        tareas = ModelTarea.get_by_proyecto(db, id_proyecto)
-        usuarios_disponibles = ModelResponsable.get_usuarios_disponibles(db, id_proyecto)
-        usuarios_proyecto = ModelTarea.get_usuarios_proyecto(db, id_proyecto)
-        
     finally:
         db.close()
     
     return render_template('coordinador/detalle-proyecto.html',
                           proyecto=proyecto,
-                          objetivos=objetivos,
-                          actividades=actividades,
-                          responsables=responsables,
-                          tareas=tareas,
-                          usuarios_disponibles=usuarios_disponibles,
-                          usuarios_proyecto=usuarios_proyecto,
+                          objetivos=snapshot['objetivos'],
+                          actividades=snapshot['actividades'],
+                          responsables=snapshot['responsables'],
+                          tareas=snapshot['tareas'],
+                          usuarios_disponibles=snapshot['usuarios_disponibles'],
+                          usuarios_proyecto=snapshot['usuarios_proyecto'],
                           today=date.today())
 
 
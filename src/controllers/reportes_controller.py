@@ -1,10 +1,14 @@
-from flask import render_template
+from flask import render_template, request, redirect, url_for, send_file, abort
 from flask_login import login_required, current_user
 from decorators import rol_required
 from src.database import get_db
 from src.models.ModelUser import ModelUser
 from src.models.ModelProyecto import ModelProyecto
-from src.models.ModelDonacion import ModelDonacion
+from src.utils.graficos import GRAFICOS, FORMATOS, claves_graficos, get_grafico
+
+# Las URLs de los gráficos llevan la clave de versión (?v=...), así que su contenido
+# nunca cambia y el navegador puede guardarlos un año sin revalidar
+GRAFICO_MAX_AGE = 365 * 24 * 3600
 
 @login_required
 @rol_required(2)
@@ -12,50 +16,32 @@ def reportes():
     """Panel de reportes para administrador"""
     db = get_db()
     try:
-        # Obtener todos los usuarios
-        all_users = ModelUser.get_all(db)
-        
-        # Contar usuarios por rol
-        donadores = len([u for u in all_users if u.get('id_rol') == 1]) if all_users else 0
-        coordinadores = len([u for u in all_users if u.get('id_rol') == 3]) if all_users else 0
-        usuarios_activos = len([u for u in all_users if u.get('id_rol') != 5]) if all_users else 0
+        # Usuarios por rol con un GROUP BY
+        usuarios_por_rol = ModelUser.count_by_role(db)
+        donadores = usuarios_por_rol.get(1, 0)
+        coordinadores = usuarios_por_rol.get(3, 0)
+        usuarios_activos = sum(total for id_rol, total in usuarios_por_rol.items() if id_rol != 5)
         
-        # Obtener todos los proyectos
-        proyectos = ModelProyecto.get_all(db)
-        total_proyectos = len(proyectos) if proyectos else 0
-        
-        # Calcular estadísticas de proyectos
-        total_meta = sum(p.monto_objetivo or 0 for p in proyectos) if proyectos else 0
-        total_recaudado = sum(p.monto_recaudado or 0 for p in proyectos) if proyectos else 0
+        # Totales de proyectos y donaciones desde project_stats
+        resumen = ModelProyecto.get_stats_resumen(db)
+        total_proyectos = resumen['total_proyectos']
+        total_meta = resumen['total_meta']
+        total_recaudado = resumen['total_recaudado']
         porcentaje_total = round((total_recaudado / total_meta * 100), 2) if total_meta > 0 else 0
         
-        # Obtener todas las donaciones
-        cursor = db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM donaciones")
-        total_donaciones = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT SUM(monto) FROM donaciones")
-        result = cursor.fetchone()
-        suma_donaciones = result[0] if result[0] is not None else 0
+        total_donaciones = resumen['total_donaciones']
+        suma_donaciones = resumen['suma_donaciones']
         
         # Obtener donación promedio
         donacion_promedio = round((suma_donaciones / total_donaciones), 2) if total_donaciones > 0 else 0
         
         # Obtener top 5 proyectos por recaudación
-        top_proyectos = sorted(proyectos, key=lambda p: p.monto_recaudado or 0, reverse=True)[:5] if proyectos else []
+        top_proyectos = ModelProyecto.get_top_recaudacion(db, 5)
         
         # Obtener detalles de donaciones por proyecto
-        cursor.execute("""
-            SELECT p.id_proyecto, p.nombre, COUNT(d.id_donacion) as total_donaciones, 
-                   SUM(d.monto) as total_monto, p.monto_objetivo
-            FROM proyectos p
-            LEFT JOIN donaciones d ON p.id_proyecto = d.id_proyecto
-            GROUP BY p.id_proyecto, p.nombre, p.monto_objetivo
-            ORDER BY total_monto DESC NULLS LAST
-        """)
-        donaciones_por_proyecto = cursor.fetchall()
+        donaciones_por_proyecto = ModelProyecto.get_donaciones_por_proyecto(db)
         
-        cursor.close()
+        graficos = claves_graficos(db)
         
     finally:
         db.close()
@@ -72,4 +58,32 @@ def reportes():
                          suma_donaciones=suma_donaciones,
                          donacion_promedio=donacion_promedio,
                          top_proyectos=top_proyectos,
-                         donaciones_por_proyecto=donaciones_por_proyecto)
+                         donaciones_por_proyecto=donaciones_por_proyecto,
+                         graficos=graficos)
+
+
+@login_required
+@rol_required(2, 3)
+def grafico_reporte(nombre, formato):
+    """Imagen de un gráfico de reportes (PNG o SVG), generada una vez por versión de datos"""
+    if nombre not in GRAFICOS or formato not in FORMATOS:
+        abort(404)
+    
+    # El administrador ve todos los proyectos; el coordinador, solo los suyos
+    id_usuario = None if int(getattr(current_user, "id_rol", 0)) == 2 else current_user.id
+    
+    db = get_db()
+    try:
+        clave = claves_graficos(db, id_usuario)[nombre]
+        # URL sin versión o de una versión anterior: se redirige a la vigente (sin dibujar)
+        if request.args.get('v') != clave:
+            return redirect(url_for('grafico_reporte', nombre=nombre, formato=formato, v=clave))
+        ruta = get_grafico(db, nombre, formato, clave, id_usuario)
+    finally:
+        db.close()
+    
+    response = send_file(ruta, mimetype=FORMATOS[formato], etag=clave, conditional=True,
+                         max_age=GRAFICO_MAX_AGE)
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
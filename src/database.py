@@ -1,30 +1,242 @@
 import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN, TRANSACTION_STATUS_INERROR
+from flask import g, has_app_context
 import os
+import threading
+import time
 from config import config
+from src.utils.instrumentacion_sql import CursorInstrumentado, get_estadisticas_sql
+from src.utils.metricas import registrar_checkout
 
 # Obtener la configuración según el entorno
 env = os.environ.get('FLASK_ENV', 'development')
 CURRENT_CONFIG = config.get(env, config['development'])
 
+# Estado del pool de conexiones (uno por proceso: gunicorn hace fork de los workers)
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_last_release = {}
 
-def get_db():
-    """Establece y retorna una conexión activa a la base de datos PostgreSQL."""
-    # Check if credentials are configured before attempting connection
-    if not all([CURRENT_CONFIG.PG_HOST, CURRENT_CONFIG.PG_USER, CURRENT_CONFIG.PG_PASSWORD, CURRENT_CONFIG.PG_DB]):
-        # Return None gracefully when credentials are not set
-        return None
-    
-    try:
-        connection = psycopg2.connect(
+
+class PooledConnection:
+    """
+    Envoltorio de una conexión tomada del pool.
+    Se comporta como una conexión de psycopg2, pero close() la devuelve al pool
+    en lugar de cerrar el socket con PostgreSQL.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    @property
+    def raw(self):
+        return self._connection
+
+    @property
+    def closed(self):
+        return 1 if self._released else self._connection.closed
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        release_connection(self._connection)
+
+
+class _ConnectionPool(pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool que conserva las conexiones devueltas hasta maxconn.
+    psycopg2 cierra cada conexión que se devuelve cuando ya hay `minconn` libres, así
+    que con peticiones concurrentes el pool reconectaba continuamente. minconn solo
+    indica cuántas conexiones se abren al crear el pool.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # _putconn conserva la conexión mientras haya menos de minconn libres
+        self.minconn = maxconn
+
+
+def _credentials_configured():
+    return all([CURRENT_CONFIG.PG_HOST, CURRENT_CONFIG.PG_USER, CURRENT_CONFIG.PG_PASSWORD, CURRENT_CONFIG.PG_DB])
+
+
+def get_pool():
+    """Retorna el pool de conexiones del proceso actual, creándolo si no existe."""
+    global _pool, _pool_pid, _pool_slots
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            return _pool
+
+        max_size = max(1, int(getattr(CURRENT_CONFIG, "PG_POOL_MAX", 10)))
+        min_size = min(max(0, int(getattr(CURRENT_CONFIG, "PG_POOL_MIN", 1))), max_size)
+        _pool = _ConnectionPool(
+            min_size,
+            max_size,
             host=CURRENT_CONFIG.PG_HOST,
             user=CURRENT_CONFIG.PG_USER,
             password=CURRENT_CONFIG.PG_PASSWORD,
             database=CURRENT_CONFIG.PG_DB,
             port=getattr(CURRENT_CONFIG, "PG_PORT", 5432)
         )
+        # El semáforo limita las conexiones prestadas y permite esperar con timeout,
+        # ya que ThreadedConnectionPool lanza PoolError en cuanto se agota.
+        _pool_slots = threading.BoundedSemaphore(max_size)
+        _pool_pid = os.getpid()
+        _last_release.clear()
+        return _pool
+
+
+def _is_usable(connection):
+    """Valida una conexión antes de prestarla."""
+    if connection.closed:
+        return False
+    if connection.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+        return False
+
+    # Solo se hace ping si la conexión estuvo inactiva más del umbral configurado
+    released_at = _last_release.get(id(connection))
+    if released_at is None or time.monotonic() - released_at < getattr(CURRENT_CONFIG, "PG_POOL_VALIDATE_AFTER", 30):
+        return True
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+        connection.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def release_connection(connection):
+    """Devuelve una conexión al pool (o la descarta si está rota)."""
+    if _pool is None or _pool_pid != os.getpid():
+        connection.close()
+        return
+    try:
+        broken = connection.closed or connection.info.transaction_status == TRANSACTION_STATUS_UNKNOWN
+        _last_release[id(connection)] = time.monotonic()
+        _pool.putconn(connection, close=bool(broken))
+    except Exception as e:
+        print(f"❌ Error al devolver la conexión al pool: {e}")
+    finally:
+        _pool_slots.release()
+
+
+class RequestConnection(PooledConnection):
+    """
+    Conexión compartida por toda la petición (guardada en flask.g).
+    close() no hace nada: la conexión se confirma o revierte y se devuelve
+    al pool en el teardown del contexto de la aplicación.
+    Si la instrumentación SQL está activa, sus cursores registran cada consulta
+    en las estadísticas de la petición (ver src/utils/instrumentacion_sql.py).
+    """
+
+    def __init__(self, connection, estadisticas=None):
+        super().__init__(connection)
+        self._estadisticas = estadisticas
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._connection.cursor(*args, **kwargs)
+        if self._estadisticas is None:
+            return cursor
+        return CursorInstrumentado(cursor, self._estadisticas)
+
+    @property
+    def closed(self):
+        return self._connection.closed
+
+    def close(self):
+        pass
+
+
+def get_db():
+    """
+    Retorna una conexión activa a PostgreSQL.
+    Dentro de una petición de Flask se reutiliza una única conexión por petición
+    (ver get_request_db); fuera de ella se toma una conexión dedicada del pool.
+    """
+    if has_app_context():
+        return get_request_db()
+    return get_pooled_db()
+
+
+def get_request_db():
+    """Abre de forma perezosa la conexión de la petición actual y la guarda en flask.g."""
+    connection = g.get('_db_connection')
+    if connection is None:
+        pooled = get_pooled_db()
+        if pooled is None:
+            return None
+        connection = RequestConnection(pooled.raw, get_estadisticas_sql())
+        g._db_connection = connection
+
+    # Si una consulta anterior falló sin rollback, la transacción quedó abortada
+    if connection.info.transaction_status == TRANSACTION_STATUS_INERROR:
+        connection.rollback()
+    return connection
+
+
+def teardown_request_db(exception=None):
+    """Confirma o revierte la transacción de la petición y devuelve la conexión al pool."""
+    connection = g.pop('_db_connection', None)
+    if connection is None:
+        return
+    try:
+        if connection.raw.closed:
+            pass
+        elif exception is None:
+            connection.raw.commit()
+        else:
+            connection.raw.rollback()
+    except Exception as e:
+        print(f"❌ Error al finalizar la conexión de la petición: {e}")
+    finally:
+        release_connection(connection.raw)
+
+
+def get_pooled_db():
+    """Toma y retorna una conexión dedicada del pool de PostgreSQL."""
+    # Check if credentials are configured before attempting connection
+    if not _credentials_configured():
+        # Return None gracefully when credentials are not set
+        return None
+
+    try:
+        db_pool = get_pool()
+
+        timeout = getattr(CURRENT_CONFIG, "PG_POOL_TIMEOUT", 5)
+        inicio = time.perf_counter()
+        if not _pool_slots.acquire(timeout=timeout):
+            registrar_checkout(time.perf_counter() - inicio, exito=False)
+            print(f"❌ Tiempo de espera agotado ({timeout}s) al obtener una conexión del pool")
+            return None
+        registrar_checkout(time.perf_counter() - inicio)
+
+        try:
+            # Se descartan las conexiones rotas hasta obtener una válida (una conexión
+            # nueva siempre lo es, así que el ciclo termina al vaciar las inactivas)
+            connection = db_pool.getconn()
+            while not _is_usable(connection):
+                _last_release.pop(id(connection), None)
+                db_pool.putconn(connection, close=True)
+                connection = db_pool.getconn()
+        except Exception:
+            _pool_slots.release()
+            raise
 
         # Return active connection
-        return connection
+        return PooledConnection(connection)
 
     except psycopg2.OperationalError as e:
         print(f"❌ Error al conectar a la base de datos PostgreSQL: {e}")
@@ -34,10 +246,35 @@ def get_db():
         return None
 
 
+def connect_direct():
+    """
+    Abre una conexión propia, fuera del pool (para LISTEN, que la ocupa mientras viva
+    el proceso). Retorna None si no hay credenciales configuradas.
+    """
+    if not _credentials_configured():
+        return None
+    return psycopg2.connect(
+        host=CURRENT_CONFIG.PG_HOST,
+        user=CURRENT_CONFIG.PG_USER,
+        password=CURRENT_CONFIG.PG_PASSWORD,
+        database=CURRENT_CONFIG.PG_DB,
+        port=getattr(CURRENT_CONFIG, "PG_PORT", 5432)
+    )
+
+
+def close_pool():
+    """Cierra todas las conexiones del pool del proceso actual."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _last_release.clear()
+
+
 # =======================================================
 # BLOQUE DE PRUEBA (if __name__ == '__main__':)
 # =======================================================
-
 if __name__ == "__main__":
     conn = get_db()
 
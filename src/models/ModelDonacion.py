@@ -1,5 +1,6 @@
 from psycopg2.extras import RealDictCursor
 from .entities.donacion import Donacion
+from decimal import Decimal
 
 class ModelDonacion:
     @classmethod
@@ -119,6 +120,29 @@ class ModelDonacion:
             if cursor is not None:
                 cursor.close()
 
+    @classmethod
+    def get_totales_usuario_por_proyecto(cls, db, id_usuario, ids_proyecto):
+        """Suma donada por el usuario a cada proyecto dado: {id_proyecto: total} (un solo GROUP BY)"""
+        if not ids_proyecto:
+            return {}
+        cursor = None
+        try:
+            cursor = db.cursor()
+            sql = """
+            SELECT id_proyecto, SUM(monto)
+            FROM donaciones
+            WHERE id_usuario = %s AND id_proyecto = ANY(%s)
+            GROUP BY id_proyecto
+            """
+            cursor.execute(sql, (id_usuario, list(ids_proyecto)))
+            return dict(cursor.fetchall())
+        except Exception as ex:
+            print(f"Error al obtener totales donados por proyecto: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
     @classmethod
     def sumar_al_proyecto(cls, db, id_proyecto, monto):
         '''
@@ -147,4 +171,48 @@ class ModelDonacion:
         finally:
             if cursor is not None:
                 cursor.close()
-    
\ No newline at end of file
+    
+
+    @classmethod
+    def donar(cls, db, donacion: Donacion):
+        '''
+        Registra una donación y suma su monto al proyecto en una sola sentencia
+        (INSERT ... RETURNING dentro de un CTE + UPDATE) y un solo commit, de modo que
+        monto_recaudado nunca queda desfasado respecto a la tabla de donaciones.
+        Solo acepta proyectos existentes y no archivados.
+        Retorna (True, id_donacion) o (False, mensaje).
+        '''
+        cursor = None
+        try:
+            if isinstance(donacion.monto, bool) or not isinstance(donacion.monto, (int, float, Decimal)) or donacion.monto <= 0:
+                return (False, "El monto debe ser un número positivo")
+
+            cursor = db.cursor()
+            sql = """
+            WITH nueva AS (
+                INSERT INTO donaciones (id_usuario, id_proyecto, monto)
+                SELECT %s, id_proyecto, %s
+                FROM proyectos
+                WHERE id_proyecto = %s AND archivado = FALSE
+                RETURNING id_donacion, id_proyecto, monto
+            )
+            UPDATE proyectos p
+            SET monto_recaudado = COALESCE(p.monto_recaudado, 0) + n.monto
+            FROM nueva n
+            WHERE p.id_proyecto = n.id_proyecto
+            RETURNING n.id_donacion
+            """
+            cursor.execute(sql, (donacion.id_usuario, donacion.monto, donacion.id_proyecto))
+            row = cursor.fetchone()
+            if row is None:
+                db.rollback()
+                return (False, "El proyecto no existe o no acepta donaciones")
+            db.commit()
+            return (True, row[0])
+        except Exception as ex:
+            db.rollback()
+            print(f"Error al registrar donacion: {ex}")
+            return (False, str(ex))
+        finally:
+            if cursor is not None:
+                cursor.close()
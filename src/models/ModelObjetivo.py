@@ -10,7 +10,7 @@ class ModelObjetivo:
             sql = """
                 SELECT * FROM objetivos 
                 WHERE id_proyecto = %s
-                ORDER BY fecha_creacion ASC
+                ORDER BY fecha_creacion ASC, id_objetivo ASC
             """
             cursor.execute(sql, (proyecto_id,))
             rows = cursor.fetchall()
@@ -1,5 +1,56 @@
 from psycopg2.extras import RealDictCursor
 from .entities.proyecto import Proyecto
+from .entities.objetivo import Objetivo
+from .entities.actividad import Actividad
+from .entities.tarea import Tarea
+from .entities.responsable import Responsable
+from datetime import date, datetime
+from decimal import Decimal
+import re
+
+
+def _parse_fechas(row, campos_fecha=(), campos_timestamp=()):
+    """json_agg serializa fechas como texto ISO; las convierte de nuevo a date/datetime."""
+    for campo in campos_fecha:
+        if row.get(campo):
+            row[campo] = date.fromisoformat(row[campo])
+    for campo in campos_timestamp:
+        if row.get(campo):
+            row[campo] = datetime.fromisoformat(row[campo])
+    return row
+
+# Avance de financiamiento (fracción de la meta). La misma expresión está indexada en
+# 0010_catalogo_proyectos.sql: si se modifica aquí, hay que modificar el índice.
+AVANCE_SQL = "COALESCE(COALESCE(monto_recaudado, 0) / NULLIF(monto_objetivo, 0), 0)"
+
+# Órdenes del catálogo: columnas de la clave (keyset), todas descendentes
+ORDENES_CATALOGO = {
+    'recientes': ('fecha_creacion', 'id_proyecto'),
+    'avance': ('avance', 'fecha_creacion', 'id_proyecto'),
+}
+
+
+def encode_catalogo_cursor(row, orden):
+    """Codifica la posición de un proyecto en el catálogo como cursor para la URL."""
+    return '_'.join(
+        row[columna].isoformat() if columna == 'fecha_creacion' else str(row[columna])
+        for columna in ORDENES_CATALOGO[orden]
+    )
+
+
+def decode_catalogo_cursor(value, orden):
+    """Decodifica un cursor de encode_catalogo_cursor; retorna None si no es válido."""
+    if not value:
+        return None
+    partes = value.split('_')
+    columnas = ORDENES_CATALOGO.get(orden, ())
+    if len(partes) != len(columnas):
+        return None
+    conversiones = {'avance': Decimal, 'fecha_creacion': datetime.fromisoformat, 'id_proyecto': int}
+    try:
+        return tuple(conversiones[columna](parte) for columna, parte in zip(columnas, partes))
+    except (ValueError, TypeError, ArithmeticError):
+        return None
 
 class ModelProyecto:
     @classmethod
@@ -29,6 +80,105 @@ class ModelProyecto:
     def get_activos(cls, db):
         return cls.get_all(db, incluir_archivados=False)
 
+    @classmethod
+    def get_catalogo(cls, db, por_pagina=12, orden='recientes', after=None, before=None):
+        """
+        Página del catálogo de proyectos activos, paginada por cursor (keyset) sobre
+        (fecha_creacion, id_proyecto) o, con orden 'avance', sobre (avance, fecha_creacion,
+        id_proyecto). Cada página es un recorrido de índice de por_pagina + 1 filas,
+        sin importar su profundidad.
+        
+        Returns:
+            dict con 'proyectos', 'next_cursor' (siguiente página) y 'prev_cursor' (anterior)
+        """
+        if orden not in ORDENES_CATALOGO:
+            orden = 'recientes'
+        columnas = ORDENES_CATALOGO[orden]
+        clave = ", ".join(columnas)
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            sql = f"""SELECT * FROM (
+                          SELECT id_proyecto, nombre, descripcion, monto_objetivo, monto_recaudado,
+                                 estado, fecha_creacion, archivado, archivado_en, archivado_por,
+                                 {AVANCE_SQL} AS avance
+                          FROM proyectos WHERE archivado = FALSE
+                      ) p"""
+            params = []
+            if after:
+                sql += f" WHERE ({clave}) < ({', '.join(['%s'] * len(columnas))})"
+                params.extend(after)
+            elif before:
+                sql += f" WHERE ({clave}) > ({', '.join(['%s'] * len(columnas))})"
+                params.extend(before)
+            
+            # Hacia atrás se recorre en orden ascendente y luego se invierte
+            direccion = "ASC" if before and not after else "DESC"
+            sql += " ORDER BY " + ", ".join(f"{columna} {direccion}" for columna in columnas) + " LIMIT %s"
+            params.append(por_pagina + 1)
+            
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        except Exception as ex:
+            print(f"Error al obtener el catálogo de proyectos: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+        
+        hay_mas = len(rows) > por_pagina
+        if before and not after:
+            rows = rows[:por_pagina]
+            rows.reverse()
+            tiene_anterior = hay_mas
+            tiene_siguiente = True
+        else:
+            rows = rows[:por_pagina]
+            tiene_anterior = after is not None
+            tiene_siguiente = hay_mas
+        
+        return {
+            'proyectos': [Proyecto.from_row(row) for row in rows],
+            'next_cursor': encode_catalogo_cursor(rows[-1], orden) if rows and tiene_siguiente else None,
+            'prev_cursor': encode_catalogo_cursor(rows[0], orden) if rows and tiene_anterior else None,
+        }
+
+    @classmethod
+    def search(cls, db, texto, limite=30, incluir_archivados=False):
+        """
+        Busca proyectos por nombre y descripción (0011_busqueda_proyectos.sql).
+        Combina texto completo en español con prefijos (cada palabra como 'palabra:*',
+        así 'educa' encuentra 'educación') y similitud de trigramas sobre el nombre
+        (tolera errores de escritura). Ambas condiciones usan índices GIN.
+        """
+        palabras = re.findall(r'[^\W_]+', texto or '')[:8]
+        if not palabras:
+            return []
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            filtro = "" if incluir_archivados else "AND archivado = FALSE"
+            sql = f"""SELECT id_proyecto, nombre, descripcion, monto_objetivo, monto_recaudado,
+                      estado, fecha_creacion, archivado, archivado_en, archivado_por
+                      FROM proyectos, to_tsquery('spanish', %(consulta)s) AS q
+                      WHERE (busqueda @@ q OR %(texto)s <%% nombre) {filtro}
+                      ORDER BY ts_rank(busqueda, q) DESC, word_similarity(%(texto)s, nombre) DESC,
+                               fecha_creacion DESC
+                      LIMIT %(limite)s"""
+            cursor.execute(sql, {
+                'consulta': ' & '.join(f"{palabra}:*" for palabra in palabras),
+                'texto': ' '.join(palabras),
+                'limite': limite,
+            })
+            rows = cursor.fetchall()
+            return [Proyecto.from_row(row) for row in rows] if rows is not None else []
+        except Exception as ex:
+            print(f"Error al buscar proyectos: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
     @classmethod
     def get_by_id(cls, db, id_proyecto):
         cursor = None
@@ -196,4 +346,230 @@ class ModelProyecto:
             return (False, str(ex))
         finally:
             if cursor is not None:
-                cursor.close()
\ No newline at end of file
+                cursor.close()
+
+    @classmethod
+    def get_progress_for_projects(cls, db, ids_proyecto, limite=3):
+        """
+        Resumen de avance de varios proyectos en una sola consulta: por cada proyecto
+        retorna los primeros `limite` objetivos, actividades y tareas (en el mismo orden
+        que sus get_by_proyecto) y los totales / completados de cada uno.
+        """
+        resumen = {
+            id_proyecto: {
+                'objetivos': [], 'actividades': [], 'tareas': [],
+                'objetivos_completados': 0, 'total_objetivos': 0,
+                'actividades_completadas': 0, 'total_actividades': 0,
+                'tareas_completadas': 0, 'total_tareas': 0,
+            }
+            for id_proyecto in ids_proyecto
+        }
+        if not resumen:
+            return resumen
+
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            sql = """
+                WITH obj AS (
+                    SELECT 'objetivos' AS tipo, id_proyecto, id_objetivo AS id_item,
+                           descripcion AS texto, NULL::varchar AS estado, completado,
+                           ROW_NUMBER() OVER (PARTITION BY id_proyecto
+                                              ORDER BY fecha_creacion ASC, id_objetivo ASC) AS rn,
+                           COUNT(*) OVER (PARTITION BY id_proyecto) AS total,
+                           COUNT(*) FILTER (WHERE completado) OVER (PARTITION BY id_proyecto) AS completados
+                    FROM objetivos WHERE id_proyecto = ANY(%(ids)s)
+                ), act(tipo, id_proyecto, id_item, texto, estado, completado, rn, total, completados) AS (
+                    SELECT 'actividades', id_proyecto, id_actividad, nombre, estado::varchar, NULL::boolean,
+                           ROW_NUMBER() OVER (PARTITION BY id_proyecto
+                                              ORDER BY fecha_inicio ASC NULLS LAST, id_actividad ASC),
+                           COUNT(*) OVER (PARTITION BY id_proyecto),
+                           COUNT(*) FILTER (WHERE estado = 'completada') OVER (PARTITION BY id_proyecto)
+                    FROM actividades WHERE id_proyecto = ANY(%(ids)s)
+                ), tar(tipo, id_proyecto, id_item, texto, estado, completado, rn, total, completados) AS (
+                    SELECT 'tareas', proyecto_id, id, descripcion, estado::varchar, NULL::boolean,
+                           ROW_NUMBER() OVER (PARTITION BY proyecto_id
+                                              ORDER BY fecha_fin ASC NULLS LAST, creado_en DESC),
+                           COUNT(*) OVER (PARTITION BY proyecto_id),
+                           COUNT(*) FILTER (WHERE estado = 'completada') OVER (PARTITION BY proyecto_id)
+                    FROM tareas WHERE proyecto_id = ANY(%(ids)s)
+                )
+                SELECT * FROM obj WHERE rn <= %(limite)s
+                UNION ALL SELECT * FROM act WHERE rn <= %(limite)s
+                UNION ALL SELECT * FROM tar WHERE rn <= %(limite)s
+                ORDER BY tipo, id_proyecto, rn
+            """
+            cursor.execute(sql, {'ids': list(ids_proyecto), 'limite': limite})
+            for row in cursor.fetchall():
+                detalle = resumen.get(row['id_proyecto'])
+                if detalle is None:
+                    continue
+                tipo = row['tipo']
+                if tipo == 'objetivos':
+                    item = Objetivo(id_objetivo=row['id_item'], id_proyecto=row['id_proyecto'],
+                                    descripcion=row['texto'], completado=row['completado'])
+                    detalle['objetivos_completados'] = row['completados']
+                    detalle['total_objetivos'] = row['total']
+                elif tipo == 'actividades':
+                    item = Actividad(id_actividad=row['id_item'], id_proyecto=row['id_proyecto'],
+                                     nombre=row['texto'], estado=row['estado'])
+                    detalle['actividades_completadas'] = row['completados']
+                    detalle['total_actividades'] = row['total']
+                else:
+                    item = Tarea(id=row['id_item'], proyecto_id=row['id_proyecto'],
+                                 descripcion=row['texto'], estado=row['estado'])
+                    detalle['tareas_completadas'] = row['completados']
+                    detalle['total_tareas'] = row['total']
+                detalle[tipo].append(item)
+            return resumen
+        except Exception as ex:
+            print(f"Error al obtener progreso de proyectos: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_gestion_snapshot(cls, db, id_proyecto):
+        """
+        Carga todo lo que necesita la página de gestión de un proyecto en un solo viaje
+        a la base de datos: el proyecto, sus objetivos, actividades, responsables y tareas,
+        y los usuarios disponibles / asignados. Las listas se agregan como JSON en la
+        misma fila y se convierten a las mismas entidades que los get_by_proyecto.
+        Retorna None si el proyecto no existe.
+        """
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            sql = """
+                SELECT p.id_proyecto, p.nombre, p.descripcion, p.monto_objetivo, p.monto_recaudado,
+                       p.estado, p.fecha_creacion, p.archivado, p.archivado_en, p.archivado_por, p.id_usuario,
+                       (SELECT COALESCE(json_agg(o ORDER BY o.fecha_creacion ASC, o.id_objetivo ASC), '[]'::json)
+                        FROM objetivos o WHERE o.id_proyecto = p.id_proyecto) AS objetivos,
+                       (SELECT COALESCE(json_agg(a ORDER BY a.fecha_inicio ASC NULLS LAST, a.id_actividad ASC), '[]'::json)
+                        FROM actividades a WHERE a.id_proyecto = p.id_proyecto) AS actividades,
+                       (SELECT COALESCE(json_agg(r ORDER BY r.fecha_asignacion ASC), '[]'::json)
+                        FROM (SELECT r.*, u.fullname AS usuario_nombre, u.correo AS usuario_correo
+                              FROM responsables r
+                              JOIN usuarios u ON r.id_usuario = u.id
+                              WHERE r.id_proyecto = p.id_proyecto) r) AS responsables,
+                       (SELECT COALESCE(json_agg(t ORDER BY t.fecha_fin ASC NULLS LAST, t.creado_en DESC), '[]'::json)
+                        FROM (SELECT t.*, u.fullname AS usuario_nombre
+                              FROM tareas t
+                              LEFT JOIN usuarios u ON t.usuario_id = u.id
+                              WHERE t.proyecto_id = p.id_proyecto) t) AS tareas,
+                       (SELECT COALESCE(json_agg(d ORDER BY d.fullname), '[]'::json)
+                        FROM (SELECT u.id, u.fullname, u.correo
+                              FROM usuarios u
+                              WHERE u.id_rol IN (1, 2, 3)
+                              AND u.id NOT IN (
+                                  SELECT id_usuario FROM responsables WHERE id_proyecto = p.id_proyecto
+                              )) d) AS usuarios_disponibles,
+                       (SELECT COALESCE(json_agg(x ORDER BY x.fullname), '[]'::json)
+                        FROM (SELECT DISTINCT u.id, u.fullname, u.correo
+                              FROM usuarios u
+                              LEFT JOIN responsables r ON u.id = r.id_usuario AND r.id_proyecto = p.id_proyecto
+                              WHERE r.id_responsable IS NOT NULL OR u.id = p.id_usuario) x) AS usuarios_proyecto
+                FROM proyectos p
+                WHERE p.id_proyecto = %s
+            """
+            cursor.execute(sql, (id_proyecto,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+
+            return {
+                'proyecto': Proyecto.from_row(row),
+                'objetivos': [Objetivo.from_row(_parse_fechas(o, campos_timestamp=('fecha_creacion',)))
+                              for o in row['objetivos']],
+                'actividades': [Actividad.from_row(_parse_fechas(a, campos_fecha=('fecha_inicio', 'fecha_fin')))
+                                for a in row['actividades']],
+                'responsables': [Responsable.from_row(_parse_fechas(r, campos_timestamp=('fecha_asignacion',)))
+                                 for r in row['responsables']],
+                'tareas': [Tarea.from_row(_parse_fechas(t, campos_fecha=('fecha_inicio', 'fecha_fin'),
+                                                        campos_timestamp=('creado_en',)))
+                           for t in row['tareas']],
+                'usuarios_disponibles': row['usuarios_disponibles'],
+                'usuarios_proyecto': row['usuarios_proyecto'],
+            }
+        except Exception as ex:
+            print(f"Error al obtener la gestión del proyecto: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_stats_resumen(cls, db, id_usuario=None):
+        """
+        Totales de proyectos y donaciones (de todos o de un coordinador) a partir de
+        project_stats: el costo depende del número de proyectos, no de donaciones.
+        """
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            filtro = "WHERE p.id_usuario = %s" if id_usuario is not None else ""
+            sql = f"""
+                SELECT COUNT(*) AS total_proyectos,
+                       COALESCE(SUM(p.monto_objetivo), 0) AS total_meta,
+                       COALESCE(SUM(p.monto_recaudado), 0) AS total_recaudado,
+                       COALESCE(SUM(s.total_donaciones), 0) AS total_donaciones,
+                       COALESCE(SUM(s.suma_donaciones), 0) AS suma_donaciones,
+                       COALESCE(SUM(s.suma_gastos), 0) AS suma_gastos
+                FROM proyectos p
+                LEFT JOIN project_stats s ON s.id_proyecto = p.id_proyecto
+                {filtro}
+            """
+            cursor.execute(sql, (id_usuario,) if id_usuario is not None else None)
+            return cursor.fetchone()
+        except Exception as ex:
+            print(f"Error al obtener el resumen de proyectos: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_top_recaudacion(cls, db, limite=5, id_usuario=None):
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            filtro = "WHERE id_usuario = %s" if id_usuario is not None else ""
+            sql = f"""SELECT id_proyecto, nombre, descripcion, monto_objetivo, monto_recaudado, 
+                      estado, fecha_creacion, id_usuario, archivado, archivado_en, archivado_por 
+                      FROM proyectos {filtro}
+                      ORDER BY COALESCE(monto_recaudado, 0) DESC, fecha_creacion DESC LIMIT %s"""
+            params = (id_usuario, limite) if id_usuario is not None else (limite,)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            return [Proyecto.from_row(row) for row in rows] if rows is not None else []
+        except Exception as ex:
+            print(f"Error al obtener los proyectos con mayor recaudación: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_donaciones_por_proyecto(cls, db, id_usuario=None):
+        """Filas (id_proyecto, nombre, total_donaciones, total_monto, monto_objetivo) desde project_stats."""
+        cursor = None
+        try:
+            cursor = db.cursor()
+            filtro = "WHERE p.id_usuario = %s" if id_usuario is not None else ""
+            sql = f"""
+                SELECT p.id_proyecto, p.nombre, COALESCE(s.total_donaciones, 0) AS total_donaciones,
+                       NULLIF(s.suma_donaciones, 0) AS total_monto, p.monto_objetivo
+                FROM proyectos p
+                LEFT JOIN project_stats s ON s.id_proyecto = p.id_proyecto
+                {filtro}
+                ORDER BY total_monto DESC NULLS LAST
+            """
+            cursor.execute(sql, (id_usuario,) if id_usuario is not None else None)
+            return cursor.fetchall()
+        except Exception as ex:
+            print(f"Error al obtener donaciones por proyecto: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
@@ -0,0 +1,157 @@
+from psycopg2.extras import RealDictCursor
+
+# Agrupaciones disponibles para las series (se derivan del rollup diario)
+PERIODOS = {
+    'dia': 'day',
+    'semana': 'week',
+    'mes': 'month',
+}
+
+
+def _filtros_rollup(desde, hasta, id_proyecto=None, id_usuario=None, categoria=None, alias='r'):
+    condiciones = []
+    params = []
+    if desde:
+        condiciones.append(f"{alias}.dia >= %s")
+        params.append(desde)
+    if hasta:
+        condiciones.append(f"{alias}.dia <= %s")
+        params.append(hasta)
+    if id_proyecto:
+        condiciones.append(f"{alias}.id_proyecto = %s")
+        params.append(id_proyecto)
+    if id_usuario:
+        condiciones.append(f"{alias}.id_proyecto IN (SELECT id_proyecto FROM proyectos WHERE id_usuario = %s)")
+        params.append(id_usuario)
+    if categoria:
+        condiciones.append(f"{alias}.categoria = %s")
+        params.append(categoria)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return where, params
+
+
+class ModelRollup:
+    """Consultas de series de tiempo sobre los rollups diarios (sin tocar las filas crudas)."""
+
+    @classmethod
+    def get_serie_donaciones(cls, db, desde=None, hasta=None, periodo='dia', id_proyecto=None, id_usuario=None):
+        """Donaciones por día/semana/mes: [{'periodo', 'total_donaciones', 'suma_donaciones'}]"""
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            where, params = _filtros_rollup(desde, hasta, id_proyecto, id_usuario)
+            sql = f"""
+                SELECT date_trunc(%s, r.dia)::date AS periodo,
+                       SUM(r.total_donaciones)::int AS total_donaciones,
+                       SUM(r.suma_donaciones) AS suma_donaciones
+                FROM rollup_donaciones_diario r
+                {where}
+                GROUP BY 1
+                ORDER BY 1
+            """
+            cursor.execute(sql, [PERIODOS[periodo]] + params)
+            return cursor.fetchall()
+        except Exception as ex:
+            print(f"Error al obtener la serie de donaciones: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_serie_gastos(cls, db, desde=None, hasta=None, periodo='dia', id_proyecto=None, id_usuario=None,
+                         categoria=None, por_categoria=False):
+        """Gastos por día/semana/mes (opcionalmente separados por categoría)"""
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            where, params = _filtros_rollup(desde, hasta, id_proyecto, id_usuario, categoria)
+            columnas = "date_trunc(%s, r.dia)::date AS periodo" + (", r.categoria" if por_categoria else "")
+            grupos = "1, 2" if por_categoria else "1"
+            sql = f"""
+                SELECT {columnas},
+                       SUM(r.total_gastos)::int AS total_gastos,
+                       SUM(r.suma_gastos) AS suma_gastos
+                FROM rollup_gastos_diario r
+                {where}
+                GROUP BY {grupos}
+                ORDER BY {grupos}
+            """
+            cursor.execute(sql, [PERIODOS[periodo]] + params)
+            return cursor.fetchall()
+        except Exception as ex:
+            print(f"Error al obtener la serie de gastos: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_gastos_por_categoria(cls, db, desde=None, hasta=None, id_proyecto=None, id_usuario=None):
+        """Total de gastos por categoría en el rango: [{'categoria', 'total_gastos', 'suma_gastos'}]"""
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            where, params = _filtros_rollup(desde, hasta, id_proyecto, id_usuario)
+            sql = f"""
+                SELECT r.categoria,
+                       SUM(r.total_gastos)::int AS total_gastos,
+                       SUM(r.suma_gastos) AS suma_gastos
+                FROM rollup_gastos_diario r
+                {where}
+                GROUP BY r.categoria
+                ORDER BY suma_gastos DESC
+            """
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Exception as ex:
+            print(f"Error al obtener gastos por categoría: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_totales_periodo(cls, db, desde=None, hasta=None, id_proyecto=None, id_usuario=None):
+        """Totales de donaciones y gastos de un período (reportes por período)"""
+        cursor = None
+        try:
+            cursor = db.cursor(cursor_factory=RealDictCursor)
+            where_d, params_d = _filtros_rollup(desde, hasta, id_proyecto, id_usuario, alias='d')
+            where_g, params_g = _filtros_rollup(desde, hasta, id_proyecto, id_usuario, alias='g')
+            sql = f"""
+                SELECT d.total_donaciones, d.suma_donaciones, g.total_gastos, g.suma_gastos
+                FROM (
+                    SELECT COALESCE(SUM(d.total_donaciones), 0)::int AS total_donaciones,
+                           COALESCE(SUM(d.suma_donaciones), 0) AS suma_donaciones
+                    FROM rollup_donaciones_diario d {where_d}
+                ) d
+                CROSS JOIN (
+                    SELECT COALESCE(SUM(g.total_gastos), 0)::int AS total_gastos,
+                           COALESCE(SUM(g.suma_gastos), 0) AS suma_gastos
+                    FROM rollup_gastos_diario g {where_g}
+                ) g
+            """
+            cursor.execute(sql, params_d + params_g)
+            return cursor.fetchone()
+        except Exception as ex:
+            print(f"Error al obtener totales del período: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+    @classmethod
+    def get_marcas(cls, db):
+        """Marca de agua de cada rollup: {tabla: ultimo_id}"""
+        cursor = None
+        try:
+            cursor = db.cursor()
+            cursor.execute("SELECT tabla, ultimo_id FROM rollup_marcas")
+            return dict(cursor.fetchall())
+        except Exception as ex:
+            print(f"Error al obtener marcas de rollup: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
@@ -1,8 +1,39 @@
 from .entities.user import User
 # Importamos el cursor de diccionario de psycopg2 para que las filas se lean como diccionarios
 from psycopg2.extras import RealDictCursor 
+from src.utils.cache import TTLCache, NotifyInvalidator
+from src.database import CURRENT_CONFIG, connect_direct
 
 class ModelUser():
+    # Caché de usuarios para el user_loader, indexada por id (como str). Cada cambio en
+    # usuarios notifica el id por el canal usuarios_cache (migración 0014) y todos los
+    # procesos lo invalidan
+    user_cache = TTLCache(ttl=getattr(CURRENT_CONFIG, "USER_CACHE_TTL", 30), nombre='usuarios')
+    user_cache_invalidator = NotifyInvalidator(user_cache, 'usuarios_cache', connect_direct)
+
+    @classmethod
+    def invalidate_cache(cls, id):
+        cls.user_cache.invalidate(str(id))
+
+    @classmethod
+    def get_cached_by_id(cls, get_connection, id):
+        """
+        Retorna el usuario desde la caché; solo en un fallo se pide una conexión
+        (get_connection) y se consulta la base de datos. Mientras el proceso no escucha
+        las invalidaciones (al arrancar o reconectando) se consulta siempre la base.
+        """
+        usar_cache = cls.user_cache_invalidator.activo()
+        user = cls.user_cache.get(str(id)) if usar_cache else None
+        if user is not None:
+            return user
+        db = get_connection()
+        if db is None:
+            return None
+        user = cls.get_by_id(db, id)
+        if user is not None and usar_cache:
+            cls.user_cache.set(str(id), user)
+        return user
+
     @classmethod
     def login(cls, db, user):
         cursor = None
@@ -126,6 +157,21 @@ class ModelUser():
             if cursor is not None:
                 cursor.close()
 
+    @classmethod
+    def count_by_role(cls, db):
+        """Retorna {id_rol: cantidad de usuarios} con un solo GROUP BY."""
+        cursor = None
+        try:
+            cursor = db.cursor()
+            cursor.execute("SELECT id_rol, COUNT(*) FROM usuarios GROUP BY id_rol")
+            return dict(cursor.fetchall())
+        except Exception as ex:
+            print(f"Error en count_by_role: {ex}")
+            raise Exception(ex)
+        finally:
+            if cursor is not None:
+                cursor.close()
+
     @classmethod
     def get_roles(cls, db):
         cursor = None
@@ -158,6 +204,7 @@ class ModelUser():
                 db.rollback()
                 return (False, "Usuario no encontrado")
             db.commit()
+            cls.invalidate_cache(id)
             return (True, None)
         except Exception as ex:
             db.rollback()
@@ -178,6 +225,7 @@ class ModelUser():
                 db.rollback()
                 return (False, "Usuario no encontrado")
             db.commit()
+            cls.invalidate_cache(id)
             return (True, None)
         except Exception as ex:
             db.rollback()
@@ -204,6 +252,7 @@ class ModelUser():
             sql_update = "UPDATE usuarios SET id_rol = %s WHERE id = %s"
             cursor.execute(sql_update, (new_rol, id))
             db.commit()
+            cls.invalidate_cache(id)
             return (True, None)
         except Exception as ex:
             db.rollback()
@@ -256,6 +305,7 @@ class ModelUser():
                 db.rollback()
                 return (False, "Usuario no encontrado")
             db.commit()
+            cls.invalidate_cache(user_id)
             return (True, None)
         except Exception as ex:
             db.rollback()
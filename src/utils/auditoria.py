@@ -1,54 +1,231 @@
-from src.database import get_db
+from src.database import get_db, get_pooled_db, CURRENT_CONFIG
+from src.utils.metricas import registrar_auditoria_descartada
 from flask_login import current_user
+from psycopg2.extras import execute_values
+from datetime import datetime
+import atexit
+import os
+import queue
+import threading
+import time
+
+
+def _write_events(db, events):
+    """
+    Inserta varios eventos de auditoría con un único INSERT multi-fila.
+    Cada evento es (usuario_id, accion, instante) con el instante de time.monotonic()
+    al encolarlo. La fecha se calcula con el reloj de la base de datos menos la espera
+    en la cola: el mismo reloj que el valor por defecto de la columna, sin depender de
+    la zona horaria ni del reloj de cada servidor (el orden (fecha, id) se mantiene).
+    """
+    ahora = time.monotonic()
+    filas = [(usuario_id, accion, max(ahora - instante, 0.0)) for usuario_id, accion, instante in events]
+    cursor = db.cursor()
+    try:
+        sql = "INSERT INTO auditoria (usuario_id, accion, fecha) VALUES %s"
+        execute_values(cursor, sql, filas, page_size=max(len(filas), 1),
+                       template="(%s, %s, (clock_timestamp() - make_interval(secs => %s))::timestamp)")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+class AuditWriter:
+    """
+    Escritor de auditoría en segundo plano.
+    Los eventos se encolan en memoria (cola acotada) y un hilo los inserta por lotes
+    cuando se alcanza el tamaño de lote o pasa el intervalo de vaciado.
+    Si la cola está llena, el evento se escribe de forma síncrona para no perderlo.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=2.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        # Un hilo por proceso: tras el fork de gunicorn el hilo del padre no existe
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                atexit.register(self.shutdown)
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, event):
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            return self._write([event])
+
+    def write(self, event):
+        """Escribe un evento de inmediato (modo síncrono) en su propia conexión del pool."""
+        return self._write([event])
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Escribe inmediatamente todos los eventos pendientes."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def shutdown(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, events):
+        """
+        Escribe un lote. Si el INSERT falla se reintenta una vez en otra conexión del pool
+        (el fallo suele ser una conexión rota) y, si vuelve a fallar, se escribe evento por
+        evento para perder solo las filas inválidas. Los eventos perdidos se cuentan en
+        amicusoft_audit_dropped_total.
+        """
+        for _ in range(2):
+            db = get_pooled_db()
+            if db is None:
+                break
+            try:
+                _write_events(db, events)
+                return True
+            except Exception as ex:
+                print(f"Error al registrar auditoría ({len(events)} eventos): {ex}")
+            finally:
+                db.close()
+        return self._write_each(events)
+
+    def _write_each(self, events):
+        """Escribe los eventos de uno en uno; retorna True si no se descartó ninguno."""
+        descartados = 0
+        db = None
+        try:
+            for i, event in enumerate(events):
+                if db is None or db.closed:
+                    if db is not None:
+                        db.close()
+                    db = get_pooled_db()
+                    if db is None:
+                        descartados += len(events) - i
+                        print(f"Error al registrar auditoría: sin conexión, se descartan {len(events) - i} eventos")
+                        break
+                try:
+                    _write_events(db, [event])
+                except Exception as ex:
+                    descartados += 1
+                    print(f"Error al registrar auditoría, se descarta el evento {event[1]!r}: {ex}")
+        finally:
+            if db is not None:
+                db.close()
+        registrar_auditoria_descartada(descartados)
+        return descartados == 0
+
+audit_writer = AuditWriter(
+    batch_size=getattr(CURRENT_CONFIG, "AUDIT_BATCH_SIZE", 100),
+    flush_interval=getattr(CURRENT_CONFIG, "AUDIT_FLUSH_INTERVAL", 2.0),
+    max_queue=getattr(CURRENT_CONFIG, "AUDIT_QUEUE_SIZE", 10000)
+)
 
 
 def log_action(accion, usuario_id=None):
     """
     Registra una acción en la tabla de auditoría.
+    Por defecto el evento se encola y lo escribe el AuditWriter en segundo plano;
+    con AUDIT_ASYNC desactivado se inserta de forma síncrona en una conexión propia del pool
+    (su commit no afecta la transacción en curso de la petición).
     
     Args:
         accion: Descripción de la acción realizada
         usuario_id: ID del usuario que realizó la acción (opcional, usa current_user si no se proporciona)
     """
-    db = None
-    cursor = None
     try:
         if usuario_id is None and current_user and current_user.is_authenticated:
             usuario_id = current_user.id
-        
-        db = get_db()
-        if db is None:
-            return False
-            
-        cursor = db.cursor()
-        sql = """
-            INSERT INTO auditoria (usuario_id, accion)
-            VALUES (%s, %s)
-        """
-        cursor.execute(sql, (usuario_id, accion))
-        db.commit()
-        return True
-    except Exception as ex:
-        print(f"Error al registrar auditoría: {ex}")
-        if db:
-            db.rollback()
-        return False
-    finally:
-        if cursor:
-            cursor.close()
-        if db:
-            db.close()
+    except Exception:
+        pass
+
+    # El instante se toma al encolar, no al escribir el lote
+    event = (usuario_id, accion, time.monotonic())
 
+    if getattr(CURRENT_CONFIG, "AUDIT_ASYNC", True):
+        return audit_writer.enqueue(event)
+    return audit_writer.write(event)
 
-def get_audit_logs(limit=100, usuario_id=None, fecha_desde=None, fecha_hasta=None):
+
+def encode_audit_cursor(row):
+    """Codifica la posición (fecha, id) de un registro como cursor para la URL."""
+    return f"{row['fecha'].isoformat()}_{row['id']}"
+
+
+def decode_audit_cursor(value):
+    """Decodifica un cursor de encode_audit_cursor; retorna None si no es válido."""
+    if not value:
+        return None
+    try:
+        fecha, _, id_str = value.rpartition('_')
+        return (datetime.fromisoformat(fecha), int(id_str))
+    except (ValueError, TypeError):
+        return None
+
+
+def get_audit_logs(limit=100, usuario_id=None, fecha_desde=None, fecha_hasta=None,
+                   after=None, before=None):
     """
-    Obtiene los registros de auditoría.
+    Obtiene los registros de auditoría, del más reciente al más antiguo.
+    La paginación es por cursor (keyset) sobre (fecha, id), por lo que el costo
+    de una página no depende de su profundidad.
     
     Args:
         limit: Número máximo de registros a obtener
         usuario_id: Filtrar por usuario específico
         fecha_desde: Filtrar desde esta fecha
         fecha_hasta: Filtrar hasta esta fecha
+        after: Tupla (fecha, id); retorna los registros más antiguos que esa posición
+        before: Tupla (fecha, id); retorna los registros más recientes que esa posición
     """
     db = None
     cursor = None
@@ -82,11 +259,24 @@ def get_audit_logs(limit=100, usuario_id=None, fecha_desde=None, fecha_hasta=Non
             sql += " AND a.fecha <= %s"
             params.append(fecha_hasta)
         
-        sql += " ORDER BY a.fecha DESC LIMIT %s"
+        if after:
+            sql += " AND (a.fecha, a.id) < (%s, %s)"
+            params.extend(after)
+        elif before:
+            sql += " AND (a.fecha, a.id) > (%s, %s)"
+            params.extend(before)
+        
+        # Hacia atrás se recorre en orden ascendente y luego se invierte
+        if before and not after:
+            sql += " ORDER BY a.fecha ASC, a.id ASC LIMIT %s"
+        else:
+            sql += " ORDER BY a.fecha DESC, a.id DESC LIMIT %s"
         params.append(limit)
         
         cursor.execute(sql, params)
         rows = cursor.fetchall()
+        if before and not after:
+            rows.reverse()
         return rows if rows else []
     except Exception as ex:
         print(f"Error al obtener registros de auditoría: {ex}")
@@ -96,3 +286,32 @@ def get_audit_logs(limit=100, usuario_id=None, fecha_desde=None, fecha_hasta=Non
             cursor.close()
         if db:
             db.close()
+
+
+def get_audit_page(per_page=50, usuario_id=None, fecha_desde=None, fecha_hasta=None,
+                   after=None, before=None):
+    """
+    Obtiene una página de auditoría junto con los cursores de navegación.
+    Se pide un registro extra para saber si existe otra página en esa dirección.
+    
+    Returns:
+        dict con 'logs', 'next_cursor' (más antiguos) y 'prev_cursor' (más recientes)
+    """
+    rows = get_audit_logs(limit=per_page + 1, usuario_id=usuario_id,
+                          fecha_desde=fecha_desde, fecha_hasta=fecha_hasta,
+                          after=after, before=before)
+    hay_mas = len(rows) > per_page
+    if before and not after:
+        logs = rows[-per_page:] if hay_mas else rows
+        tiene_anterior = hay_mas
+        tiene_siguiente = True
+    else:
+        logs = rows[:per_page]
+        tiene_anterior = after is not None
+        tiene_siguiente = hay_mas
+
+    return {
+        'logs': logs,
+        'next_cursor': encode_audit_cursor(logs[-1]) if logs and tiene_siguiente else None,
+        'prev_cursor': encode_audit_cursor(logs[0]) if logs and tiene_anterior else None,
+    }
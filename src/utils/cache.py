@@ -0,0 +1,134 @@
+import os
+import select
+import threading
+import time
+from src.utils.metricas import registrar_cache
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por tiempo (TTL), segura entre hilos.
+    Es local a cada proceso: con varios workers de gunicorn cada uno tiene su copia.
+    Para que una invalidación llegue a todos los procesos se usa NotifyInvalidator.
+    Los aciertos y fallos se exportan en /metrics con la etiqueta `nombre`.
+    """
+
+    def __init__(self, ttl=30, max_size=10000, nombre='cache'):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.nombre = nombre
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                hit = False
+        registrar_cache(self.nombre, hit)
+        return entry[1] if hit else None
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._data) >= self.max_size:
+                self._evict_expired()
+                if len(self._data) >= self.max_size:
+                    # Se descarta la entrada más antigua
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0,
+                'size': len(self._data),
+            }
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+            del self._data[key]
+
+
+class NotifyInvalidator:
+    """
+    Invalida entradas de un TTLCache en todos los procesos con LISTEN/NOTIFY de PostgreSQL:
+    un hilo por proceso escucha `canal` en una conexión propia y elimina la clave que
+    llega en cada notificación (payload vacío: vacía la caché). Mientras no escucha
+    (arrancando o reconectando) activo() es False y la caché no debe usarse; al volver
+    a escuchar se vacía, porque las notificaciones de ese intervalo se perdieron.
+    """
+
+    def __init__(self, cache, canal, connect, reintento=5):
+        self.cache = cache
+        self.canal = canal
+        self._connect = connect
+        self.reintento = reintento
+        self._escuchando = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def activo(self):
+        """Arranca el hilo en este proceso si hace falta (tras un fork) y dice si ya escucha."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._escuchando = threading.Event()
+                    threading.Thread(target=self._escuchar, name=f'listen-{self.canal}', daemon=True).start()
+                    self._pid = os.getpid()
+        return self._escuchando.is_set()
+
+    def _escuchar(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                if conn is None:
+                    return
+                conn.autocommit = True
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {self.canal}")
+                cursor.close()
+                self.cache.clear()
+                self._escuchando.set()
+                while True:
+                    select.select([conn], [], [], 60)
+                    conn.poll()
+                    while conn.notifies:
+                        payload = conn.notifies.pop(0).payload
+                        if payload:
+                            self.cache.invalidate(payload)
+                        else:
+                            self.cache.clear()
+            except Exception as ex:
+                self._escuchando.clear()
+                print(f"⚠️  Escucha de '{self.canal}' interrumpida: {ex}. Reintentando en {self.reintento}s")
+                time.sleep(self.reintento)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
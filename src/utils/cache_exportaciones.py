@@ -0,0 +1,140 @@
+from src.database import CURRENT_CONFIG
+from flask import request, send_file, Response
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+# Tablas de las que depende cada reporte (su versión forma parte de la clave). De los
+# proyectos solo se usan los nombres: 'proyectos_nombres' no cambia con cada donación
+TABLAS_DONACIONES = ('donaciones', 'proyectos_nombres', 'usuarios')
+TABLAS_GASTOS = ('gastos', 'proyectos_nombres', 'usuarios')
+
+
+def get_data_version(db, tablas):
+    """
+    Retorna la marca de agua de las tablas dadas: la versión de cada una según
+    versiones_datos, incrementada por triggers en la misma transacción que la escritura
+    (una lectura por clave primaria, sin recorrer las tablas).
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT tabla, version FROM versiones_datos WHERE tabla = ANY(%s)", (list(tablas),))
+        versiones = dict(cursor.fetchall())
+    finally:
+        cursor.close()
+    return {tabla: versiones.get(tabla, 0) for tabla in sorted(tablas)}
+
+
+class ExportCache:
+    """
+    Caché de archivos exportados en disco, direccionada por contenido:
+    la clave es un hash de (tipo de reporte, filtros, versión de los datos), así que
+    cuando llegan donaciones o gastos nuevos la clave cambia y la entrada vieja
+    simplemente deja de usarse hasta que la expulsa el LRU por tamaño.
+    La escritura es atómica (archivo temporal + rename), segura entre procesos.
+    """
+
+    def __init__(self, directorio, max_bytes):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(tipo, filtros, version):
+        contenido = json.dumps({'tipo': tipo, 'filtros': filtros, 'version': version},
+                               sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave)
+
+    def get(self, clave):
+        """Retorna la ruta del archivo cacheado (marcándolo como usado) o None."""
+        ruta = self._ruta(clave)
+        try:
+            os.utime(ruta)
+            return ruta
+        except FileNotFoundError:
+            return None
+
+    def put(self, clave, origen):
+        """
+        Guarda un archivo en la caché y retorna su ruta.
+        `origen` puede ser un archivo abierto (se copia) o la ruta de un archivo
+        existente (se enlaza sin copiar cuando es posible).
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+        try:
+            if isinstance(origen, str):
+                try:
+                    os.link(origen, temporal)
+                except OSError:
+                    shutil.copyfile(origen, temporal)
+            else:
+                origen.seek(0)
+                with open(temporal, 'wb') as destino:
+                    shutil.copyfileobj(origen, destino)
+                origen.seek(0)
+            os.replace(temporal, ruta)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        self.evict()
+        return ruta
+
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta quedar bajo max_bytes."""
+        with self._lock:
+            entradas = []
+            total = 0
+            try:
+                nombres = os.listdir(self.directorio)
+            except FileNotFoundError:
+                return
+            for nombre in nombres:
+                if nombre.endswith('.tmp'):
+                    continue
+                try:
+                    info = os.stat(os.path.join(self.directorio, nombre))
+                except FileNotFoundError:
+                    continue
+                entradas.append((info.st_mtime, info.st_size, nombre))
+                total += info.st_size
+
+            for _, tamano, nombre in sorted(entradas):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except FileNotFoundError:
+                    pass
+                total -= tamano
+
+
+export_cache = ExportCache(
+    getattr(CURRENT_CONFIG, "EXPORT_CACHE_DIR"),
+    int(getattr(CURRENT_CONFIG, "EXPORT_CACHE_MAX_MB", 500)) * 1024 * 1024
+)
+
+
+def not_modified(clave):
+    """Respuesta 304 si el cliente ya tiene el archivo con esta clave (If-None-Match)."""
+    if clave in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(clave)
+        return response
+    return None
+
+
+def cached_file_response(ruta, clave, mimetype, filename):
+    """Envía un archivo de la caché con ETag = clave (el cliente debe revalidar)."""
+    response = send_file(ruta, mimetype=mimetype, as_attachment=True, download_name=filename,
+                         etag=clave, conditional=True, max_age=0)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
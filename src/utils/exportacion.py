@@ -0,0 +1,280 @@
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import send_file, Response
+from src.database import get_pooled_db
+from src.utils.metricas import registrar_exportacion
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MIMETYPE = 'text/csv; charset=utf-8'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+# Tamaño de bloque leído de COPY y número de bloques en vuelo entre hilos
+COPY_CHUNK_SIZE = 64 * 1024
+COPY_QUEUE_CHUNKS = 16
+
+# Tamaño en memoria del archivo temporal antes de pasar a disco
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def where_reporte(filtros, columna_fecha, columna_proyecto=None):
+    """
+    Construye la cláusula WHERE (y sus parámetros) de los filtros de fecha y proyecto.
+    Lanza ValueError si una fecha no tiene formato YYYY-MM-DD.
+    """
+    condiciones = []
+    params = []
+    if filtros.get('fecha_desde'):
+        condiciones.append(f"{columna_fecha} >= %s")
+        params.append(datetime.strptime(filtros['fecha_desde'], '%Y-%m-%d').date())
+    if filtros.get('fecha_hasta'):
+        # Se incluye el día completo
+        condiciones.append(f"{columna_fecha} < %s")
+        params.append(datetime.strptime(filtros['fecha_hasta'], '%Y-%m-%d').date() + timedelta(days=1))
+    if columna_proyecto and filtros.get('id_proyecto'):
+        condiciones.append(f"{columna_proyecto} = %s")
+        params.append(filtros['id_proyecto'])
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return where, params
+
+
+def stream_query(db, sql, params=None, chunk_size=2000):
+    """
+    Ejecuta una consulta con un cursor con nombre (server-side) y retorna las filas
+    por bloques de chunk_size, sin cargar el resultado completo en memoria.
+    """
+    cursor = db.cursor(name=f"export_{uuid.uuid4().hex[:12]}")
+    cursor.itersize = chunk_size
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        cursor.close()
+
+
+def build_xlsx(rows, headers, sheet_name):
+    """
+    Escribe las filas en un libro de openpyxl en modo write-only (las filas no se
+    guardan en memoria) sobre un archivo temporal. Retorna el archivo posicionado al inicio.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(list(row))
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def file_response(output, mimetype, filename):
+    """Envía un archivo temporal por bloques; se cierra al terminar la respuesta."""
+    return send_file(output, mimetype=mimetype, as_attachment=True, download_name=filename)
+
+
+def xlsx_response(db, sql, headers, sheet_name, filename, params=None):
+    """Exporta el resultado de una consulta a Excel con memoria acotada."""
+    output = build_xlsx(stream_query(db, sql, params), headers, sheet_name)
+    return file_response(output, XLSX_MIMETYPE, filename)
+
+
+class _ExportCancelled(Exception):
+    pass
+
+
+class _QueueWriter:
+    """Archivo de solo escritura que pasa los bloques de COPY a una cola."""
+
+    def __init__(self, chunks, cancelled):
+        self._chunks = chunks
+        self._cancelled = cancelled
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        while True:
+            if self._cancelled.is_set():
+                raise _ExportCancelled()
+            try:
+                self._chunks.put(bytes(data), timeout=1)
+                return len(data)
+            except queue.Full:
+                continue
+
+
+def _iniciar_copy(sql, params):
+    """
+    Toma la conexión, arma la consulta, inicia COPY en un hilo y espera el primer bloque.
+    Retorna (primero, siguiente, fin, cancelled).
+    """
+    db = get_pooled_db()
+    if db is None:
+        raise RuntimeError("Sin conexión a la base de datos")
+    try:
+        cursor = db.cursor()
+        try:
+            query = cursor.mogrify(sql, params).decode('utf-8')
+        finally:
+            cursor.close()
+    except Exception:
+        db.close()
+        raise
+
+    chunks = queue.Queue(maxsize=COPY_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    fin = object()
+
+    def producir():
+        final = fin
+        try:
+            cursor = db.cursor()
+            try:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)",
+                                   _QueueWriter(chunks, cancelled), size=COPY_CHUNK_SIZE)
+            finally:
+                cursor.close()
+                db.rollback()
+        except _ExportCancelled:
+            pass
+        except Exception as ex:
+            final = ex
+        finally:
+            db.close()
+            while not cancelled.is_set():
+                try:
+                    chunks.put(final, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+
+    threading.Thread(target=producir, name='export-copy', daemon=True).start()
+
+    def siguiente():
+        chunk = chunks.get()
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+    try:
+        primero = siguiente()
+    except Exception:
+        cancelled.set()
+        raise
+    return primero, siguiente, fin, cancelled
+
+
+def copy_csv_stream(sql, params=None, tipo='csv'):
+    """
+    Ejecuta COPY (SELECT ...) TO STDOUT WITH CSV y genera los bytes a medida que
+    PostgreSQL los envía. COPY corre en un hilo con su propia conexión del pool
+    (la respuesta se sigue enviando después de cerrar el contexto de la petición);
+    la cola acotada aplica contrapresión si el cliente lee más lento.
+
+    La conexión se toma y la consulta se arma antes de retornar, y se espera el primer
+    bloque de COPY: un error de preparación se lanza aquí (el llamador puede responder
+    con un error). Un error a mitad del envío se relanza en el generador, lo que corta
+    la respuesta chunked en lugar de terminarla como si el CSV estuviera completo.
+    La duración (métrica de exportaciones, formato 'csv') se mide hasta el último bloque.
+    """
+    inicio = time.perf_counter()
+    try:
+        primero, siguiente, fin, cancelled = _iniciar_copy(sql, params)
+    except Exception:
+        registrar_exportacion(tipo, 'csv', inicio, 'error')
+        raise
+
+    def generar():
+        resultado = 'error'
+        try:
+            chunk = primero
+            while chunk is not fin:
+                yield chunk
+                chunk = siguiente()
+            resultado = 'ok'
+        except Exception as ex:
+            print(f"Error en exportación COPY (respuesta interrumpida): {ex}")
+            raise
+        finally:
+            # Si el cliente se desconecta, se aborta el COPY
+            cancelled.set()
+            registrar_exportacion(tipo, 'csv', inicio, resultado)
+
+    return generar()
+
+
+def csv_response(sql, filename, params=None, tipo='csv'):
+    """
+    Respuesta CSV enviada por bloques (transfer-encoding chunked) a partir de COPY.
+    Lanza la excepción si la exportación no pudo comenzar.
+    """
+    return Response(
+        copy_csv_stream(sql, params, tipo),
+        mimetype=CSV_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+def _tipo_parquet(pa, tipo):
+    """Tipo de pyarrow de una columna de exportación (ver auditor_controller)."""
+    return {
+        'entero': pa.int64(),
+        'texto': pa.string(),
+        'monto': pa.decimal128(14, 2),
+        'fecha': pa.date32(),
+        'fecha_hora': pa.timestamp('us'),
+    }[tipo]
+
+
+def build_parquet(rows, columnas, batch_size=10000):
+    """
+    Escribe las filas a Parquet por lotes de columnas (un row group por lote) en un
+    archivo temporal. `columnas` es [(nombre, tipo)]: el esquema es explícito y el mismo
+    para todos los lotes (no se infiere del primero, donde una columna toda NULL o con
+    montos pequeños quedaría con un tipo que no admite los lotes siguientes).
+    Requiere pyarrow (dependencia opcional).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(nombre, _tipo_parquet(pa, tipo)) for nombre, tipo in columnas])
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    writer = pq.ParquetWriter(output, schema)
+
+    def escribir(lote):
+        columnas_lote = list(zip(*lote))
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(c, type=schema.field(i).type) for i, c in enumerate(columnas_lote)], schema=schema
+        )
+        writer.write_batch(batch)
+
+    try:
+        lote = []
+        for row in rows:
+            lote.append(tuple(row))
+            if len(lote) >= batch_size:
+                escribir(lote)
+                lote = []
+        if lote:
+            escribir(lote)
+    finally:
+        writer.close()
+    output.seek(0)
+    return output
+
+
+def parquet_response(db, sql, columnas, filename, params=None):
+    """Exporta el resultado de una consulta a Parquet leyendo con un cursor del servidor."""
+    output = build_parquet(stream_query(db, sql, params), columnas)
+    return file_response(output, PARQUET_MIMETYPE, filename)
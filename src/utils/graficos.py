@@ -0,0 +1,188 @@
+from src.database import CURRENT_CONFIG
+from src.utils.cache_exportaciones import ExportCache, get_data_version
+from src.models.ModelRollup import ModelRollup
+from src.models.ModelProyecto import ModelProyecto
+from contextlib import contextmanager
+import io
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+FORMATOS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Cambiar este número invalida todos los gráficos cacheados (p. ej. al modificar su diseño)
+VERSION_DISENO = 1
+
+COLOR_PRINCIPAL = '#DA18FE'
+COLOR_SECUNDARIO = '#9945FF'
+COLOR_COMPLETADO = '#28a745'
+
+
+def _dibujar_donaciones(ax, filas):
+    etiquetas = [fila['periodo'].strftime('%m/%Y') for fila in filas]
+    montos = [float(fila['suma_donaciones'] or 0) for fila in filas]
+    ax.plot(etiquetas, montos, color=COLOR_PRINCIPAL, marker='o', linewidth=2)
+    ax.fill_between(range(len(montos)), montos, color=COLOR_PRINCIPAL, alpha=0.15)
+    ax.set_ylabel('Monto donado ($)')
+    ax.tick_params(axis='x', rotation=45)
+
+
+def _dibujar_progreso(ax, proyectos):
+    nombres = [p.nombre[:25] for p in reversed(proyectos)]
+    porcentajes = [
+        min(float(p.monto_recaudado or 0) / float(p.monto_objetivo) * 100, 100) if p.monto_objetivo else 0
+        for p in reversed(proyectos)
+    ]
+    colores = [COLOR_COMPLETADO if pct >= 100 else COLOR_SECUNDARIO for pct in porcentajes]
+    ax.barh(nombres, porcentajes, color=colores)
+    ax.set_xlim(0, 100)
+    ax.set_xlabel('Avance de la meta (%)')
+    for i, pct in enumerate(porcentajes):
+        ax.text(min(pct + 1, 90), i, f"{pct:.0f}%", va='center', fontsize=8)
+
+
+def _dibujar_gastos(ax, filas):
+    categorias = [fila['categoria'] or 'Sin categoría' for fila in reversed(filas)]
+    montos = [float(fila['suma_gastos'] or 0) for fila in reversed(filas)]
+    ax.barh(categorias, montos, color=COLOR_PRINCIPAL)
+    ax.set_xlabel('Monto gastado ($)')
+
+
+# Gráficos disponibles: título, tablas de las que depende (su versión forma parte de la
+# clave), consulta de datos y función de dibujo. Las series leen los rollups diarios.
+GRAFICOS = {
+    'donaciones': {
+        'titulo': "Donaciones por mes",
+        'tablas': ('rollup_donaciones_diario',),
+        'datos': lambda db, id_usuario: ModelRollup.get_serie_donaciones(db, periodo='mes', id_usuario=id_usuario),
+        'dibujar': _dibujar_donaciones,
+    },
+    'progreso': {
+        'titulo': "Avance de financiamiento por proyecto",
+        'tablas': ('proyectos',),
+        'datos': lambda db, id_usuario: ModelProyecto.get_top_recaudacion(db, 15, id_usuario),
+        'dibujar': _dibujar_progreso,
+    },
+    'gastos': {
+        'titulo': "Gastos por categoría",
+        'tablas': ('rollup_gastos_diario',),
+        'datos': lambda db, id_usuario: ModelRollup.get_gastos_por_categoria(db, id_usuario=id_usuario),
+        'dibujar': _dibujar_gastos,
+    },
+}
+
+chart_cache = ExportCache(
+    getattr(CURRENT_CONFIG, "CHART_CACHE_DIR"),
+    int(getattr(CURRENT_CONFIG, "CHART_CACHE_MAX_MB", 50)) * 1024 * 1024
+)
+
+_figure = None
+_import_lock = threading.Lock()
+_render_locks = {}
+
+
+def _get_figure():
+    """
+    Importa matplotlib (backend Agg, sin pantalla) solo al generar el primer gráfico,
+    para no cargarlo al iniciar la aplicación.
+    """
+    global _figure
+    if _figure is None:
+        with _import_lock:
+            if _figure is None:
+                import matplotlib
+                matplotlib.use('Agg')
+                from matplotlib.figure import Figure
+                _figure = Figure
+    return _figure
+
+
+def claves_graficos(db, id_usuario=None):
+    """
+    Clave vigente de cada gráfico: {nombre: clave}. Una sola consulta a versiones_datos.
+    La clave cambia solo cuando cambian los datos de los que depende el gráfico. Los de
+    un coordinador dependen además de qué proyectos son suyos (proyectos_nombres, que no
+    cambia con cada donación como 'proyectos').
+    """
+    extra = ('proyectos_nombres',) if id_usuario is not None else ()
+    tablas = {tabla for grafico in GRAFICOS.values() for tabla in grafico['tablas'] + extra}
+    versiones = get_data_version(db, tablas)
+    return {
+        nombre: chart_cache.clave(
+            f"grafico_{nombre}",
+            {'id_usuario': id_usuario, 'diseno': VERSION_DISENO},
+            {tabla: versiones[tabla] for tabla in grafico['tablas'] + extra}
+        )
+        for nombre, grafico in GRAFICOS.items()
+    }
+
+
+def render_grafico(db, nombre, formato, id_usuario=None):
+    """Dibuja el gráfico `nombre` y retorna un BytesIO con la imagen en `formato`."""
+    Figure = _get_figure()
+    grafico = GRAFICOS[nombre]
+    datos = grafico['datos'](db, id_usuario)
+
+    # Figure directa (sin pyplot): no hay estado global compartido entre hilos
+    fig = Figure(figsize=(8, 4.5), dpi=100)
+    ax = fig.add_subplot()
+    if datos:
+        grafico['dibujar'](ax, datos)
+    else:
+        ax.text(0.5, 0.5, 'Sin datos disponibles', ha='center', va='center', transform=ax.transAxes)
+        ax.set_axis_off()
+    ax.set_title(grafico['titulo'])
+    ax.spines[['top', 'right']].set_visible(False)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=formato)
+    buffer.seek(0)
+    return buffer
+
+
+@contextmanager
+def _bloqueo_render(nombre, formato):
+    """
+    Serializa la generación de un mismo gráfico entre hilos (lock) y entre procesos
+    de gunicorn (flock sobre un archivo), así cada versión se dibuja una sola vez.
+    """
+    clave_lock = f"{nombre}.{formato}"
+    with _import_lock:
+        lock = _render_locks.setdefault(clave_lock, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        directorio = f"{chart_cache.directorio}.locks"
+        os.makedirs(directorio, exist_ok=True)
+        with open(os.path.join(directorio, f"{clave_lock}.lock"), 'w') as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+def get_grafico(db, nombre, formato, clave, id_usuario=None):
+    """
+    Retorna la ruta del gráfico cacheado para `clave`, generándolo si no existe.
+    Tras tomar el bloqueo se vuelve a consultar la caché: si otro proceso lo generó
+    mientras se esperaba, se reutiliza en lugar de dibujarlo de nuevo.
+    """
+    archivo = f"{clave}.{formato}"
+    ruta = chart_cache.get(archivo)
+    if ruta is not None:
+        return ruta
+    with _bloqueo_render(nombre, formato):
+        ruta = chart_cache.get(archivo)
+        if ruta is None:
+            ruta = chart_cache.put(archivo, render_grafico(db, nombre, formato, id_usuario))
+    return ruta
@@ -0,0 +1,160 @@
+from flask import g, request, current_app, has_request_context
+from functools import lru_cache
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAMETRO = re.compile(r"%\(\w+\)s|%s")
+_LISTA_VALORES = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_TUPLAS_REPETIDAS = re.compile(r"(\(\.\.\.\)|\(\?\))(?:\s*,\s*(?:\(\.\.\.\)|\(\?\)))+")
+_ESPACIOS = re.compile(r"\s+")
+
+# Las sentencias muy largas (inserciones por lotes con literales) se recortan antes de normalizar
+LARGO_MAXIMO = 1000
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql):
+    """
+    Forma canónica de una sentencia para agruparla: literales y parámetros como '?',
+    listas de valores como '(...)' y espacios colapsados. Dos ejecuciones de la misma
+    consulta con distintos valores producen el mismo texto (así se detectan los N+1).
+    """
+    sql = _LITERAL_TEXTO.sub('?', sql)
+    sql = _PARAMETRO.sub('?', sql)
+    sql = _LITERAL_NUMERO.sub('?', sql)
+    sql = _LISTA_VALORES.sub('(...)', sql)
+    sql = _TUPLAS_REPETIDAS.sub(r'\1, ...', sql)
+    return _ESPACIOS.sub(' ', sql).strip()
+
+
+def _texto_sql(sql, cursor):
+    if isinstance(sql, bytes):
+        return sql[:LARGO_MAXIMO].decode('utf-8', errors='replace')
+    if not isinstance(sql, str):
+        # psycopg2.sql.Composed / SQL
+        try:
+            sql = sql.as_string(cursor)
+        except Exception:
+            sql = str(sql)
+    return sql[:LARGO_MAXIMO]
+
+
+class EstadisticasSQL:
+    """
+    Consultas ejecutadas durante una petición: total, tiempo, filas y, por sentencia
+    normalizada, cuántas veces se ejecutó y cuánto tardó en total.
+    """
+
+    def __init__(self, umbral_lento_ms=200):
+        self.umbral_lento = umbral_lento_ms / 1000
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.filas = 0
+        self.sentencias = {}
+
+    def registrar(self, sql, duracion, filas):
+        self.consultas += 1
+        self.tiempo += duracion
+        if filas and filas > 0:
+            self.filas += filas
+        entrada = self.sentencias.get(sql)
+        if entrada is None:
+            self.sentencias[sql] = [1, duracion]
+        else:
+            entrada[0] += 1
+            entrada[1] += duracion
+
+        if duracion >= self.umbral_lento:
+            endpoint = request.endpoint if has_request_context() else None
+            logger.warning("Consulta lenta (%.0f ms, %s filas) en %s: %s",
+                           duracion * 1000, filas, endpoint or '-', sql,
+                           extra={'endpoint': endpoint, 'duracion_ms': round(duracion * 1000, 1),
+                                  'filas': filas, 'sql': sql})
+
+
+class CursorInstrumentado:
+    """
+    Envoltorio de un cursor de psycopg2 que mide cada execute/executemany/copy_expert.
+    El resto de atributos (fetch*, rowcount, description, itersize...) se delegan al cursor.
+    """
+
+    def __init__(self, cursor, estadisticas):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_estadisticas', estadisticas)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self._cursor.__exit__(*args)
+
+    def _medir(self, metodo, sql, *args):
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql, *args)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self._estadisticas.registrar(normalizar_sql(_texto_sql(sql, self._cursor)),
+                                         duracion, self._cursor.rowcount)
+
+    def execute(self, sql, params=None):
+        return self._medir(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, params_seq):
+        return self._medir(self._cursor.executemany, sql, params_seq)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._medir(self._cursor.copy_expert, sql, file, size)
+
+
+def get_estadisticas_sql():
+    """
+    Estadísticas SQL de la petición actual (se crean al abrir su conexión).
+    Retorna None fuera de una petición o si la instrumentación está desactivada.
+    """
+    if not has_request_context():
+        return None
+    estadisticas = g.get('_sql_stats')
+    if estadisticas is None and current_app.config.get('SQL_INSTRUMENTACION', True):
+        estadisticas = EstadisticasSQL(current_app.config.get('SQL_LENTA_MS', 200))
+        g._sql_stats = estadisticas
+    return estadisticas
+
+
+def sql_stats_after_request(response):
+    """
+    Al terminar la petición: avisa de sentencias repetidas (posibles N+1) y, si está
+    habilitado (por defecto en desarrollo), agrega los totales en la cabecera X-SQL-Stats.
+    """
+    estadisticas = g.get('_sql_stats')
+    if estadisticas is None:
+        return response
+
+    umbral = current_app.config.get('SQL_REPETIDAS_UMBRAL', 10)
+    for sql, (veces, tiempo) in estadisticas.sentencias.items():
+        if veces >= umbral:
+            logger.warning("Posible N+1 en %s: %s ejecuciones (%.0f ms) de %s",
+                           request.endpoint or '-', veces, tiempo * 1000, sql[:200],
+                           extra={'endpoint': request.endpoint, 'ejecuciones': veces,
+                                  'duracion_ms': round(tiempo * 1000, 1), 'sql': sql})
+
+    if current_app.config.get('SQL_STATS_HEADER', current_app.debug):
+        response.headers['X-SQL-Stats'] = (f"queries={estadisticas.consultas}; "
+                                           f"time={estadisticas.tiempo * 1000:.1f}ms; "
+                                           f"rows={estadisticas.filas}")
+    return response
@@ -0,0 +1,178 @@
+from config import config
+from flask import g, request
+from contextlib import contextmanager
+import os
+import time
+
+# Modo multiproceso de prometheus_client, solo si PROMETHEUS_MULTIPROC_DIR está definido
+# (gunicorn.conf.py o el despliegue): cada proceso (workers de gunicorn, worker de
+# exportaciones) escribe sus valores en archivos mmap de ese directorio y /metrics los
+# suma al responder. La variable debe existir antes de importar prometheus_client.
+# Sin ella (servidor de desarrollo, pruebas) se usa el registro normal del proceso.
+_config = config.get(os.environ.get('FLASK_ENV', 'development'), config['development'])
+METRICS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+MULTIPROCESO = bool(METRICS_DIR)
+if MULTIPROCESO:
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # Sin prometheus_client las métricas quedan desactivadas
+    prometheus_client = None
+
+METRICAS_ACTIVAS = prometheus_client is not None and getattr(_config, "METRICS_ENABLED", True)
+
+if prometheus_client is not None:
+    HTTP_DURACION = Histogram(
+        'amicusoft_http_request_duration_seconds', 'Duración de las peticiones HTTP',
+        ['endpoint', 'method'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    )
+    HTTP_PETICIONES = Counter(
+        'amicusoft_http_requests_total', 'Peticiones HTTP por endpoint y código de estado',
+        ['endpoint', 'method', 'status']
+    )
+    DB_CHECKOUTS = Counter(
+        'amicusoft_db_checkouts_total', 'Conexiones tomadas del pool de PostgreSQL'
+    )
+    DB_CHECKOUT_TIMEOUTS = Counter(
+        'amicusoft_db_checkout_timeouts_total', 'Esperas por una conexión del pool que agotaron el tiempo'
+    )
+    DB_CHECKOUT_ESPERA = Histogram(
+        'amicusoft_db_checkout_wait_seconds', 'Tiempo de espera por una conexión del pool',
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+    )
+    DB_CONSULTAS = Counter(
+        'amicusoft_db_queries_total', 'Consultas SQL ejecutadas por endpoint', ['endpoint']
+    )
+    DB_TIEMPO_CONSULTAS = Counter(
+        'amicusoft_db_query_seconds_total', 'Tiempo total en consultas SQL por endpoint', ['endpoint']
+    )
+    DB_CONSULTAS_PETICION = Histogram(
+        'amicusoft_db_queries_per_request', 'Consultas SQL por petición', ['endpoint'],
+        buckets=(1, 2, 5, 10, 20, 50, 100, 250)
+    )
+    AUDITORIA_COLA = Gauge(
+        'amicusoft_audit_queue_depth', 'Eventos de auditoría pendientes de escribir',
+        multiprocess_mode='livesum'
+    )
+    AUDITORIA_DESCARTADOS = Counter(
+        'amicusoft_audit_dropped_total', 'Eventos de auditoría descartados por errores al escribirlos'
+    )
+    CACHE_CONSULTAS = Counter(
+        'amicusoft_cache_requests_total', 'Consultas a las cachés en memoria por resultado',
+        ['cache', 'resultado']
+    )
+    CACHE_TAMANO = Gauge(
+        'amicusoft_cache_entries', 'Entradas en las cachés en memoria', ['cache'],
+        multiprocess_mode='livesum'
+    )
+    EXPORTACION_DURACION = Histogram(
+        'amicusoft_export_duration_seconds', 'Duración de la generación de exportaciones',
+        ['tipo', 'formato', 'resultado'],
+        buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+    )
+
+
+def registrar_checkout(espera, exito=True):
+    """Registra una solicitud de conexión al pool (llamado desde src/database.py)."""
+    if not METRICAS_ACTIVAS:
+        return
+    DB_CHECKOUT_ESPERA.observe(espera)
+    if exito:
+        DB_CHECKOUTS.inc()
+    else:
+        DB_CHECKOUT_TIMEOUTS.inc()
+
+
+def registrar_auditoria_descartada(eventos):
+    """Registra eventos de auditoría que no se pudieron escribir (llamado desde src/utils/auditoria.py)."""
+    if METRICAS_ACTIVAS and eventos:
+        AUDITORIA_DESCARTADOS.inc(eventos)
+
+
+def registrar_cache(cache, acierto):
+    """Registra un acierto o fallo de una caché en memoria (llamado desde src/utils/cache.py)."""
+    if METRICAS_ACTIVAS:
+        CACHE_CONSULTAS.labels(cache, 'hit' if acierto else 'miss').inc()
+
+
+def registrar_exportacion(tipo, formato, inicio, resultado):
+    """Registra la duración de una exportación desde `inicio` (perf_counter), con resultado 'ok' o 'error'."""
+    if METRICAS_ACTIVAS:
+        EXPORTACION_DURACION.labels(tipo, formato, resultado).observe(time.perf_counter() - inicio)
+
+
+@contextmanager
+def medir_exportacion(tipo, formato):
+    """Mide la generación de una exportación; si el bloque lanza una excepción se registra como 'error'."""
+    inicio = time.perf_counter()
+    resultado = 'error'
+    try:
+        yield
+        resultado = 'ok'
+    finally:
+        registrar_exportacion(tipo, formato, inicio, resultado)
+
+
+def _endpoint():
+    # Las rutas inexistentes no tienen endpoint: se agrupan para no crear series por URL
+    return request.endpoint or 'sin_endpoint'
+
+
+def metricas_before_request():
+    g._metricas_inicio = time.perf_counter()
+
+
+def metricas_after_request(response):
+    """Registra la latencia, el estado y el uso de la base de datos de la petición."""
+    inicio = g.pop('_metricas_inicio', None)
+    if not METRICAS_ACTIVAS or inicio is None or request.endpoint == 'metrics':
+        return response
+
+    endpoint = _endpoint()
+    HTTP_DURACION.labels(endpoint, request.method).observe(time.perf_counter() - inicio)
+    HTTP_PETICIONES.labels(endpoint, request.method, str(response.status_code)).inc()
+
+    estadisticas = g.get('_sql_stats')
+    if estadisticas is not None and estadisticas.consultas:
+        DB_CONSULTAS.labels(endpoint).inc(estadisticas.consultas)
+        DB_TIEMPO_CONSULTAS.labels(endpoint).inc(estadisticas.tiempo)
+        DB_CONSULTAS_PETICION.labels(endpoint).observe(estadisticas.consultas)
+
+    from src.utils.auditoria import audit_writer
+    from src.models.ModelUser import ModelUser
+    AUDITORIA_COLA.set(audit_writer.queue_depth())
+    cache_usuarios = ModelUser.user_cache
+    CACHE_TAMANO.labels(cache_usuarios.nombre).set(cache_usuarios.stats()['size'])
+    return response
+
+
+def generar_metricas():
+    """Texto en formato de exposición de Prometheus (en modo multiproceso, la suma de todos los procesos)."""
+    from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+    if not MULTIPROCESO:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def limpiar_metricas():
+    """Vacía el directorio de métricas (al arrancar el servidor, antes de crear workers)."""
+    if not MULTIPROCESO:
+        return
+    for nombre in os.listdir(METRICS_DIR):
+        if nombre.endswith('.db'):
+            os.remove(os.path.join(METRICS_DIR, nombre))
+
+
+def proceso_terminado(pid):
+    """Descarta los gauges 'live' de un worker que terminó (hook child_exit de gunicorn)."""
+    if prometheus_client is not None and MULTIPROCESO:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid, METRICS_DIR)
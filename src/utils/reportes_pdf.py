@@ -0,0 +1,197 @@
+from psycopg2.extras import RealDictCursor
+from datetime import datetime
+from src.utils.exportacion import where_reporte, stream_query
+
+# Filas por tabla: cada bloque cabe en una página horizontal, así reportlab nunca
+# tiene que medir ni partir una tabla gigante (coste lineal en el número de filas)
+FILAS_POR_TABLA = 28
+ALTO_ENCABEZADO = 24
+ALTO_FILA = 15
+
+
+def _texto(valor, largo):
+    return valor[:largo] if valor else ''
+
+
+def _fecha(valor):
+    return valor.strftime('%d/%m/%Y') if valor else ''
+
+
+def _consulta_donaciones(filtros):
+    where, params = where_reporte(filtros, 'd.fecha_donacion', 'd.id_proyecto')
+    sql = f"""
+        SELECT d.id_donacion, u.fullname, p.nombre, d.monto, d.fecha_donacion
+        FROM donaciones d
+        JOIN usuarios u ON d.id_usuario = u.id
+        JOIN proyectos p ON d.id_proyecto = p.id_proyecto
+        {where}
+        ORDER BY d.fecha_donacion DESC
+    """
+    sql_totales = f"""
+        SELECT COUNT(*) as total, COALESCE(SUM(d.monto), 0) as monto_total
+        FROM donaciones d
+        {where}
+    """
+    return sql, sql_totales, params
+
+
+def _fila_donacion(fila):
+    id_donacion, fullname, nombre, monto, fecha = fila
+    return [str(id_donacion), _texto(fullname, 30), _texto(nombre, 30), f"${monto:,.2f}", _fecha(fecha)]
+
+
+def _consulta_gastos(filtros):
+    where, params = where_reporte(filtros, 'g.fecha_gasto', 'g.id_proyecto')
+    sql = f"""
+        SELECT g.id_gasto, p.nombre as proyecto, g.categoria, g.monto, g.fecha_gasto
+        FROM gastos g
+        JOIN proyectos p ON g.id_proyecto = p.id_proyecto
+        {where}
+        ORDER BY g.fecha_gasto DESC
+    """
+    sql_totales = f"""
+        SELECT COUNT(*) as total, COALESCE(SUM(g.monto), 0) as monto_total
+        FROM gastos g
+        {where}
+    """
+    return sql, sql_totales, params
+
+
+def _fila_gasto(fila):
+    id_gasto, proyecto, categoria, monto, fecha = fila
+    return [str(id_gasto), _texto(proyecto, 30), _texto(categoria, 20), f"${monto:,.2f}", _fecha(fecha)]
+
+
+# Reportes PDF disponibles: título, encabezados, anchos de columna (puntos),
+# etiqueta del total, consulta y formato de cada fila
+REPORTES_PDF = {
+    'donaciones': {
+        'titulo': "Reporte de Donaciones",
+        'encabezados': ['ID', 'Donador', 'Proyecto', 'Monto', 'Fecha'],
+        'anchos': [50, 200, 200, 110, 88],
+        'etiqueta_total': "Total de donaciones",
+        'consulta': _consulta_donaciones,
+        'fila': _fila_donacion,
+    },
+    'gastos': {
+        'titulo': "Reporte de Gastos",
+        'encabezados': ['ID', 'Proyecto', 'Categoría', 'Monto', 'Fecha'],
+        'anchos': [50, 220, 180, 110, 88],
+        'etiqueta_total': "Total de gastos",
+        'consulta': _consulta_gastos,
+        'fila': _fila_gasto,
+    },
+}
+
+
+class _FlowablesPerezosos(list):
+    """
+    Lista de flowables que se rellena desde un generador a medida que reportlab la consume.
+    doc.build() recorre la lista con len()/pop(0), así que solo unos pocos bloques
+    existen en memoria a la vez.
+    """
+
+    def __init__(self, generador, reserva=2):
+        super().__init__()
+        self._generador = generador
+        self._reserva = reserva
+
+    def __len__(self):
+        while self._generador is not None and list.__len__(self) < self._reserva:
+            try:
+                self.append(next(self._generador))
+            except StopIteration:
+                self._generador = None
+        return list.__len__(self)
+
+
+_estilo_tabla = None
+
+
+def _get_estilo_tabla():
+    """TableStyle compartido por todos los bloques (se construye una sola vez)."""
+    global _estilo_tabla
+    if _estilo_tabla is None:
+        from reportlab.lib import colors
+        from reportlab.platypus import TableStyle
+
+        _estilo_tabla = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    return _estilo_tabla
+
+
+def _bloques_tabla(filas, encabezados, anchos, formato):
+    """Agrupa las filas del cursor en tablas de FILAS_POR_TABLA con encabezado repetido."""
+    from reportlab.platypus import Table
+
+    estilo = _get_estilo_tabla()
+    alturas = [ALTO_ENCABEZADO] + [ALTO_FILA] * FILAS_POR_TABLA
+
+    def tabla(datos):
+        # Anchos y altos fijos: reportlab no mide cada celda para calcularlos
+        return Table(datos, colWidths=anchos, rowHeights=alturas[:len(datos)],
+                     style=estilo, repeatRows=1)
+
+    bloque = [encabezados]
+    for fila in filas:
+        bloque.append(formato(fila))
+        if len(bloque) > FILAS_POR_TABLA:
+            yield tabla(bloque)
+            bloque = [encabezados]
+    if len(bloque) > 1:
+        yield tabla(bloque)
+
+
+def _numerar_pagina(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Página {doc.page}")
+    canvas.restoreState()
+
+
+def render_reporte_pdf(db, tipo, filtros, destino):
+    """
+    Genera el PDF del reporte `tipo` ('donaciones' o 'gastos') con los filtros dados
+    y lo escribe en `destino` (ruta o archivo binario).
+    Las filas se leen con un cursor del servidor y se maquetan por bloques de una
+    página, de modo que la memoria no depende del número de filas.
+    """
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    reporte = REPORTES_PDF[tipo]
+    sql, sql_totales, params = reporte['consulta'](filtros)
+
+    cursor = db.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute(sql_totales, params)
+        totales = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    styles = getSampleStyleSheet()
+
+    def elementos():
+        yield Paragraph(reporte['titulo'], styles['Heading1'])
+        yield Paragraph(f"Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
+        yield Spacer(1, 20)
+        yield from _bloques_tabla(stream_query(db, sql, params), reporte['encabezados'],
+                                  reporte['anchos'], reporte['fila'])
+        yield Spacer(1, 20)
+        yield Paragraph(f"{reporte['etiqueta_total']}: {totales['total']}", styles['Normal'])
+        yield Paragraph(f"Monto total: ${totales['monto_total']:,.2f}", styles['Normal'])
+
+    doc = SimpleDocTemplate(destino, pagesize=landscape(letter))
+    doc.build(_FlowablesPerezosos(elementos()), onFirstPage=_numerar_pagina, onLaterPages=_numerar_pagina)
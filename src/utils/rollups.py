@@ -0,0 +1,162 @@
+import time
+
+# Clave fija de pg_advisory_lock: un solo job de rollup a la vez
+ROLLUP_LOCK_KEY = 727274002
+
+# Definición de cada rollup: tabla de origen, columna id, tabla destino y SQL
+ROLLUPS = {
+    'donaciones': {
+        'id': 'id_donacion',
+        'destino': 'rollup_donaciones_diario',
+        'incremental': """
+            INSERT INTO rollup_donaciones_diario AS r (dia, id_proyecto, total_donaciones, suma_donaciones)
+            SELECT fecha_donacion::date, id_proyecto, COUNT(*), SUM(monto)
+            FROM donaciones
+            WHERE id_donacion > %(desde)s AND id_donacion <= %(hasta)s AND fecha_donacion IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT (dia, id_proyecto) DO UPDATE SET
+                total_donaciones = r.total_donaciones + EXCLUDED.total_donaciones,
+                suma_donaciones = r.suma_donaciones + EXCLUDED.suma_donaciones
+        """,
+        'borrar': """
+            DELETE FROM rollup_donaciones_diario r
+            USING unnest(%(dias)s::date[], %(proyectos)s::int[]) AS p(dia, id_proyecto)
+            WHERE r.dia = p.dia AND r.id_proyecto = p.id_proyecto
+        """,
+        'recalcular': """
+            INSERT INTO rollup_donaciones_diario (dia, id_proyecto, total_donaciones, suma_donaciones)
+            SELECT p.dia, p.id_proyecto, COUNT(*), SUM(d.monto)
+            FROM unnest(%(dias)s::date[], %(proyectos)s::int[]) AS p(dia, id_proyecto)
+            JOIN donaciones d ON d.id_proyecto = p.id_proyecto
+                             AND d.fecha_donacion >= p.dia AND d.fecha_donacion < p.dia + 1
+            WHERE d.id_donacion <= %(hasta)s
+            GROUP BY p.dia, p.id_proyecto
+        """,
+    },
+    'gastos': {
+        'id': 'id_gasto',
+        'destino': 'rollup_gastos_diario',
+        'incremental': """
+            INSERT INTO rollup_gastos_diario AS r (dia, id_proyecto, categoria, total_gastos, suma_gastos)
+            SELECT fecha_gasto, id_proyecto, categoria, COUNT(*), SUM(monto)
+            FROM gastos
+            WHERE id_gasto > %(desde)s AND id_gasto <= %(hasta)s
+            GROUP BY 1, 2, 3
+            ON CONFLICT (dia, id_proyecto, categoria) DO UPDATE SET
+                total_gastos = r.total_gastos + EXCLUDED.total_gastos,
+                suma_gastos = r.suma_gastos + EXCLUDED.suma_gastos
+        """,
+        'borrar': """
+            DELETE FROM rollup_gastos_diario r
+            USING unnest(%(dias)s::date[], %(proyectos)s::int[], %(categorias)s::varchar[])
+                  AS p(dia, id_proyecto, categoria)
+            WHERE r.dia = p.dia AND r.id_proyecto = p.id_proyecto AND r.categoria = p.categoria
+        """,
+        'recalcular': """
+            INSERT INTO rollup_gastos_diario (dia, id_proyecto, categoria, total_gastos, suma_gastos)
+            SELECT p.dia, p.id_proyecto, p.categoria, COUNT(*), SUM(g.monto)
+            FROM unnest(%(dias)s::date[], %(proyectos)s::int[], %(categorias)s::varchar[])
+                 AS p(dia, id_proyecto, categoria)
+            JOIN gastos g ON g.id_proyecto = p.id_proyecto AND g.fecha_gasto = p.dia
+                         AND g.categoria = p.categoria
+            WHERE g.id_gasto <= %(hasta)s
+            GROUP BY p.dia, p.id_proyecto, p.categoria
+        """,
+    },
+}
+
+
+def _max_id_confirmado(db, tabla, columna_id):
+    """
+    Retorna el id máximo de la tabla sin huecos pendientes: el bloqueo SHARE espera
+    a que terminen las transacciones que están insertando, de modo que todo id menor
+    ya está confirmado (o revertido) y la marca de agua nunca salta una fila.
+    El bloqueo se libera de inmediato con el commit.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute(f"LOCK TABLE {tabla} IN SHARE MODE")
+        cursor.execute(f"SELECT COALESCE(MAX({columna_id}), 0) FROM {tabla}")
+        maximo = cursor.fetchone()[0]
+        db.commit()
+        return maximo
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def actualizar_rollup(db, tabla):
+    """
+    Procesa las filas nuevas de `tabla` desde la última marca de agua y recalcula los
+    días marcados por modificaciones o borrados. Retorna (filas_nuevas_hasta, dias_recalculados).
+    """
+    rollup = ROLLUPS[tabla]
+    hasta = _max_id_confirmado(db, tabla, rollup['id'])
+
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT ultimo_id FROM rollup_marcas WHERE tabla = %s FOR UPDATE", (tabla,))
+        fila = cursor.fetchone()
+        desde = fila[0] if fila else 0
+
+        # 1) Filas nuevas (desde, hasta]
+        if hasta > desde:
+            cursor.execute(rollup['incremental'], {'desde': desde, 'hasta': hasta})
+
+        # 2) Días afectados por UPDATE/DELETE: se borran y se recalculan desde las filas
+        #    crudas (solo hasta la nueva marca, las posteriores entran en la próxima corrida)
+        cursor.execute("""
+            DELETE FROM rollup_recalcular WHERE tabla = %s
+            RETURNING dia, id_proyecto, categoria
+        """, (tabla,))
+        pendientes = cursor.fetchall()
+        if pendientes:
+            params = {
+                'dias': [p[0] for p in pendientes],
+                'proyectos': [p[1] for p in pendientes],
+                'categorias': [p[2] for p in pendientes],
+                'hasta': max(hasta, desde),
+            }
+            cursor.execute(rollup['borrar'], params)
+            cursor.execute(rollup['recalcular'], params)
+
+        cursor.execute("""
+            INSERT INTO rollup_marcas (tabla, ultimo_id, actualizado_en)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (tabla) DO UPDATE SET ultimo_id = EXCLUDED.ultimo_id, actualizado_en = CURRENT_TIMESTAMP
+        """, (tabla, max(hasta, desde)))
+        db.commit()
+        return (max(hasta, desde), len(pendientes))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def ejecutar_rollups(db):
+    """Actualiza todos los rollups bajo un bloqueo consultivo. Retorna {tabla: (marca, dias_recalculados)}."""
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (ROLLUP_LOCK_KEY,))
+        if not cursor.fetchone()[0]:
+            print("ℹ️  Otro proceso está actualizando los rollups")
+            db.rollback()
+            return {}
+        db.commit()
+        try:
+            resultado = {}
+            for tabla in ROLLUPS:
+                inicio = time.perf_counter()
+                marca, recalculados = actualizar_rollup(db, tabla)
+                resultado[tabla] = (marca, recalculados)
+                print(f"  ✅ Rollup {tabla}: marca {marca}, {recalculados} días recalculados "
+                      f"({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+            return resultado
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (ROLLUP_LOCK_KEY,))
+            db.commit()
+    finally:
+        cursor.close()
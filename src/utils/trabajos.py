@@ -0,0 +1,340 @@
+from src.database import get_pooled_db, CURRENT_CONFIG
+from src.utils.cache_exportaciones import export_cache, get_data_version, TABLAS_DONACIONES, TABLAS_GASTOS
+from src.utils.metricas import medir_exportacion
+from psycopg2.extras import RealDictCursor, Json
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+
+# Tipos de trabajo soportados: tipo -> (reporte PDF, prefijo del archivo descargado, tablas de origen)
+TIPOS_TRABAJO = {
+    'donaciones_pdf': ('donaciones', 'donaciones', TABLAS_DONACIONES),
+    'gastos_pdf': ('gastos', 'gastos', TABLAS_GASTOS),
+}
+
+ESTADOS_ACTIVOS = ('pendiente', 'procesando')
+
+
+def _export_dir():
+    directorio = getattr(CURRENT_CONFIG, "EXPORT_DIR")
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def clave_trabajo(db, tipo, parametros):
+    """Clave de la caché de exportaciones para el resultado de un trabajo."""
+    return export_cache.clave(tipo, parametros, get_data_version(db, TIPOS_TRABAJO[tipo][2]))
+
+
+def encolar_trabajo(db, tipo, parametros, id_usuario, clave=None):
+    """
+    Registra un trabajo de exportación pendiente. Retorna (True, id) o (False, mensaje).
+    Si el usuario ya tiene un trabajo activo con la misma clave de caché, retorna ese
+    (dos clics o peticiones concurrentes no encolan dos veces el mismo reporte).
+    """
+    if tipo not in TIPOS_TRABAJO:
+        return (False, f"Tipo de trabajo desconocido: {tipo}")
+    cursor = None
+    try:
+        cursor = db.cursor()
+        # Dos intentos: el trabajo activo que causó el conflicto puede terminar antes de leerlo
+        for _ in range(2):
+            cursor.execute("""
+                INSERT INTO trabajos_exportacion (tipo, parametros, id_usuario, clave)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (id_usuario, clave) WHERE estado IN ('pendiente', 'procesando') DO NOTHING
+                RETURNING id
+            """, (tipo, Json(parametros), id_usuario, clave))
+            fila = cursor.fetchone()
+            if fila is None:
+                cursor.execute("""
+                    SELECT id FROM trabajos_exportacion
+                    WHERE id_usuario = %s AND clave = %s AND estado IN ('pendiente', 'procesando')
+                """, (id_usuario, clave))
+                fila = cursor.fetchone()
+            if fila is not None:
+                db.commit()
+                return (True, fila[0])
+        db.rollback()
+        return (False, "No se pudo registrar el trabajo")
+    except Exception as ex:
+        db.rollback()
+        print(f"Error al encolar trabajo de exportación: {ex}")
+        return (False, str(ex))
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def get_trabajo(db, id_trabajo):
+    cursor = None
+    try:
+        cursor = db.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("SELECT * FROM trabajos_exportacion WHERE id = %s", (id_trabajo,))
+        return cursor.fetchone()
+    except Exception as ex:
+        print(f"Error al obtener trabajo de exportación: {ex}")
+        raise Exception(ex)
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def get_trabajos_usuario(db, id_usuario, limite=20):
+    cursor = None
+    try:
+        cursor = db.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT id, tipo, parametros, estado, nombre_archivo, error, intentos,
+                   creado_en, iniciado_en, terminado_en
+            FROM trabajos_exportacion
+            WHERE id_usuario = %s
+            ORDER BY creado_en DESC
+            LIMIT %s
+        """, (id_usuario, limite))
+        return cursor.fetchall()
+    except Exception as ex:
+        print(f"Error al obtener trabajos de exportación: {ex}")
+        raise Exception(ex)
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def reclamar_trabajo(db):
+    """
+    Toma el trabajo pendiente más antiguo y lo marca como 'procesando'.
+    FOR UPDATE SKIP LOCKED permite varios workers sin que dos reclamen el mismo trabajo.
+    Retorna el id del trabajo o None si la cola está vacía.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            UPDATE trabajos_exportacion
+            SET estado = 'procesando', iniciado_en = CURRENT_TIMESTAMP, intentos = intentos + 1
+            WHERE id = (
+                SELECT id FROM trabajos_exportacion
+                WHERE estado = 'pendiente'
+                ORDER BY creado_en
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id
+        """)
+        fila = cursor.fetchone()
+        db.commit()
+        return fila[0] if fila else None
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def recuperar_trabajos_colgados(db, timeout, max_intentos):
+    """
+    Devuelve a la cola los trabajos que llevan más de `timeout` segundos en 'procesando'
+    (el proceso que los tomó murió) o los marca como error si agotaron sus intentos.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            UPDATE trabajos_exportacion
+            SET estado = CASE WHEN intentos >= %s THEN 'error' ELSE 'pendiente' END,
+                error = CASE WHEN intentos >= %s THEN 'Tiempo de procesamiento agotado' ELSE error END,
+                terminado_en = CASE WHEN intentos >= %s THEN CURRENT_TIMESTAMP ELSE NULL END
+            WHERE estado = 'procesando'
+              AND iniciado_en < CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """, (max_intentos, max_intentos, max_intentos, timeout))
+        recuperados = cursor.rowcount
+        db.commit()
+        return recuperados
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def limpiar_trabajos_antiguos(db, horas):
+    """Elimina los trabajos terminados hace más de `horas` horas y sus archivos."""
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            DELETE FROM trabajos_exportacion
+            WHERE estado IN ('completado', 'error')
+              AND terminado_en < CURRENT_TIMESTAMP - make_interval(hours => %s)
+            RETURNING archivo
+        """, (horas,))
+        archivos = [fila[0] for fila in cursor.fetchall() if fila[0]]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    for archivo in archivos:
+        try:
+            os.remove(archivo)
+        except FileNotFoundError:
+            pass
+    return len(archivos)
+
+
+def _finalizar_trabajo(db, id_trabajo, archivo=None, nombre_archivo=None, error=None):
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            UPDATE trabajos_exportacion
+            SET estado = %s, archivo = %s, nombre_archivo = %s, error = %s,
+                terminado_en = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, ('error' if error else 'completado', archivo, nombre_archivo, error, id_trabajo))
+        db.commit()
+    finally:
+        cursor.close()
+
+
+def _bloquear_clave(db, clave):
+    """Candado de sesión (pg_advisory_lock) por clave de caché; se libera si el proceso muere."""
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_lock(hashtextextended(%s, 0))", (clave,))
+        db.commit()
+    finally:
+        cursor.close()
+
+
+def _desbloquear_clave(db, clave):
+    db.rollback()
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_unlock(hashtextextended(%s, 0))", (clave,))
+        db.commit()
+    finally:
+        cursor.close()
+
+
+def _copiar(origen, destino):
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def procesar_trabajo(id_trabajo):
+    """
+    Genera el archivo de un trabajo ya reclamado. Se ejecuta en un proceso del pool,
+    con su propia conexión a la base de datos.
+    """
+    from src.utils.reportes_pdf import render_reporte_pdf
+
+    db = get_pooled_db()
+    if db is None:
+        # Sin conexión no se puede marcar el error; la recuperación por timeout lo reintentará
+        print(f"Trabajo {id_trabajo}: sin conexión a la base de datos")
+        return False
+    try:
+        trabajo = get_trabajo(db, id_trabajo)
+        if trabajo is None:
+            return False
+        reporte, prefijo, _ = TIPOS_TRABAJO[trabajo['tipo']]
+        parametros = trabajo['parametros'] or {}
+        # La versión se lee antes de generar: si llegan datos nuevos mientras tanto,
+        # la clave ya no coincidirá y el reporte se regenerará (nunca queda obsoleto)
+        clave = clave_trabajo(db, trabajo['tipo'], parametros)
+
+        archivo = os.path.join(_export_dir(), f"{id_trabajo}_{uuid.uuid4().hex}.pdf")
+        temporal = f"{archivo}.tmp"
+        inicio = time.monotonic()
+        # Un solo render por clave entre todos los workers: los trabajos de otros usuarios
+        # con la misma clave esperan el candado y reutilizan el archivo de la caché
+        _bloquear_clave(db, clave)
+        try:
+            cacheado = export_cache.get(clave)
+            if cacheado is not None:
+                _copiar(cacheado, temporal)
+            else:
+                with medir_exportacion(reporte, 'pdf'):
+                    render_reporte_pdf(db, reporte, parametros, temporal)
+            db.rollback()
+            os.replace(temporal, archivo)
+            if cacheado is None:
+                export_cache.put(clave, archivo)
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        finally:
+            _desbloquear_clave(db, clave)
+
+        nombre_archivo = f"{prefijo}_{trabajo['creado_en'].strftime('%Y%m%d_%H%M%S')}.pdf"
+        _finalizar_trabajo(db, id_trabajo, archivo, nombre_archivo)
+        print(f"✅ Trabajo {id_trabajo} ({trabajo['tipo']}) completado en {time.monotonic() - inicio:.1f}s")
+        return True
+    except Exception as ex:
+        db.rollback()
+        print(f"❌ Error en el trabajo {id_trabajo}: {ex}")
+        try:
+            _finalizar_trabajo(db, id_trabajo, error=str(ex)[:500])
+        except Exception as ex_final:
+            print(f"❌ No se pudo registrar el error del trabajo {id_trabajo}: {ex_final}")
+        return False
+    finally:
+        db.close()
+
+
+def ejecutar_worker(procesos=None, intervalo=None, una_vez=False):
+    """
+    Bucle del worker: reclama trabajos pendientes y los reparte en un pool de procesos.
+    Solo necesita PostgreSQL (sin broker externo); se pueden lanzar varios workers.
+    """
+    procesos = procesos or getattr(CURRENT_CONFIG, "EXPORT_WORKERS", 2)
+    intervalo = intervalo or getattr(CURRENT_CONFIG, "EXPORT_POLL_INTERVAL", 2)
+    timeout = getattr(CURRENT_CONFIG, "EXPORT_JOB_TIMEOUT", 900)
+    max_intentos = getattr(CURRENT_CONFIG, "EXPORT_MAX_INTENTOS", 3)
+    retencion = getattr(CURRENT_CONFIG, "EXPORT_RETENCION_HORAS", 24)
+
+    # spawn: los procesos hijos no heredan los sockets del pool de conexiones del padre
+    contexto = multiprocessing.get_context('spawn')
+    en_curso = set()
+    ultimo_mantenimiento = 0
+
+    print(f"🚀 Worker de exportaciones iniciado ({procesos} procesos, directorio {_export_dir()})")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as executor:
+        while True:
+            en_curso = {f for f in en_curso if not f.done()}
+            db = get_pooled_db()
+            if db is None:
+                print("❌ Worker sin conexión a la base de datos, reintentando...")
+                time.sleep(intervalo)
+                continue
+            try:
+                if time.monotonic() - ultimo_mantenimiento > 60:
+                    recuperados = recuperar_trabajos_colgados(db, timeout, max_intentos)
+                    if recuperados:
+                        print(f"⚠️  {recuperados} trabajos colgados devueltos a la cola")
+                    limpiar_trabajos_antiguos(db, retencion)
+                    ultimo_mantenimiento = time.monotonic()
+
+                reclamados = 0
+                while len(en_curso) < procesos:
+                    id_trabajo = reclamar_trabajo(db)
+                    if id_trabajo is None:
+                        break
+                    en_curso.add(executor.submit(procesar_trabajo, id_trabajo))
+                    reclamados += 1
+            except Exception as ex:
+                print(f"❌ Error en el worker de exportaciones: {ex}")
+                reclamados = 0
+            finally:
+                db.close()
+
+            if una_vez and not en_curso:
+                return
+            if not reclamados:
+                time.sleep(intervalo)
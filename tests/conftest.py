@@ -0,0 +1,73 @@
+"""
+Fixtures compartidos: un cluster de PostgreSQL desechable y los datos sembrados con los
+helpers de scripts/query_budget.py.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, 'scripts')]
+
+import query_budget  # noqa: E402
+
+# Proyectos sembrados antes de medir; la prueba de crecimiento siembra 10 veces más
+ESCALA = int(os.environ.get('QUERY_BUDGET_ESCALA', '10'))
+
+VARIABLES_PG = ('PGHOST', 'PGPORT', 'PGUSER', 'PGPASSWORD', 'PGDATABASE')
+
+
+@pytest.fixture(scope='session')
+def cluster():
+    """Cluster temporal (initdb/pg_ctl) con el esquema migrado; se elimina al terminar la sesión."""
+    if not (shutil.which('initdb') and shutil.which('pg_ctl')):
+        pytest.skip("initdb/pg_ctl no están en el PATH")
+    anteriores = {nombre: os.environ.get(nombre) for nombre in VARIABLES_PG}
+    directorio = query_budget.iniciar_cluster_temporal()
+    try:
+        query_budget.apuntar_configuracion()
+        from init_db import init_database
+        init_database()
+        yield directorio
+    finally:
+        query_budget.detener_cluster_temporal(directorio)
+        for nombre, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(nombre, None)
+            else:
+                os.environ[nombre] = valor
+
+
+@pytest.fixture(scope='session')
+def conexion(cluster):
+    from init_db import get_db_connection
+
+    conn = get_db_connection()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='session')
+def usuarios(conexion):
+    """Un usuario por rol y ESCALA proyectos con sus donaciones, gastos y auditoría."""
+    usuarios = query_budget.crear_usuarios(conexion)
+    query_budget.sembrar(conexion, usuarios, ESCALA, 0)
+    return usuarios
+
+
+@pytest.fixture(scope='session')
+def app(cluster):
+    from app import app
+
+    # Sin propagar excepciones: una ruta que falla responde 500 y su caso falla (no aborta
+    # las mediciones del fixture de crecimiento)
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, SQL_INSTRUMENTACION=True,
+                      PROPAGATE_EXCEPTIONS=False)
+    return app
+
+
+@pytest.fixture(scope='session')
+def captura(app):
+    return query_budget.instalar_captura(app)
@@ -0,0 +1,31 @@
+"""
+Escritura por lotes de auditoría: un evento inválido no debe arrastrar al resto del lote.
+"""
+import time
+import uuid
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+from src.utils.auditoria import AuditWriter  # noqa: E402
+
+
+def test_evento_invalido_solo_descarta_su_fila(usuarios, conexion):
+    marca = uuid.uuid4().hex
+    ahora = time.monotonic()
+    lote = [
+        (usuarios[1], f'{marca} primero', ahora),
+        (usuarios[1], None, ahora),  # accion es NOT NULL
+        (usuarios[1], f'{marca} tercero', ahora),
+    ]
+
+    assert AuditWriter()._write(lote) is False
+
+    cursor = conexion.cursor()
+    cursor.execute("SELECT accion FROM auditoria WHERE accion LIKE %s ORDER BY accion", (f'{marca}%',))
+    acciones = [fila[0] for fila in cursor.fetchall()]
+    cursor.close()
+    conexion.rollback()
+    assert acciones == [f'{marca} primero', f'{marca} tercero']
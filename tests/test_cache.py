@@ -0,0 +1,42 @@
+"""
+Caché de usuarios (src/utils/cache.py) e invalidación entre procesos con LISTEN/NOTIFY.
+"""
+import time
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+from src.models.ModelUser import ModelUser  # noqa: E402
+from src.utils.cache import TTLCache  # noqa: E402
+
+
+def _esperar(condicion, segundos=10):
+    limite = time.monotonic() + segundos
+    while not condicion():
+        assert time.monotonic() < limite, "tiempo de espera agotado"
+        time.sleep(0.05)
+
+
+def test_ttl_cache_cuenta_aciertos_y_fallos():
+    cache = TTLCache(ttl=30, nombre='prueba')
+    assert cache.get('a') is None
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5, 'size': 1}
+
+
+def test_cambio_de_usuario_invalida_la_cache(usuarios, conexion):
+    _esperar(ModelUser.user_cache_invalidator.activo)
+    clave = str(usuarios[1])
+    ModelUser.user_cache.set(clave, 'usuario en caché')
+    assert ModelUser.user_cache.get(clave) == 'usuario en caché'
+
+    # Otro proceso (aquí, otra conexión) modifica el usuario
+    cursor = conexion.cursor()
+    cursor.execute("UPDATE usuarios SET fullname = fullname WHERE id = %s", (usuarios[1],))
+    cursor.close()
+    conexion.commit()
+
+    _esperar(lambda: ModelUser.user_cache.get(clave) is None)
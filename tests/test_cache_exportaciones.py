@@ -0,0 +1,54 @@
+"""
+Versiones de datos (versiones_datos) y cola de exportaciones contra la base sembrada.
+"""
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+from src.utils.cache_exportaciones import get_data_version  # noqa: E402
+from src.utils.trabajos import encolar_trabajo  # noqa: E402
+
+TABLAS = ('donaciones', 'proyectos', 'proyectos_nombres')
+
+
+def _ejecutar(conexion, sql, params=None):
+    cursor = conexion.cursor()
+    cursor.execute(sql, params)
+    cursor.close()
+    conexion.commit()
+
+
+def test_version_de_nombres_no_cambia_con_las_donaciones(usuarios, conexion):
+    antes = get_data_version(conexion, TABLAS)
+    _ejecutar(conexion, """
+        INSERT INTO donaciones (id_usuario, id_proyecto, monto)
+        SELECT %s, MIN(id_proyecto), 10 FROM proyectos WHERE nombre LIKE 'presupuesto %%'
+    """, (usuarios[1],))
+    _ejecutar(conexion, "UPDATE proyectos SET monto_recaudado = monto_recaudado WHERE nombre LIKE 'presupuesto %'")
+    despues = get_data_version(conexion, TABLAS)
+
+    assert despues['donaciones'] > antes['donaciones']
+    assert despues['proyectos'] > antes['proyectos']
+    assert despues['proyectos_nombres'] == antes['proyectos_nombres']
+
+    _ejecutar(conexion, "UPDATE proyectos SET nombre = nombre WHERE nombre LIKE 'presupuesto %'")
+    assert get_data_version(conexion, TABLAS)['proyectos_nombres'] > despues['proyectos_nombres']
+
+
+def test_encolar_trabajo_reutiliza_el_trabajo_activo(usuarios, conexion):
+    auditor = usuarios[4]
+    ok, primero = encolar_trabajo(conexion, 'donaciones_pdf', {}, auditor, 'clave-prueba')
+    ok_repetido, repetido = encolar_trabajo(conexion, 'donaciones_pdf', {}, auditor, 'clave-prueba')
+    ok_otro, otro = encolar_trabajo(conexion, 'donaciones_pdf', {'desde': '2025-01-01'}, auditor, 'clave-otra')
+    try:
+        assert ok and ok_repetido and ok_otro
+        assert repetido == primero
+        assert otro != primero
+
+        # Terminado el trabajo, la misma clave vuelve a encolarse
+        _ejecutar(conexion, "UPDATE trabajos_exportacion SET estado = 'completado' WHERE id = %s", (primero,))
+        ok_nuevo, nuevo = encolar_trabajo(conexion, 'donaciones_pdf', {}, auditor, 'clave-prueba')
+        assert ok_nuevo and nuevo != primero
+    finally:
+        _ejecutar(conexion, "DELETE FROM trabajos_exportacion WHERE clave IN ('clave-prueba', 'clave-otra')")
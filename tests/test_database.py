@@ -0,0 +1,69 @@
+"""
+Pool de conexiones de src/database.py contra el cluster temporal de tests/conftest.py.
+"""
+import threading
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+import src.database as database  # noqa: E402
+
+HILOS = 4
+CHECKOUTS_POR_HILO = 100
+
+
+@pytest.fixture
+def pool_nuevo(cluster):
+    database.close_pool()
+    yield
+    database.close_pool()
+
+
+def _conexiones_fisicas():
+    """Toma y devuelve conexiones desde varios hilos; retorna los PID de backend usados."""
+    pids = set()
+    candado = threading.Lock()
+
+    def trabajar():
+        for _ in range(CHECKOUTS_POR_HILO):
+            db = database.get_pooled_db()
+            assert db is not None
+            try:
+                with candado:
+                    pids.add(db.raw.get_backend_pid())
+            finally:
+                db.close()
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return pids
+
+
+def test_pool_conserva_las_conexiones_devueltas(pool_nuevo):
+    # Cada backend distinto es una reconexión: no debería haber más que hilos concurrentes
+    assert len(_conexiones_fisicas()) <= HILOS
+
+
+def test_pool_descarta_todas_las_conexiones_rotas(pool_nuevo):
+    db_pool = database.get_pool()
+    conexiones = [database.get_pooled_db() for _ in range(2)]
+    for db in conexiones:
+        db.close()
+    # Dos conexiones inactivas rotas: la revalidación debe descartar ambas
+    for conexion in list(db_pool._pool):
+        conexion.close()
+
+    db = database.get_pooled_db()
+    try:
+        assert not db.raw.closed
+        cursor = db.cursor()
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone()[0] == 1
+        cursor.close()
+    finally:
+        db.close()
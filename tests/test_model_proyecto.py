@@ -0,0 +1,50 @@
+"""
+Consultas de ModelProyecto contra la base sembrada por los fixtures de tests/conftest.py.
+"""
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from src.models.ModelActividad import ModelActividad  # noqa: E402
+from src.models.ModelObjetivo import ModelObjetivo  # noqa: E402
+from src.models.ModelProyecto import ModelProyecto  # noqa: E402
+from src.models.ModelTarea import ModelTarea  # noqa: E402
+
+
+def _proyectos(conexion):
+    cursor = conexion.cursor()
+    cursor.execute("SELECT id_proyecto FROM proyectos WHERE nombre LIKE 'presupuesto %' ORDER BY id_proyecto")
+    ids = [fila[0] for fila in cursor.fetchall()]
+    cursor.close()
+    return ids
+
+
+def test_get_progress_for_projects_coincide_con_get_by_proyecto(usuarios, conexion):
+    # El primer proyecto sembrado tiene objetivos, actividades y tareas; los demás no
+    ids = _proyectos(conexion)
+    resumen = ModelProyecto.get_progress_for_projects(conexion, ids, limite=3)
+    conexion.rollback()
+
+    assert set(resumen) == set(ids)
+    for id_proyecto in ids:
+        detalle = resumen[id_proyecto]
+        objetivos = ModelObjetivo.get_by_proyecto(conexion, id_proyecto)
+        actividades = ModelActividad.get_by_proyecto(conexion, id_proyecto)
+        tareas = ModelTarea.get_by_proyecto(conexion, id_proyecto)
+        conexion.rollback()
+
+        assert [o.id_objetivo for o in detalle['objetivos']] == [o.id_objetivo for o in objetivos[:3]]
+        assert [a.id_actividad for a in detalle['actividades']] == [a.id_actividad for a in actividades[:3]]
+        assert [t.id for t in detalle['tareas']] == [t.id for t in tareas[:3]]
+        assert detalle['total_objetivos'] == len(objetivos)
+        assert detalle['objetivos_completados'] == sum(1 for o in objetivos if o.completado)
+        assert detalle['total_actividades'] == len(actividades)
+        assert detalle['actividades_completadas'] == sum(1 for a in actividades if a.estado == 'completada')
+        assert detalle['total_tareas'] == len(tareas)
+        assert detalle['tareas_completadas'] == sum(1 for t in tareas if t.estado == 'completada')
+
+    assert resumen[ids[0]]['total_tareas'] > 3
+
+
+def test_get_progress_for_projects_sin_proyectos(conexion):
+    assert ModelProyecto.get_progress_for_projects(conexion, []) == {}
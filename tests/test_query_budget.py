@@ -0,0 +1,57 @@
+"""
+Presupuesto de consultas SQL y conexiones del pool de cada ruta de app.py, por método y rol.
+Los presupuestos se declaran por (endpoint, método) en scripts/query_budget.py.
+"""
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+import query_budget  # noqa: E402
+from app import app as aplicacion  # noqa: E402
+from conftest import ESCALA  # noqa: E402
+
+ROLES = [pytest.param(id_rol, id=rol) for id_rol, rol in query_budget.ROLES.items()]
+CASOS = [pytest.param(regla, metodo, id=f"{regla.endpoint}-{metodo}")
+         for regla, metodo in query_budget.rutas(aplicacion)]
+CASOS_GET = [pytest.param(regla, id=regla.endpoint)
+             for regla, _ in query_budget.rutas(aplicacion, metodos=('GET',))]
+
+
+@pytest.mark.parametrize('id_rol', ROLES)
+@pytest.mark.parametrize('regla,metodo', CASOS)
+def test_presupuesto_de_consultas(app, captura, usuarios, conexion, regla, metodo, id_rol):
+    medicion = query_budget.medir(app, app.test_client(), captura, usuarios, regla, metodo, id_rol,
+                                  query_budget.valores_argumentos(conexion),
+                                  query_budget.valores_argumentos(conexion, 'MAX'))
+    if medicion is None:
+        pytest.skip(f"sin valor para los argumentos de {regla.rule}")
+    status, consultas, conexiones = medicion
+    assert status < 500, f"{regla.endpoint} {metodo}: HTTP {status}"
+    max_consultas, max_conexiones = query_budget.presupuesto(regla.endpoint, metodo)
+    assert consultas <= max_consultas, \
+        f"{regla.endpoint} {metodo} (HTTP {status}): {consultas} consultas, presupuesto {max_consultas}"
+    assert conexiones <= max_conexiones, \
+        f"{regla.endpoint} {metodo} (HTTP {status}): {conexiones} conexiones, presupuesto {max_conexiones}"
+
+
+@pytest.fixture(scope='module')
+def crecimiento(app, captura, usuarios, conexion):
+    """Cuentas de las rutas GET con ESCALA proyectos y con 10 veces más datos."""
+    antes = query_budget.medir_rutas(app, captura, usuarios, conexion, metodos=('GET',))
+    query_budget.sembrar(conexion, usuarios, ESCALA * 10, ESCALA)
+    despues = query_budget.medir_rutas(app, captura, usuarios, conexion, metodos=('GET',))
+    return antes, despues
+
+
+@pytest.mark.parametrize('id_rol', ROLES)
+@pytest.mark.parametrize('regla', CASOS_GET)
+def test_consultas_no_crecen_con_los_datos(crecimiento, regla, id_rol):
+    antes, despues = crecimiento
+    clave = (regla.endpoint, 'GET', query_budget.ROLES[id_rol])
+    if clave not in antes or clave not in despues:
+        pytest.skip(f"{regla.endpoint} no se midió")
+    assert antes[clave][0] < 500 and despues[clave][0] < 500, \
+        f"{regla.endpoint}: HTTP {antes[clave][0]} / {despues[clave][0]}"
+    assert despues[clave][1] <= antes[clave][1], \
+        f"{regla.endpoint}: {antes[clave][1]} -> {despues[clave][1]} consultas (posible N+1)"